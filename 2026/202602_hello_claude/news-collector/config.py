@@ -0,0 +1,66 @@
+"""設定"""
+
+import os
+
+# 実行時のデータ（キャッシュなど）の置き場所
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# 取得対象のRSS/Atomフィード（name: 表示名, url: フィードURL,
+# interval: 常駐モードでの取得間隔（秒、省略時は DAEMON_INTERVAL））
+NEWS_SOURCES = [
+    {"name": "NHK 主要ニュース", "url": "https://www3.nhk.or.jp/rss/news/cat0.xml"},
+    {"name": "NHK 科学・文化", "url": "https://www3.nhk.or.jp/rss/news/cat3.xml"},
+    {"name": "NHK 経済", "url": "https://www3.nhk.or.jp/rss/news/cat5.xml"},
+    {"name": "ITmedia NEWS", "url": "https://rss.itmedia.co.jp/rss/2.0/news_bursts.xml"},
+    {"name": "Publickey", "url": "https://www.publickey1.jp/atom.xml"},
+    {"name": "Zenn トレンド", "url": "https://zenn.dev/feed"},
+    {"name": "Hacker News", "url": "https://hnrss.org/frontpage"},
+]
+
+# ── 取得（fetcher.py） ──────────────────────────────────────────
+FETCH_TIMEOUT = 10          # 接続・読み込みのタイムアウト（秒）
+FETCH_MAX_CONNECTIONS = 32  # 全体の同時接続数
+FETCH_PER_HOST = 4          # 同一ホストへの同時接続数
+FETCH_RETRIES = 3           # 失敗時の再試行回数
+FETCH_BACKOFF = 0.5         # 再試行の待ち時間の初期値（秒、試行ごとに倍）
+USER_AGENT = "news-collector/1.0"
+
+# ── フィードキャッシュ（feed_cache.py） ────────────────────────
+FEED_CACHE_PATH = os.path.join(DATA_DIR, "feeds.sqlite3")
+FEED_CACHE_MAX_AGE = 7 * 24 * 3600          # 確認されないまま経過したら消す（秒）
+FEED_CACHE_MAX_BYTES = 64 * 1024 * 1024     # 解析済み記事の合計サイズの上限
+
+# ── 要約（summarizer.py） ──────────────────────────────────────
+SUMMARY_MODEL = "claude-haiku-4-5"
+SUMMARY_MAX_TOKENS = 300
+SUMMARY_WORKERS = 4         # 同時に実行する要約の数
+SUMMARY_BATCH_SIZE = 8      # 1回のモデル呼び出しで要約する記事数の上限
+SUMMARY_BACKEND = os.environ.get("SUMMARY_BACKEND", "anthropic")   # "anthropic" / "stub"
+SUMMARY_CACHE_PATH = os.path.join(DATA_DIR, "summaries.sqlite3")
+SUMMARY_CACHE_MAX_AGE = 30 * 24 * 3600      # 要約キャッシュの保存期間（秒）
+
+# ── 類似記事の除去（dedupe.py） ───────────────────────────────
+DEDUPE_PATH = os.path.join(DATA_DIR, "dedupe.sqlite3")
+DEDUPE_SIMILARITY = 0.7     # 文字 3-gram の Jaccard 類似度がこれ以上なら同じ記事とみなす
+DEDUPE_WINDOW_DAYS = 7      # この日数より前の記事とは比べない
+
+# ── 既読記事（seen.py） ────────────────────────────────────────
+SEEN_PATH = os.path.join(DATA_DIR, "seen.sqlite3")
+SEEN_TTL_DAYS = 90          # この日数フィードで見かけなかった記事の記録は消す
+
+# ── 計測（metrics.py） ─────────────────────────────────────────
+METRICS_PATH = os.path.join(DATA_DIR, "metrics.jsonl")   # 1回の実行（常駐中は一定間隔）ごとに1行
+
+# ── パイプライン・レポート（pipeline.py, reporter.py） ─────────
+PIPELINE_QUEUE_SIZE = 100   # 段と段の間のキューの上限（超えたら前の段が待つ）
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+REPORT_PAGE_SIZE = 100     # 1ページの記事数
+
+# ── 常駐モード（daemon.py） ────────────────────────────────────
+DAEMON_INTERVAL = 300       # フィードの取得間隔（秒）
+DAEMON_JITTER = 0.2         # 取得間隔を ±20% の範囲でずらす（取得が同じ時刻に集中しないように）
+DAEMON_MAINTENANCE_INTERVAL = 3600  # キャッシュ・索引の古いエントリーを消す間隔（秒）
+DAEMON_METRICS_INTERVAL = 60        # 計測値を METRICS_PATH に追記する間隔（秒）
+DAEMON_SHUTDOWN_TIMEOUT = 30        # 停止時に、キューに残った記事の要約・出力を待つ上限（秒）
+DAEMON_STATUS_HOST = "127.0.0.1"
+DAEMON_STATUS_PORT = 8765   # 状態を返すHTTPのポート（GET /status）
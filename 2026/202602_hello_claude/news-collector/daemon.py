@@ -0,0 +1,243 @@
+"""常駐モード
+
+    python main.py --daemon
+
+1つのイベントループの中で、フィードごとに interval 秒（±jitter）おきに
+取得し、新着記事を pipeline と同じ 重複除去 → 要約 → レポート出力 の段へ
+流し続ける。HTTPの接続プール・フィードキャッシュ・類似記事の索引・既読の
+記録・要約キャッシュは開いたまま使い回す。
+
+状態は DAEMON_STATUS_HOST:DAEMON_STATUS_PORT の GET /status でJSONとして、
+計測値は GET /metrics で Prometheus のテキスト形式として返す（GET /healthz
+は "ok"）。計測値は DAEMON_METRICS_INTERVAL ごとに METRICS_PATH にも追記する。
+
+Ctrl-C / SIGTERM で止まる。止まるときはまず取得をやめ、キューに残った記事を
+要約・出力し終えるまで（最大 DAEMON_SHUTDOWN_TIMEOUT 秒）待つ。
+"""
+
+import asyncio
+import contextlib
+import http.client
+import json
+import random
+import signal
+import time
+
+from config import (
+    DAEMON_INTERVAL, DAEMON_JITTER, DAEMON_MAINTENANCE_INTERVAL, DAEMON_METRICS_INTERVAL,
+    DAEMON_SHUTDOWN_TIMEOUT, DAEMON_STATUS_HOST, DAEMON_STATUS_PORT, METRICS_PATH,
+    PIPELINE_QUEUE_SIZE, SUMMARY_BATCH_SIZE, SUMMARY_WORKERS,
+)
+from fetcher import Fetcher, FetchError
+from metrics import METRICS
+from pipeline import DONE, dedupe_stage, open_stores, publish, render_stage, summarize_stage
+
+
+def _iso(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(timestamp)) if timestamp else None
+
+
+class Daemon:
+    def __init__(self, sources, report, summarize_all, fetcher, cache=None, index=None,
+                 seen=None, summaries=None, interval=DAEMON_INTERVAL, jitter=DAEMON_JITTER,
+                 queue_size=PIPELINE_QUEUE_SIZE, workers=SUMMARY_WORKERS,
+                 batch_size=SUMMARY_BATCH_SIZE, metrics_path=METRICS_PATH,
+                 shutdown_timeout=DAEMON_SHUTDOWN_TIMEOUT):
+        self.sources = sources
+        self.report = report
+        self.summarize_all = summarize_all
+        self.fetcher = fetcher
+        self.cache, self.index, self.seen = cache, index, seen
+        self.summaries = summaries      # summarizer.SummaryCache（あれば古い要約を消す）
+        self.interval = interval
+        self.jitter = jitter
+        self.workers = workers
+        self.batch_size = batch_size
+        self.metrics_path = metrics_path
+        self.shutdown_timeout = shutdown_timeout
+        self.port = None                # run() で状態のサーバーを開いたポート
+        self.queues = {name: asyncio.Queue(queue_size)
+                       for name in ("fetched", "unique", "summarized")}
+        self.started = time.time()
+        self.state = {source["url"]: {"name": source["name"],
+                                      "interval": source.get("interval", interval),
+                                      "fetches": 0, "errors": 0, "articles": 0, "new": 0,
+                                      "last_fetch": None, "last_error": None, "next_fetch": None}
+                      for source in sources}
+
+    def _delay(self, interval):
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def poll(self, source):
+        """1つのフィードを、自分の間隔で取得し続ける"""
+        state = self.state[source["url"]]
+        start = random.uniform(0, state["interval"] * self.jitter)     # 起動直後に集中させない
+        state["next_fetch"] = time.time() + start
+        await asyncio.sleep(start)
+        while True:
+            state["fetches"] += 1
+            state["last_fetch"] = time.time()
+            try:
+                items = await self.fetcher.fetch_feed(source)
+            except (FetchError, OSError, http.client.HTTPException) as e:
+                state["errors"] += 1
+                state["last_error"] = str(e)
+                print(f"  ✗ {source['name']}: {e}")
+            else:
+                state["articles"] += len(items)
+                state["new"] += await publish(source, items, self.queues["fetched"], self.seen)
+                state["last_error"] = None
+            delay = self._delay(state["interval"])
+            state["next_fetch"] = time.time() + delay
+            await asyncio.sleep(delay)
+
+    async def maintain(self, every=DAEMON_MAINTENANCE_INTERVAL):
+        """キャッシュ・索引・既読の記録・要約キャッシュから古いエントリーを消す"""
+        while True:
+            await asyncio.sleep(every)
+            if self.cache is not None:
+                self.cache.prune()
+            if self.index is not None:
+                self.index.prune()
+            if self.seen is not None:
+                self.seen.compact()
+            if self.summaries is not None:
+                self.summaries.prune()
+
+    async def export_metrics(self, every=DAEMON_METRICS_INTERVAL):
+        while True:
+            await asyncio.sleep(every)
+            METRICS.write_jsonl(self.metrics_path)
+
+    def status(self):
+        index = self.index
+        return {
+            "started": _iso(self.started),
+            "uptime": round(time.time() - self.started),
+            "report": self.report.path,
+            "rendered": self.report.count,
+            "duplicates": index.duplicates if index is not None else None,
+            "queues": {name: queue.qsize() for name, queue in self.queues.items()},
+            "sources": [dict(state, url=url, last_fetch=_iso(state["last_fetch"]),
+                             next_fetch=_iso(state["next_fetch"]))
+                        for url, state in self.state.items()],
+        }
+
+    async def handle_status(self, reader, writer):
+        """最小限のHTTP: GET /status, /metrics, /healthz"""
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            method, path, _ = request.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                asyncio.TimeoutError, ValueError):
+            writer.close()
+            return
+        if method != "GET":
+            status, body, kind = "405 Method Not Allowed", b"", "text/plain"
+        elif path == "/status":
+            status, kind = "200 OK", "application/json"
+            body = json.dumps(self.status(), ensure_ascii=False, indent=1).encode()
+        elif path == "/metrics":
+            status, kind = "200 OK", "text/plain; version=0.0.4"
+            body = METRICS.prometheus().encode()
+        elif path == "/healthz":
+            status, body, kind = "200 OK", b"ok\n", "text/plain"
+        else:
+            status, body, kind = "404 Not Found", b"", "text/plain"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {kind}; charset=utf-8\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        with contextlib.suppress(ConnectionError):
+            await writer.drain()
+        writer.close()
+
+    async def drain(self, stages):
+        """取得を止めたあと、キューに残った記事を要約・出力し終えるまで待つ
+
+        shutdown_timeout 秒で終わらなかった段は止める（書き出していない記事は
+        既読として記録していないので、次に起動したときまた新着になる）。
+        """
+        done = asyncio.ensure_future(self.queues["fetched"].put(DONE))
+        pending = stages
+        try:
+            _, pending = await asyncio.wait(stages, timeout=self.shutdown_timeout)
+            if pending:
+                print(f"  ✗ {self.shutdown_timeout}秒で書き出しきれませんでした"
+                      f"（キューに {sum(q.qsize() for q in self.queues.values())} 件）")
+        finally:
+            done.cancel()
+            for task in pending:
+                task.cancel()
+
+    async def run(self, host=DAEMON_STATUS_HOST, port=DAEMON_STATUS_PORT):
+        q = self.queues
+        server = await asyncio.start_server(self.handle_status, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"状態: http://{host}:{self.port}/status")
+        pollers = [asyncio.ensure_future(self.poll(source)) for source in self.sources]
+        stages = [
+            # 既読の記録があれば同じ記事はそこで落ちるので、キーを覚え続けない
+            asyncio.ensure_future(dedupe_stage(q["fetched"], q["unique"], self.workers,
+                                               self.index, exact=self.seen is None,
+                                               seen=self.seen)),
+            *(asyncio.ensure_future(summarize_stage(q["unique"], q["summarized"],
+                                                    self.summarize_all, self.batch_size))
+              for _ in range(self.workers)),
+            asyncio.ensure_future(render_stage(q["summarized"], self.report, self.workers,
+                                               self.seen)),
+        ]
+        background = [asyncio.ensure_future(self.maintain())]
+        if self.metrics_path is not None:
+            background.append(asyncio.ensure_future(self.export_metrics()))
+        try:
+            # gather と違い、止められても（キャンセルされても）段は止めない
+            done, _ = await asyncio.wait([*pollers, *stages, *background],
+                                         return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()           # 例外で終わった段があれば送出する
+        finally:
+            for task in pollers + background:
+                task.cancel()
+            await self.drain(stages)
+            server.close()
+            if self.metrics_path is not None:
+                METRICS.write_jsonl(self.metrics_path)
+
+
+def run_daemon(sources, report=None, summarize_all=None, host=DAEMON_STATUS_HOST,
+               port=DAEMON_STATUS_PORT, **options):
+    """止められるまで常駐する。options は pipeline.run と同じ（cache_path などのパス、
+    queue_size / workers / batch_size、metrics_path、Fetcher の引数）に加えて
+    interval / jitter / shutdown_timeout。"""
+    from reporter import HtmlReport
+
+    summaries = None
+    if summarize_all is None:
+        from summarizer import default_summarizer
+        summarizer = default_summarizer()
+        summarize_all, summaries = summarizer.summarize_all, summarizer.cache
+    paths = {name: options.pop(name) for name in ("cache_path", "dedupe_path", "seen_path")
+             if name in options}
+    daemon_options = {name: options.pop(name) for name in
+                      ("interval", "jitter", "queue_size", "workers", "batch_size",
+                       "metrics_path", "shutdown_timeout")
+                      if name in options}
+
+    async def go(stores):
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        with contextlib.suppress(NotImplementedError):      # Windows
+            loop.add_signal_handler(signal.SIGTERM, task.cancel)
+        async with Fetcher(cache=stores[0], **options) as fetcher:
+            daemon = Daemon(sources, report, summarize_all, fetcher, *stores,
+                            summaries=summaries, **daemon_options)
+            with contextlib.suppress(asyncio.CancelledError):
+                await daemon.run(host, port)
+
+    report = report or HtmlReport()
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(report)
+        try:
+            asyncio.run(go(open_stores(stack, **paths)))
+        except KeyboardInterrupt:
+            pass
+    return report
@@ -0,0 +1,173 @@
+"""類似記事（転載・配信記事のコピー）の検出
+
+記事のタイトルと本文を文字 3-gram の集合にし、MinHash（64個のハッシュの
+最小値）で Jaccard 類似度を推定する。推定値が similarity 以上なら同じ
+記事とみなす。
+
+候補の検索は LSH: 署名を bands 個の帯（rows 個ずつ）に分け、どれかの帯が
+完全に一致する記事だけを比べる。帯ごとの辞書を引くだけなので、1件の
+検索はマイクロ秒単位で終わる。(bands, rows) は類似度のしきい値に合わせて
+選ぶ（LSH のしきい値 ≈ (1/bands)^(1/rows) が similarity を下回るように）。
+
+索引はメモリに持ち、SQLite（WAL）にも書いて次回の実行に引き継ぐ。
+window_days より前に登録した記事は消す。記事は自分自身（同じURLで登録
+済みのもの）とは比べないので、前回の実行で登録した記事を取得し直しても
+重複にはならない。
+"""
+
+import os
+import random
+import sqlite3
+import time
+import unicodedata
+import zlib
+from array import array
+
+from config import DEDUPE_PATH, DEDUPE_SIMILARITY, DEDUPE_WINDOW_DAYS
+from seen import canonical_url
+
+SHINGLE = 3                 # 文字 n-gram（日本語は単語に区切らない）
+NUM_HASHES = 64
+PRIME = (1 << 61) - 1
+_rng = random.Random(20260201)          # 署名を永続化するので係数は固定
+HASHES = [(_rng.randrange(1, PRIME), _rng.randrange(PRIME)) for _ in range(NUM_HASHES)]
+MASK = (1 << 32) - 1
+
+
+def normalise(text):
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(ch for ch in text if ch.isalnum())
+
+
+def shingles(text):
+    text = normalise(text)
+    return {text[i:i + SHINGLE] for i in range(max(len(text) - SHINGLE + 1, 1))}
+
+
+def minhash(text):
+    """文字 n-gram 集合の MinHash 署名（32ビット × NUM_HASHES）"""
+    values = [zlib.crc32(s.encode()) for s in shingles(text)]
+    return array("I", [min((a * v + b) % PRIME for v in values) & MASK for a, b in HASHES])
+
+
+def similarity(sig1, sig2):
+    """Jaccard 類似度の推定値"""
+    return sum(x == y for x, y in zip(sig1, sig2)) / NUM_HASHES
+
+
+def lsh_shape(threshold):
+    """しきい値を下回らない範囲で一番厳しい (bands, rows)"""
+    shapes = [(NUM_HASHES // rows, rows) for rows in (1, 2, 4, 8, 16, 32)]
+    fitting = [shape for shape in shapes if (1 / shape[0]) ** (1 / shape[1]) < threshold]
+    return fitting[-1] if fitting else shapes[0]
+
+
+def own_url(url):
+    """自分自身と見分けるための正規化したURL（空・解析できないURLは None）"""
+    if not url:
+        return None
+    try:
+        return canonical_url(url)
+    except ValueError:
+        return None
+
+
+def article_text(article):
+    return f"{article['title']}\n{article.get('description', '')}"
+
+
+class DuplicateIndex:
+    def __init__(self, path=DEDUPE_PATH, similarity=DEDUPE_SIMILARITY,
+                 window_days=DEDUPE_WINDOW_DAYS):
+        self.threshold = similarity
+        self.window = window_days * 86400
+        self.bands, self.rows = lsh_shape(similarity)
+        self.checked = self.duplicates = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS signatures ("
+                        "id INTEGER PRIMARY KEY, signature BLOB NOT NULL, "
+                        "url TEXT NOT NULL, title TEXT NOT NULL, added_at REAL NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS signatures_added_at "
+                        "ON signatures (added_at)")
+        self.prune()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def _keys(self, signature):
+        rows = self.rows
+        return [(band, tuple(signature[band * rows:(band + 1) * rows]))
+                for band in range(self.bands)]
+
+    def _insert(self, doc_id, signature, url, title):
+        own = own_url(url)
+        self._docs[doc_id] = (signature, url, title, own)
+        if own is not None:
+            self._urls.add(own)
+        for key in self._keys(signature):
+            self._table.setdefault(key, []).append(doc_id)
+
+    def prune(self, now=None):
+        """window_days より古い記事を消して、メモリの索引を作り直す"""
+        now = time.time() if now is None else now
+        with self.db:
+            self.db.execute("DELETE FROM signatures WHERE added_at < ?", (now - self.window,))
+        self._docs, self._table, self._urls = {}, {}, set()
+        for doc_id, blob, url, title in self.db.execute(
+                "SELECT id, signature, url, title FROM signatures"):
+            signature = array("I")
+            signature.frombytes(blob)
+            self._insert(doc_id, signature, url, title)
+
+    def find(self, signature, exclude=None):
+        """類似度が threshold 以上の登録済み記事で最も近い (url, title)。なければNone
+
+        exclude（正規化したURL）で登録された記事は比べない。
+        """
+        best, seen = None, set()
+        for key in self._keys(signature):
+            for doc_id in self._table.get(key, ()):
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                other, url, title, own = self._docs[doc_id]
+                if exclude is not None and own == exclude:
+                    continue
+                score = similarity(signature, other)
+                if score >= self.threshold and (best is None or score > best[0]):
+                    best = (score, url, title)
+        return best and best[1:]
+
+    def add(self, signature, article):
+        cursor = self.db.execute(
+            "INSERT INTO signatures (signature, url, title, added_at) VALUES (?, ?, ?, ?)",
+            (signature.tobytes(), article.get("url") or "", article["title"], time.time()))
+        self.db.commit()
+        self._insert(cursor.lastrowid, signature, article.get("url") or "", article["title"])
+
+    def check(self, article):
+        """類似記事が登録済みならその (url, title) を返す。なければ登録してNone
+
+        同じURLで登録済みの記事（前回の実行で取得したもの）は類似記事に数えず、
+        登録もし直さない。
+        """
+        signature = minhash(article_text(article))
+        own = own_url(article.get("url"))
+        self.checked += 1
+        match = self.find(signature, exclude=own)
+        if match is not None:
+            self.duplicates += 1
+        elif own is None or own not in self._urls:
+            self.add(signature, article)
+        return match
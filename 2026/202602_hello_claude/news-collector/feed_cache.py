@@ -0,0 +1,95 @@
+"""フィードの永続キャッシュ（条件付きGET用）
+
+フィードURLごとに ETag / Last-Modified と解析済みの記事をSQLite（WAL）に
+保存する。次回の取得では If-None-Match / If-Modified-Since を送り、
+304 Not Modified ならキャッシュの記事をそのまま使う（解析もしない）。
+
+エントリーは最後に確認してから max_age 秒で消え、全体が max_bytes を
+超えたら最後に確認した時刻が古いものから消す（prune）。
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+from config import FEED_CACHE_MAX_AGE, FEED_CACHE_MAX_BYTES, FEED_CACHE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    items         TEXT NOT NULL,    -- 記事のJSON配列
+    size          INTEGER NOT NULL, -- items のバイト数
+    checked_at    REAL NOT NULL     -- 最後に取得・確認した時刻
+);
+CREATE INDEX IF NOT EXISTS feeds_checked_at ON feeds (checked_at);
+"""
+
+
+class FeedCache:
+    def __init__(self, path=FEED_CACHE_PATH, max_age=FEED_CACHE_MAX_AGE,
+                 max_bytes=FEED_CACHE_MAX_BYTES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.prune()
+        self.db.close()
+
+    def validators(self, url):
+        """条件付きGETのヘッダー（キャッシュがなければ空）"""
+        row = self.db.execute("SELECT etag, last_modified FROM feeds WHERE url = ?",
+                              (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def not_modified(self, url):
+        """304のとき: キャッシュの記事を返し、確認時刻を更新する"""
+        row = self.db.execute("SELECT items FROM feeds WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        with self.db:
+            self.db.execute("UPDATE feeds SET checked_at = ? WHERE url = ?", (time.time(), url))
+        return json.loads(row[0])
+
+    def store(self, url, headers, items):
+        """200のとき: 検証子と解析済みの記事を保存する"""
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return          # 条件付きGETできないフィードは保存しない
+        data = json.dumps(items, ensure_ascii=False)
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?, ?)",
+                            (url, etag, last_modified, data, len(data.encode()), time.time()))
+
+    def prune(self, now=None):
+        """古いエントリーと、max_bytes を超えた分を消す"""
+        now = time.time() if now is None else now
+        with self.db:
+            self.db.execute("DELETE FROM feeds WHERE checked_at < ?", (now - self.max_age,))
+            total = 0
+            evict = []
+            for url, size in self.db.execute(
+                    "SELECT url, size FROM feeds ORDER BY checked_at DESC"):
+                total += size
+                if total > self.max_bytes:
+                    evict.append((url,))
+            self.db.executemany("DELETE FROM feeds WHERE url = ?", evict)
@@ -0,0 +1,374 @@
+"""RSS/Atomフィードの並行取得
+
+全フィードをasyncioで並行に取得する。HTTP通信はhttp.clientを専用の
+スレッドプールで実行し、接続は (スキーム, ホスト, ポート) ごとに
+keep-aliveでプールして再利用する。
+
+    articles = fetch_articles(NEWS_SOURCES)          # まとめて取得（同期）
+
+    async for source, articles, error in iter_feeds(NEWS_SOURCES):
+        ...                                          # 取得できたフィードから順に
+
+- 同時接続数は全体（max_connections）とホストごと（per_host）に制限する
+- 接続エラー・タイムアウト・429/5xx は指数バックオフで再試行する
+  （Retry-After があればそれに従う）
+- 取得に失敗したフィードは error 付きで返し、他のフィードは止めない
+- cache（feed_cache.FeedCache）があれば条件付きGETを送り、
+  304 ならキャッシュの記事を使う（解析しない）
+
+記事は dict: title, url, description, published (ISO 8601, UTC), source, guid
+"""
+
+import asyncio
+import gzip
+import http.client
+import random
+import re
+import ssl
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html import unescape
+from urllib.parse import urljoin, urlsplit
+
+from config import (
+    FEED_CACHE_PATH, FETCH_BACKOFF, FETCH_MAX_CONNECTIONS, FETCH_PER_HOST, FETCH_RETRIES,
+    FETCH_TIMEOUT, USER_AGENT,
+)
+from metrics import FETCH_BYTES, FETCH_REQUESTS, FETCH_SECONDS, PARSE_SECONDS, timer
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+REDIRECT_STATUS = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+MAX_RETRY_AFTER = 60        # Retry-After の上限（秒）
+
+
+class FetchError(Exception):
+    """フィードを取得できなかった"""
+
+
+class Response:
+    def __init__(self, url, status, headers, body, size=None):
+        self.url = url          # リダイレクト後のURL
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.size = len(body) if size is None else size     # 受信したバイト数（圧縮されたまま）
+
+
+# ── HTTP（ブロッキング、スレッドプールで実行） ──────────────────
+class ConnectionPool:
+    """(scheme, host, port) ごとのkeep-alive接続プール（スレッドセーフ）"""
+
+    def __init__(self, timeout=FETCH_TIMEOUT, max_idle=FETCH_PER_HOST):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.created = 0        # 新規に張った接続の数
+        self._idle = defaultdict(list)
+        self._lock = threading.Lock()
+        self._ssl = ssl.create_default_context()
+
+    def _get(self, key):
+        """(接続, 再利用かどうか)"""
+        with self._lock:
+            if self._idle[key]:
+                return self._idle[key].pop(), True
+            self.created += 1
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout,
+                                               context=self._ssl), False
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def _put(self, key, conn):
+        with self._lock:
+            if len(self._idle[key]) < self.max_idle:
+                self._idle[key].append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, defaultdict(list)
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _send(self, key, target, headers):
+        conn, reused = self._get(key)
+        try:
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+            # サーバー側で切られたkeep-alive接続: 新しい接続で1回だけ送り直す
+            return self._send(key, target, headers)
+        except BaseException:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._put(key, conn)
+        return resp, body
+
+    def request(self, url, headers=None):
+        """GETを1回送ってResponseを返す（リダイレクトは追う）"""
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https") or not parts.hostname:
+                raise FetchError(f"未対応のURLです: {url}")
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            resp, body = self._send((parts.scheme, parts.hostname, port), target, headers or {})
+            location = resp.getheader("Location")
+            if resp.status in REDIRECT_STATUS and location:
+                url = urljoin(url, location)
+                continue
+            return Response(url, resp.status, resp.headers, decode_body(body, resp.headers),
+                            len(body))
+        raise FetchError(f"リダイレクトが多すぎます: {url}")
+
+
+def decode_body(body, headers):
+    """Content-Encoding を解く。壊れた本文は FetchError（再試行しない）"""
+    encoding = (headers.get("Content-Encoding") or "").lower()
+    try:
+        if encoding == "gzip":
+            return gzip.decompress(body)
+        if encoding == "deflate":
+            try:
+                return zlib.decompress(body)
+            except zlib.error:          # zlibヘッダーなしのdeflate
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+    except (zlib.error, EOFError, gzip.BadGzipFile) as e:
+        raise FetchError(f"{encoding} の本文を展開できません: {e}") from e
+    return body
+
+
+def retry_after(response):
+    """Retry-After（秒数）があれば返す"""
+    value = response.headers.get("Retry-After", "")
+    return min(float(value), MAX_RETRY_AFTER) if value.strip().isdigit() else None
+
+
+# ── 非同期の取得 ────────────────────────────────────────────────
+class Fetcher:
+    """フィードを並行取得する。``async with Fetcher() as fetcher:`` で使う。"""
+
+    def __init__(self, timeout=FETCH_TIMEOUT, max_connections=FETCH_MAX_CONNECTIONS,
+                 per_host=FETCH_PER_HOST, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF,
+                 user_agent=USER_AGENT, cache=None):
+        self.cache = cache
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = {"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate",
+                        "Accept": "application/rss+xml, application/atom+xml, "
+                                  "application/xml;q=0.9, */*;q=0.8"}
+        self.pool = ConnectionPool(timeout, max_idle=per_host)
+        self._executor = ThreadPoolExecutor(max_connections, thread_name_prefix="fetch")
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.close()
+
+    async def get(self, url, headers=None):
+        """GET（ホストごとの同時接続制限・再試行つき）"""
+        loop = asyncio.get_running_loop()
+        headers = {**self.headers, **(headers or {})}
+        host = urlsplit(url).hostname
+        for attempt in range(self.retries + 1):
+            delay = None
+            async with self._hosts[host]:
+                try:
+                    response = await loop.run_in_executor(
+                        self._executor, self.pool.request, url, headers)
+                except (OSError, http.client.HTTPException) as e:   # タイムアウトもOSError
+                    error = e
+                else:
+                    if response.status not in RETRY_STATUS:
+                        return response
+                    error = FetchError(f"HTTP {response.status}")
+                    delay = retry_after(response)
+            if attempt == self.retries:
+                raise FetchError(f"{url}: {error}") from error
+            if delay is None:
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+            await asyncio.sleep(delay)
+
+    async def fetch_feed(self, source):
+        """1つのフィードを取得して記事のリストを返す"""
+        url, name = source["url"], source["name"]
+        start = time.perf_counter()
+        try:
+            if self.cache is None:
+                response = await self.get(url)
+            else:
+                response = await self.get(url, self.cache.validators(url))
+                if response.status == 304:
+                    items = self.cache.not_modified(url)
+                    if items is not None:
+                        self._record(name, start, response)
+                        return [dict(item, source=name) for item in items]
+                    response = await self.get(url)     # キャッシュが消えていた
+        except FetchError:
+            self._record(name, start)
+            raise
+        self._record(name, start, response)
+        if response.status >= 400:
+            raise FetchError(f"HTTP {response.status}")
+        try:
+            with timer(PARSE_SECONDS, source=name):
+                articles = parse_feed(response.body, source)
+        except ET.ParseError as e:
+            raise FetchError(f"フィードを解析できません: {e}") from e
+        if self.cache is not None:
+            self.cache.store(url, response.headers, articles)
+        return articles
+
+    @staticmethod
+    def _record(name, start, response=None):
+        FETCH_SECONDS.observe(time.perf_counter() - start, source=name)
+        if response is None:
+            FETCH_REQUESTS.inc(source=name, status="error")
+        else:
+            FETCH_REQUESTS.inc(source=name, status=str(response.status))
+            FETCH_BYTES.inc(response.size, source=name)
+
+    async def _fetch_one(self, source):
+        try:
+            return source, await self.fetch_feed(source), None
+        except (FetchError, OSError, http.client.HTTPException) as e:
+            return source, [], e
+
+    async def stream(self, sources):
+        """取得が終わったフィードから順に (source, articles, error) を返す"""
+        tasks = [asyncio.ensure_future(self._fetch_one(source)) for source in sources]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def iter_feeds(sources, **options):
+    """Fetcher(**options).stream(sources) を開いて閉じるまで"""
+    async with Fetcher(**options) as fetcher:
+        async for item in fetcher.stream(sources):
+            yield item
+
+
+def fetch_articles(sources, cache_path=FEED_CACHE_PATH, **options):
+    """全フィードを並行取得して、記事をまとめたリストを返す
+
+    cache_path のフィードキャッシュを使う（None ならキャッシュしない）。
+    """
+    async def collect(cache):
+        articles = []
+        async for source, items, error in iter_feeds(sources, cache=cache, **options):
+            if error is not None:
+                print(f"  ✗ {source['name']}: {error}")
+            else:
+                print(f"  ✓ {source['name']}: {len(items)}件")
+                articles.extend(items)
+        return articles
+
+    if cache_path is None:
+        return asyncio.run(collect(None))
+    from feed_cache import FeedCache
+    with FeedCache(cache_path) as cache:
+        return asyncio.run(collect(cache))
+
+
+# ── フィードの解析 ──────────────────────────────────────────────
+ATOM = "{http://www.w3.org/2005/Atom}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+TAG = re.compile(r"<[^>]+>")
+SPACE = re.compile(r"\s+")
+
+
+def clean_text(text):
+    """HTMLタグ・実体参照・余分な空白を除く"""
+    return SPACE.sub(" ", unescape(TAG.sub(" ", text or ""))).strip()
+
+
+def parse_date(text):
+    """RFC 822 / ISO 8601 の日時を ISO 8601（UTC）に。解析できなければNone"""
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _find(el, *tags):
+    """最初に見つかった子要素のテキスト"""
+    for tag in tags:
+        child = el.find(tag)
+        if child is not None and (child.text or "").strip():
+            return child.text.strip()
+    return ""
+
+
+def _atom_link(entry):
+    for link in entry.findall(f"{ATOM}link"):
+        if link.get("rel", "alternate") == "alternate" and link.get("href"):
+            return link.get("href")
+    return ""
+
+
+def parse_feed(data, source):
+    """RSS 2.0 / RSS 1.0 (RDF) / Atom のフィードを記事のリストにする"""
+    root = ET.fromstring(data)
+    articles = []
+    if root.tag == f"{ATOM}feed":
+        for entry in root.iter(f"{ATOM}entry"):
+            url = _atom_link(entry)
+            articles.append({
+                "title": clean_text(_find(entry, f"{ATOM}title")),
+                "url": url,
+                "description": clean_text(_find(entry, f"{ATOM}summary", f"{ATOM}content")),
+                "published": parse_date(_find(entry, f"{ATOM}published", f"{ATOM}updated")),
+                "source": source["name"],
+                "guid": _find(entry, f"{ATOM}id") or url,
+            })
+        return articles
+
+    for item in [*root.iter("item"), *root.iter(f"{RSS1}item")]:
+        ns = RSS1 if item.tag == f"{RSS1}item" else ""
+        url = _find(item, f"{ns}link") or item.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about", "")
+        articles.append({
+            "title": clean_text(_find(item, f"{ns}title")),
+            "url": url,
+            "description": clean_text(_find(item, f"{ns}description", f"{CONTENT}encoded")),
+            "published": parse_date(_find(item, "pubDate", f"{DC}date")),
+            "source": source["name"],
+            "guid": _find(item, "guid") or url,
+        })
+    return articles
@@ -1,44 +1,60 @@
-"""エントリーポイント"""
+"""エントリーポイント
 
-import subprocess
-import sys
+    python main.py              1回収集して、レポートをブラウザで開く
+    python main.py --headless   1回収集する（ブラウザを開かない。サーバー・cron用）
+    python main.py --daemon     常駐して、フィードごとの間隔で収集し続ける
+"""
+
+import argparse
+import pathlib
+import webbrowser
 
 from config import NEWS_SOURCES
-from fetcher import fetch_articles
-from summarizer import summarize_all
-from reporter import generate_html
+from pipeline import run
+from reporter import HtmlReport
 
 
 def hello_world():
     print("Hello, World!")
 
 
-def main():
-    print("=== ニュース収集開始 ===")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ニュース収集")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--daemon", action="store_true", help="常駐して収集し続ける")
+    mode.add_argument("--headless", action="store_true", help="ブラウザを開かない")
+    args = parser.parse_args(argv)
 
-    # 1. RSS取得
-    articles = fetch_articles(NEWS_SOURCES)
-    if not articles:
-        print("新しい記事が見つかりませんでした。")
+    if args.daemon:
+        from daemon import run_daemon
+
+        print("=== ニュース収集（常駐モード）開始 ===")
+        report = HtmlReport()
+        print(f"レポート: {report.path}")
+        run_daemon(NEWS_SOURCES, report)
+        print(f"\n=== 停止しました（{report.count} 件をレポートに書き出しました） ===")
         return
 
-    print(f"\n合計 {len(articles)} 件の新着記事を取得しました。")
+    print("=== ニュース収集開始 ===")
 
-    # 2. AI要約
-    print("\n=== AI要約開始 ===")
-    articles = summarize_all(articles)
+    # 取得・重複除去・AI要約・HTMLレポート生成を並行に進める
+    report = HtmlReport()
+    print(f"レポート: {report.path}（要約できた記事から順に追記されます）")
+    run(NEWS_SOURCES, report)
+    if not report.count:
+        print("新しい記事が見つかりませんでした。")
+        return
+    filepath = report.path
 
-    # 3. HTMLレポート生成
-    print("\n=== レポート生成 ===")
-    filepath = generate_html(articles)
+    print(f"\n合計 {report.count} 件の新着記事をレポートに書き出しました: {filepath}")
 
-    # 4. ブラウザで自動オープン
-    print("\n=== ブラウザで表示 ===")
-    try:
-        subprocess.run(["open", filepath], check=True)
-        print(f"ブラウザで開きました: {filepath}")
-    except Exception as e:
-        print(f"ブラウザを開けませんでした。手動で開いてください: {filepath}\nエラー: {e}")
+    # ブラウザで自動オープン
+    if not args.headless:
+        print("\n=== ブラウザで表示 ===")
+        if webbrowser.open(pathlib.Path(filepath).resolve().as_uri()):
+            print(f"ブラウザで開きました: {filepath}")
+        else:
+            print(f"ブラウザを開けませんでした。手動で開いてください: {filepath}")
 
     print("\n=== 完了 ===")
 
@@ -0,0 +1,196 @@
+"""パイプラインの計測（件数・所要時間）
+
+各モジュールはここで定義したメトリクスに記録する。1回の記録は
+ロック1回と数回の足し算（ヒストグラムは二分探索も）なので、本番でも
+常に有効にしておける。
+
+    METRICS.prometheus()        Prometheus のテキスト形式（常駐モードの GET /metrics）
+    METRICS.write_jsonl(path)   その時点の値を JSON 1行として追記する
+                                （ヒストグラムには p50 / p90 / p99 の推定値を付ける）
+
+    with timer(FETCH_SECONDS, source="NHK"):   # 所要時間をヒストグラムに記録
+        ...
+"""
+
+import bisect
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help):
+        self.name, self.help = name, help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_labels(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in self._values.items()]
+
+    def snapshot(self):
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in self._values.items()]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(buckets)
+        self._values = {}       # key → [バケットごとの件数（+Inf を含む）, 合計, 件数]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _labels(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def quantile(self, q, **labels):
+        """バケットから線形補間した分位点の推定値（Prometheus の histogram_quantile と同じ）"""
+        with self._lock:
+            entry = self._values.get(_labels(labels))
+            counts = list(entry[0]) if entry else None
+        return self._quantile(q, counts)
+
+    def _quantile(self, q, counts):
+        total = sum(counts) if counts else 0
+        if not total:
+            return None
+        rank, seen = q * total, 0
+        for i, count in enumerate(counts):
+            if seen + count >= rank and count:
+                if i == len(self.buckets):          # +Inf のバケット
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts), total, n) for key, (counts, total, n) in self._values.items()]
+        out = []
+        for key, counts, total, n in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                out.append((f"{self.name}_bucket", key, (("le", _number(bound)),), cumulative))
+            out.append((f"{self.name}_sum", key, (), total))
+            out.append((f"{self.name}_count", key, (), n))
+        return out
+
+    def snapshot(self):
+        with self._lock:
+            values = [(key, list(counts), total, n) for key, (counts, total, n) in self._values.items()]
+        return [{"labels": dict(key), "count": n, "sum": round(total, 6),
+                 **{f"p{round(q * 100)}": self._quantile(q, counts) for q in QUANTILES}}
+                for key, counts, total, n in values]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _add(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help):
+        return self._add(Counter(name, help))
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, buckets))
+
+    def prometheus(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, extra, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key, extra)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def write_jsonl(self, path):
+        line = json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **self.snapshot()},
+                          ensure_ascii=False)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+@contextlib.contextmanager
+def timer(histogram, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+# ── メトリクス ──────────────────────────────────────────────────
+METRICS = Registry()
+
+FETCH_SECONDS = METRICS.histogram(
+    "news_fetch_seconds", "フィード1件の取得時間（再試行・待ちを含む）")
+FETCH_BYTES = METRICS.counter(
+    "news_fetch_bytes_total", "受信したフィードのバイト数（圧縮されたまま）")
+FETCH_REQUESTS = METRICS.counter(
+    "news_fetch_requests_total", "フィードの取得結果（status: 200 / 304 / error など）")
+PARSE_SECONDS = METRICS.histogram(
+    "news_parse_seconds", "フィード1件の解析時間", FAST_BUCKETS)
+ARTICLES = METRICS.counter(
+    "news_articles_total", "段ごとの記事数（stage: fetched / new / unique / duplicate / rendered）")
+SUMMARY_SECONDS = METRICS.histogram(
+    "news_summary_seconds", "要約モデルの呼び出し1回の時間")
+SUMMARY_ARTICLES = METRICS.counter(
+    "news_summary_articles_total", "要約した記事数（result: model / cached / fallback）")
+SUMMARY_TOKENS = METRICS.counter(
+    "news_summary_tokens_total", "要約モデルのトークン数（kind: input / output）")
+RENDER_SECONDS = METRICS.histogram(
+    "news_render_seconds", "記事1件のレポートへの書き出し時間", FAST_BUCKETS)
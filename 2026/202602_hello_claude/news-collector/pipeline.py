@@ -0,0 +1,184 @@
+"""取得 → 重複除去 → 要約 → レポート出力 のパイプライン
+
+各段は上限つきの asyncio.Queue でつながって並行に動く。
+
+    fetch ──▶ dedupe ──▶ summarize ×SUMMARY_WORKERS ──▶ render
+
+- fetch: 取得できたフィードから順に、未読の記事（seen.SeenStore）を流す
+  （fetcher.Fetcher.stream）
+- dedupe: 同じ guid / URL の記事と、類似記事（dedupe.DuplicateIndex）を落とす
+- summarize: キューにたまった記事を最大 SUMMARY_BATCH_SIZE 件ずつ
+  summarize_all に渡す（ブロッキングなのでスレッドで実行）
+- render: 要約できた記事から HtmlReport に追記する
+
+記事を既読として記録するのは、レポートに書き出したとき（と重複として
+落としたとき）。途中で止まっても、書き出していない記事は次回また新着になる。
+
+キューが満杯なら前の段は空くまで待つので、遅い段があっても記事が
+メモリにたまり続けることはない。最初の記事は最初のフィードと要約が
+終わった時点でレポートに出る。
+"""
+
+import asyncio
+import contextlib
+
+from config import (
+    DEDUPE_PATH, FEED_CACHE_PATH, METRICS_PATH, PIPELINE_QUEUE_SIZE, SEEN_PATH,
+    SUMMARY_BATCH_SIZE, SUMMARY_WORKERS,
+)
+from fetcher import Fetcher
+from metrics import ARTICLES, METRICS, RENDER_SECONDS, timer
+
+DONE = object()     # 前の段が終わった印
+
+
+def article_key(article):
+    """guid か URL。どちらもなければ空文字列（同じ記事かどうか判定しない）"""
+    return article.get("guid") or article.get("url") or ""
+
+
+async def publish(source, items, out, seen=None):
+    """1つのフィードの（未読の）記事を次の段へ流し、流した件数を返す"""
+    ARTICLES.inc(len(items), stage="fetched")
+    if seen is None:
+        print(f"  ✓ {source['name']}: {len(items)}件")
+    else:
+        new = seen.select_new(items)
+        print(f"  ✓ {source['name']}: {len(items)}件（新着 {len(new)}件）")
+        items = new
+    ARTICLES.inc(len(items), stage="new")
+    for article in items:
+        await out.put(article)
+    return len(items)
+
+
+async def fetch_stage(fetcher, sources, out, seen=None):
+    async for source, items, error in fetcher.stream(sources):
+        if error is not None:
+            print(f"  ✗ {source['name']}: {error}")
+        else:
+            await publish(source, items, out, seen)
+    await out.put(DONE)
+
+
+async def dedupe_stage(inbox, out, consumers, index=None, exact=True, seen=None):
+    """exact なら同じ guid / URL の記事を落とす（キーは実行中ずっと覚えておく）。
+    落とした記事は seen に既読として記録する。"""
+    keys = set()
+    while (article := await inbox.get()) is not DONE:
+        duplicate = False
+        key = article_key(article) if exact else ""
+        if key:
+            duplicate = key in keys
+            keys.add(key)
+        if not duplicate and index is not None:
+            duplicate = index.check(article) is not None
+        if duplicate:
+            ARTICLES.inc(stage="duplicate")
+            if seen is not None:
+                seen.add_many([article])
+            continue
+        ARTICLES.inc(stage="unique")
+        await out.put(article)
+    for _ in range(consumers):
+        await out.put(DONE)
+
+
+async def summarize_stage(inbox, out, summarize_all, batch_size):
+    loop = asyncio.get_running_loop()
+    done = False
+    while not done:
+        batch = []
+        item = await inbox.get()
+        while True:
+            if item is DONE:
+                done = True
+                break
+            batch.append(item)
+            if len(batch) == batch_size or inbox.empty():
+                break
+            item = inbox.get_nowait()
+        if batch:
+            for article in await loop.run_in_executor(None, summarize_all, batch):
+                await out.put(article)
+    await out.put(DONE)
+
+
+async def render_stage(inbox, report, producers, seen=None):
+    """書き出した記事を seen に既読として記録する"""
+    while producers:
+        article = await inbox.get()
+        if article is DONE:
+            producers -= 1
+        else:
+            with timer(RENDER_SECONDS):
+                report.add(article)
+            ARTICLES.inc(stage="rendered")
+            if seen is not None:
+                seen.add_many([article])
+
+
+async def run_async(sources, report, summarize_all, fetcher, index=None, seen=None,
+                    queue_size=PIPELINE_QUEUE_SIZE, workers=SUMMARY_WORKERS,
+                    batch_size=SUMMARY_BATCH_SIZE):
+    fetched, unique, summarized = (asyncio.Queue(queue_size) for _ in range(3))
+    tasks = [
+        asyncio.ensure_future(fetch_stage(fetcher, sources, fetched, seen)),
+        asyncio.ensure_future(dedupe_stage(fetched, unique, workers, index, seen=seen)),
+        *(asyncio.ensure_future(summarize_stage(unique, summarized, summarize_all, batch_size))
+          for _ in range(workers)),
+        asyncio.ensure_future(render_stage(summarized, report, workers, seen)),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run(sources, report=None, summarize_all=None, cache_path=FEED_CACHE_PATH,
+        dedupe_path=DEDUPE_PATH, seen_path=SEEN_PATH, metrics_path=METRICS_PATH, **options):
+    """パイプラインを最後まで実行し、書き終えたレポート（HtmlReport）を返す
+
+    summarize_all の既定は summarizer.summarize_all。cache_path / dedupe_path /
+    seen_path が None ならフィードキャッシュ / 類似記事の索引 / 既読の記録を
+    使わない（既読を記録しなければ、取得した記事はすべて新着。前回の実行で
+    索引に登録した記事も、自分自身とは比べないので重複にはならない）。終わったら
+    計測値を metrics_path に1行追記する（None なら書かない）。options のうち
+    queue_size / workers / batch_size 以外は Fetcher に渡す。
+    """
+    from reporter import HtmlReport
+
+    if summarize_all is None:
+        from summarizer import summarize_all
+    stage_options = {name: options.pop(name) for name in ("queue_size", "workers", "batch_size")
+                     if name in options}
+
+    async def go(cache, index, seen):
+        async with Fetcher(cache=cache, **options) as fetcher:
+            await run_async(sources, report, summarize_all, fetcher, index, seen,
+                            **stage_options)
+
+    report = report or HtmlReport()
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(report)
+        asyncio.run(go(*open_stores(stack, cache_path, dedupe_path, seen_path)))
+    if metrics_path is not None:
+        METRICS.write_jsonl(metrics_path)
+    return report
+
+
+def open_stores(stack, cache_path=FEED_CACHE_PATH, dedupe_path=DEDUPE_PATH,
+                seen_path=SEEN_PATH):
+    """(FeedCache, DuplicateIndex, SeenStore) を開いて stack に登録する（パスが None なら None）"""
+    cache = index = seen = None
+    if cache_path is not None:
+        from feed_cache import FeedCache
+        cache = stack.enter_context(FeedCache(cache_path))
+    if dedupe_path is not None:
+        from dedupe import DuplicateIndex
+        index = stack.enter_context(DuplicateIndex(dedupe_path))
+    if seen_path is not None:
+        from seen import SeenStore
+        seen = stack.enter_context(SeenStore(seen_path))
+    return cache, index, seen
@@ -0,0 +1,236 @@
+"""HTMLレポートの生成
+
+レポートは収集した日ごと・ページ（REPORT_PAGE_SIZE 件）ごとのHTMLに分け、
+記事を追記していく。実行のたびに書くのは新しい記事と小さな目次だけなので、
+記事が何千件たまっても1回の出力にかかる時間は新着の件数で決まる。
+
+    output/
+      index.html              日付とページの目次
+      index.json              日ごとのページ数・記事数
+      2026-02-03/001.html     その日の1〜100件目
+      2026-02-03/002.html     101件目〜
+
+ページは先頭（<head> とナビゲーション）を書いたあとは追記するだけで、
+書き換えない（</body></html> は HTML では省略できる）。ページが一杯に
+なったら末尾に次のページへのリンクを足して、新しいページを始める。
+画面外の記事は content-visibility: auto でブラウザが描画を後回しにする。
+日付のディレクトリと目次は、最初の記事を追記するときに作る（記事のない
+実行では何も書かない）。
+
+リンクにするのは http / https のURLだけで、それ以外（javascript: など）は
+タイトルを文字として出す。
+"""
+
+import html
+import json
+import os
+import string
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from config import OUTPUT_DIR, REPORT_PAGE_SIZE
+
+STYLE = """<style>
+body { font-family: sans-serif; max-width: 860px; margin: 2em auto; padding: 0 1em; color: #222; }
+nav { margin: 1em 0; font-size: 0.9em; }
+a { color: #1a4f8b; text-decoration: none; }
+article { border-bottom: 1px solid #ddd; padding: 0.8em 0;
+          content-visibility: auto; contain-intrinsic-size: auto 7em; }
+article h2 { font-size: 1.05em; margin: 0 0 0.3em; }
+.meta { color: #888; font-size: 0.85em; margin: 0; }
+.summary { margin: 0.4em 0 0; line-height: 1.6; }
+</style>"""
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>ニュースまとめ {day}（{page}ページ）</title>
+{style}
+</head>
+<body>
+<h1>ニュースまとめ {day}（{page}ページ）</h1>
+<nav><a href="../index.html">目次</a>{prev}</nav>
+"""
+PAGE_NEXT = """<nav><a href="{name}">次のページ →</a></nav>
+"""
+ARTICLE = """<article>
+<h2><a href="{url}" target="_blank" rel="noopener">{title}</a></h2>
+<p class="meta">{source}{published}</p>
+<p class="summary">{summary}</p>
+</article>
+"""
+ARTICLE_NO_LINK = """<article>
+<h2>{title}</h2>
+<p class="meta">{source}{published}</p>
+<p class="summary">{summary}</p>
+</article>
+"""
+LINK_SCHEMES = ("http", "https")
+
+INDEX_HEAD = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>ニュースまとめ</title>
+{style}
+</head>
+<body>
+<h1>ニュースまとめ</h1>
+"""
+INDEX_DAY = """<h2>{day}（{count}件）</h2>
+<nav>{pages}</nav>
+"""
+
+
+def compile_template(template):
+    """str.format 形式のテンプレートを (文字列, フィールド名) の列に1回だけ分解し、
+    それをつなぐだけの関数を返す"""
+    parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+
+    def render(**fields):
+        return "".join(literal if field is None else literal + str(fields[field])
+                       for literal, field in parts)
+    return render
+
+
+render_page_head = compile_template(PAGE_HEAD)
+render_page_next = compile_template(PAGE_NEXT)
+render_article_html = compile_template(ARTICLE)
+render_article_text = compile_template(ARTICLE_NO_LINK)
+render_index_head = compile_template(INDEX_HEAD)
+render_index_day = compile_template(INDEX_DAY)
+
+
+def page_name(page):
+    return f"{page:03d}.html"
+
+
+def is_link(url):
+    """リンクにしてよいURL（http / https）か"""
+    try:
+        return urlsplit(url).scheme.lower() in LINK_SCHEMES
+    except ValueError:
+        return False
+
+
+def render_article(article):
+    published = article.get("published")
+    fields = dict(
+        title=html.escape(article["title"]),
+        source=html.escape(article["source"]),
+        published=f" ・ {html.escape(published[:16].replace('T', ' '))}" if published else "",
+        summary=html.escape(article.get("summary") or article.get("description", "")),
+    )
+    url = article.get("url") or ""
+    if is_link(url):
+        return render_article_html(url=html.escape(url), **fields)
+    return render_article_text(**fields)
+
+
+def _write_atomic(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class HtmlReport:
+    """日付・ページ分けしたレポートに記事を追記する。``with HtmlReport() as report:`` で使う。
+
+    path は目次（index.html）。記事を1件も追記しなければ何も書かない。now を
+    渡さなければ、日付が変わると次の記事から新しい日のページに書く（常駐モード用）。
+    """
+
+    def __init__(self, output_dir=OUTPUT_DIR, page_size=REPORT_PAGE_SIZE, now=None):
+        self.output_dir = output_dir
+        self.page_size = page_size
+        self.path = os.path.join(output_dir, "index.html")
+        self.count = 0          # この実行で追記した記事数
+        self._clock = (lambda: now) if now else datetime.now
+        self._file = None
+        self.day = self._entry = None       # 最初の add() で決める
+        try:
+            with open(os.path.join(output_dir, "index.json"), encoding="utf-8") as f:
+                self.days = {day: entry for day, entry in json.load(f).items()
+                             if entry["count"]}
+        except (OSError, ValueError):
+            self.days = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start_day(self, day):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.day = day
+        os.makedirs(os.path.join(self.output_dir, day), exist_ok=True)
+        self._entry = self.days.setdefault(day, {"pages": 0, "count": 0})
+
+    def _page_path(self, page):
+        return os.path.join(self.output_dir, self.day, page_name(page))
+
+    def _open_page(self):
+        """今のページ（一杯なら次のページ）を追記用に開く"""
+        entry = self._entry
+        if entry["pages"] and entry["count"] < entry["pages"] * self.page_size:
+            self._file = open(self._page_path(entry["pages"]), "a", encoding="utf-8")
+            return
+        if entry["pages"]:
+            with open(self._page_path(entry["pages"]), "a", encoding="utf-8") as f:
+                f.write(render_page_next(name=page_name(entry["pages"] + 1)))
+        entry["pages"] += 1
+        page = entry["pages"]
+        prev = f' ・ <a href="{page_name(page - 1)}">← 前のページ</a>' if page > 1 else ""
+        self._file = open(self._page_path(page), "w", encoding="utf-8")
+        self._file.write(render_page_head(style=STYLE, day=self.day, page=page, prev=prev))
+        self.write_index()
+
+    def add(self, article):
+        day = f"{self._clock():%Y-%m-%d}"
+        if day != self.day:
+            self._start_day(day)
+        if self._file is None or self._entry["count"] >= self._entry["pages"] * self.page_size:
+            if self._file is not None:
+                self._file.close()
+            self._open_page()
+        self._file.write(render_article(article))
+        self._file.flush()
+        self._entry["count"] += 1
+        self.count += 1
+
+    def write_index(self):
+        """index.json と目次を書き直す（日数とページ数に比例する）"""
+        _write_atomic(os.path.join(self.output_dir, "index.json"),
+                      json.dumps(self.days, ensure_ascii=False, indent=1))
+        parts = [render_index_head(style=STYLE)]
+        for day in sorted(self.days, reverse=True):
+            entry = self.days[day]
+            if not entry["count"] and day != self.day:
+                continue
+            pages = " ・ ".join(f'<a href="{day}/{page_name(page)}">{page}</a>'
+                                for page in range(1, entry["pages"] + 1))
+            parts.append(render_index_day(day=day, count=entry["count"], pages=pages or "—"))
+        _write_atomic(self.path, "".join(parts))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.count:
+            self.write_index()
+
+
+def generate_html(articles, output_dir=OUTPUT_DIR):
+    """記事のリストをレポートに追記し、目次のパスを返す"""
+    with HtmlReport(output_dir) as report:
+        for article in articles:
+            report.add(article)
+    print(f"  レポートを保存しました: {report.path}（{report.count}件）")
+    return report.path
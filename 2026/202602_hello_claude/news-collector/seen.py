@@ -0,0 +1,125 @@
+"""既読記事の記録（新着の判定）
+
+レポートに書き出した記事を、正規化したURLと guid をキーに SQLite（WAL）へ
+記録する。フィードごとに、記事のキーをまとめて1回で照会する。
+
+select_new() で新着とした記事は、add_many() で記録するまで「処理中」として
+メモリに覚えるだけなので、別のフィードが同じ記事を流すことはなく、要約や
+出力の前に止まった記事は次の実行でまた新着になる。
+
+フィードに残っている記事は取得のたびに記録時刻を更新し、ttl_days の間
+一度も見かけなかった記事は compact() で消す。
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import SEEN_PATH, SEEN_TTL_DAYS
+
+# URLから落とすクエリ（流入元の計測用）
+TRACKING_PARAMS = {"fbclid", "gclid", "yclid", "mc_cid", "mc_eid", "ref"}
+CHUNK = 500                 # IN (...) 1回あたりのキー数（SQLite の変数の上限より少なく）
+
+
+def canonical_url(url):
+    """スキーム・ホストを小文字にし、既定のポート・フラグメント・計測用クエリを除く
+
+    解析できないURL（壊れた IPv6 アドレスや数字でないポート）はそのまま返す。
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return url
+    default = {"http": 80, "https": 443}.get(parts.scheme.lower())
+    if port and port != default:
+        host = f"{host}:{port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in TRACKING_PARAMS and not k.startswith("utm_"))
+    return urlunsplit((parts.scheme.lower(), host, parts.path or "/", urlencode(query), ""))
+
+
+def article_keys(article):
+    """正規化したURLと guid。どちらもない記事は、配信元とタイトル・本文のハッシュ"""
+    keys = {"u:" + canonical_url(article["url"])} if article.get("url") else set()
+    if article.get("guid"):
+        keys.add("g:" + article["guid"])
+    if not keys:
+        text = "\0".join(article.get(name) or "" for name in ("source", "title", "description"))
+        keys.add("h:" + hashlib.sha256(text.encode()).hexdigest())
+    return keys
+
+
+class SeenStore:
+    def __init__(self, path=SEEN_PATH, ttl_days=SEEN_TTL_DAYS):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.ttl = ttl_days * 86400
+        self._pending = set()       # 新着として流したが、まだ記録していないキー
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen ("
+                        "key TEXT PRIMARY KEY, seen_at REAL NOT NULL) WITHOUT ROWID")
+        self.db.execute("CREATE INDEX IF NOT EXISTS seen_seen_at ON seen (seen_at)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.compact()
+        self.db.close()
+
+    def seen_keys(self, keys):
+        """keys のうち記録済みのもの"""
+        keys = list(keys)
+        found = set()
+        for i in range(0, len(keys), CHUNK):
+            chunk = keys[i:i + CHUNK]
+            found.update(key for key, in self.db.execute(
+                f"SELECT key FROM seen WHERE key IN ({','.join('?' * len(chunk))})", chunk))
+        return found
+
+    def select_new(self, articles):
+        """未読で処理中でもない記事を返し、処理中として覚える
+
+        既読の記事は記録時刻を更新する（まとめて1回）。新着の記事はここでは
+        記録しない。
+        """
+        keys = [article_keys(article) for article in articles]
+        found = self.seen_keys(set().union(*keys))
+        new, old = [], set()
+        for article, ks in zip(articles, keys):
+            if ks & found:
+                old |= ks
+            elif not ks & self._pending:
+                self._pending |= ks
+                new.append(article)
+        self._record(old)
+        return new
+
+    def add_many(self, articles):
+        """記事を既読として記録する（レポートに書き出した・重複として落とした記事）"""
+        keys = set().union(*map(article_keys, articles))
+        self._pending -= keys
+        self._record(keys)
+
+    def _record(self, keys):
+        now = time.time()
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO seen VALUES (?, ?)",
+                                [(key, now) for key in keys])
+
+    def compact(self, now=None):
+        """ttl_days の間見かけなかった記事を消す"""
+        now = time.time() if now is None else now
+        with self.db:
+            self.db.execute("DELETE FROM seen WHERE seen_at < ?", (now - self.ttl,))
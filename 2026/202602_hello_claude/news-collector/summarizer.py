@@ -0,0 +1,262 @@
+"""記事のAI要約
+
+Summarizer は記事を最大 batch_size 件ずつまとめて1回のモデル呼び出しで
+要約し、同時に実行する呼び出しを workers 件までに抑える。
+
+要約はタイトルと本文のハッシュをキーに SummaryCache（SQLite）へ保存し、
+同じ内容の記事（転載や、再取得した変更のない記事）は二度と要約しない。
+同時に要約中の記事と同じ内容の記事は、その結果を待って使う。
+
+モデルは backend で差し替えられる。backend は記事のリストを受け取り、
+同じ順の要約文のリストを返す callable:
+
+    AnthropicBackend()      Anthropic API（既定）
+    StubBackend()           API を呼ばない決定的なスタブ（テスト・オフライン用）
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import (
+    SUMMARY_BACKEND, SUMMARY_BATCH_SIZE, SUMMARY_CACHE_MAX_AGE, SUMMARY_CACHE_PATH,
+    SUMMARY_MAX_TOKENS, SUMMARY_MODEL, SUMMARY_WORKERS,
+)
+from metrics import SUMMARY_ARTICLES, SUMMARY_SECONDS, SUMMARY_TOKENS, timer
+
+PROMPT = """次のニュース記事をそれぞれ日本語で2〜3文に要約してください。
+記事と同じ順に、要約文の文字列だけを要素とするJSON配列を出力してください。
+
+{articles}"""
+ARTICLE = """[{number}] タイトル: {title}
+本文: {description}"""
+
+FALLBACK_CHARS = 200        # 要約できなかった記事は説明文の先頭で代用する
+PROMPT_VERSION = 1          # PROMPT を変えたら上げる（キャッシュを無効にする）
+
+
+class SummaryError(Exception):
+    """モデルの応答から要約を取り出せなかった"""
+
+
+# ── バックエンド ────────────────────────────────────────────────
+class AnthropicBackend:
+    """Anthropic API で要約する。使ったトークン数は SUMMARY_TOKENS に記録する。"""
+
+    def __init__(self, model=SUMMARY_MODEL, max_tokens=SUMMARY_MAX_TOKENS):
+        try:
+            import anthropic
+        except ImportError:
+            raise SystemExit("要約には anthropic が必要です: pip install anthropic")
+        self.name = f"anthropic:{model}"
+        self.model = model
+        self.max_tokens = max_tokens
+        self.client = anthropic.Anthropic()     # ANTHROPIC_API_KEY を使う
+
+    def __call__(self, articles):
+        text = "\n\n".join(ARTICLE.format(number=i, **article)
+                           for i, article in enumerate(articles, 1))
+        message = self.client.messages.create(
+            model=self.model,
+            max_tokens=self.max_tokens * len(articles),
+            messages=[{"role": "user", "content": PROMPT.format(articles=text)}],
+        )
+        SUMMARY_TOKENS.inc(message.usage.input_tokens, kind="input")
+        SUMMARY_TOKENS.inc(message.usage.output_tokens, kind="output")
+        return parse_summaries(message.content[0].text, len(articles))
+
+
+class StubBackend:
+    """本文の先頭を要約とする決定的なバックエンド"""
+
+    name = "stub"
+
+    def __init__(self, chars=80):
+        self.chars = chars
+
+    def __call__(self, articles):
+        return [f"{article['title']}: {article['description'][:self.chars]}".rstrip(": ")
+                for article in articles]
+
+
+BACKENDS = {"anthropic": AnthropicBackend, "stub": StubBackend}
+
+
+def parse_summaries(text, count):
+    """応答のJSON配列から count 件の要約文を取り出す"""
+    start, end = text.find("["), text.rfind("]")
+    try:
+        summaries = json.loads(text[start:end + 1]) if 0 <= start < end else None
+    except ValueError:
+        summaries = None
+    if (not isinstance(summaries, list) or len(summaries) != count
+            or not all(isinstance(s, str) for s in summaries)):
+        raise SummaryError(f"{count}件の要約を含むJSON配列ではありません: {text[:80]!r}")
+    return [s.strip() for s in summaries]
+
+
+# ── キャッシュ ──────────────────────────────────────────────────
+def content_key(article, backend_name=""):
+    """タイトルと本文（正規化）のハッシュ"""
+    text = unicodedata.normalize("NFKC", f"{article['title']}\n{article['description']}")
+    text = " ".join(text.split())
+    return hashlib.sha256(f"{backend_name}\0{PROMPT_VERSION}\0{text}".encode()).hexdigest()
+
+
+class SummaryCache:
+    """content_key → 要約文（SQLite, WAL）。スレッド間で共有できる。"""
+
+    def __init__(self, path=SUMMARY_CACHE_PATH, max_age=SUMMARY_CACHE_MAX_AGE):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_age = max_age
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS summaries ("
+                        "key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)")
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        keys = list(set(keys))
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):      # SQLite の変数の上限より少なく
+                chunk = keys[i:i + 500]
+                found.update(self.db.execute(
+                    f"SELECT key, summary FROM summaries WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk))
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        with self._lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)",
+                                [(key, summary, now) for key, summary in items])
+
+    def prune(self, now=None):
+        """max_age より古い要約を消す"""
+        now = time.time() if now is None else now
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.max_age,))
+
+    def close(self):
+        self.prune()
+        self.db.close()
+
+
+# ── 要約 ────────────────────────────────────────────────────────
+class Summarizer:
+    def __init__(self, backend=None, cache=None, batch_size=SUMMARY_BATCH_SIZE,
+                 workers=SUMMARY_WORKERS):
+        self.backend = backend or BACKENDS[SUMMARY_BACKEND]()
+        self.cache = cache
+        self.batch_size = batch_size
+        self.calls = 0                  # モデル呼び出しの回数
+        self.cached = 0                 # キャッシュ（または同時実行中の結果）を使った記事数
+        self._slots = threading.BoundedSemaphore(workers)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="summarize")
+        self._inflight = {}             # key → Future（要約中）
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._executor.shutdown()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _call(self, articles):
+        with self._slots:
+            with self._lock:
+                self.calls += 1
+            with timer(SUMMARY_SECONDS):
+                return self.backend(articles)
+
+    def _run_batch(self, keys, articles, futures):
+        try:
+            try:
+                summaries = list(self._call(articles))
+                if len(summaries) != len(articles):
+                    raise SummaryError(f"{len(articles)}件に対して要約が{len(summaries)}件でした")
+            except Exception as e:      # バックエンドの種類を問わず、記事は落とさない
+                print(f"  ✗ 要約に失敗しました（{len(articles)}件）: {e}")
+                SUMMARY_ARTICLES.inc(len(articles), result="fallback")
+                for future, article in zip(futures, articles):
+                    future.set_result(article["description"][:FALLBACK_CHARS])
+                return
+            SUMMARY_ARTICLES.inc(len(articles), result="model")
+            for future, summary in zip(futures, summaries):
+                future.set_result(summary)
+            if self.cache is not None:  # 待っている呼び出し元を先に返してから保存する
+                try:
+                    self.cache.put_many(zip(keys, summaries))
+                except sqlite3.Error as e:
+                    print(f"  ✗ 要約をキャッシュに保存できませんでした: {e}")
+        except BaseException as e:      # 待っている呼び出し元を止めたままにしない
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                for key in keys:
+                    self._inflight.pop(key, None)
+
+    def summarize_all(self, articles):
+        """各記事に summary を付けて返す"""
+        name = getattr(self.backend, "name", type(self.backend).__name__)
+        keys = [content_key(article, name) for article in articles]
+        results, todo = {}, {}          # key → Future / key → 要約する記事
+        with self._lock:                # キャッシュ → 要約中 の順に、ロックしたまま調べる
+            cached = self.cache.get_many(keys) if self.cache is not None else {}
+            for key, article in zip(keys, articles):
+                if key in cached or key in results:
+                    continue
+                if key in self._inflight:
+                    results[key] = self._inflight[key]
+                else:
+                    results[key] = self._inflight[key] = Future()
+                    todo[key] = article
+            cached_count = sum(1 for key in keys if key not in todo)
+            self.cached += cached_count
+        SUMMARY_ARTICLES.inc(cached_count, result="cached")
+
+        pending = list(todo.items())
+        jobs = []
+        for i in range(0, len(pending), self.batch_size):
+            batch_keys, batch = zip(*pending[i:i + self.batch_size])
+            futures = [results[key] for key in batch_keys]
+            if i + self.batch_size >= len(pending):     # 最後のバッチはこのスレッドで
+                self._run_batch(batch_keys, batch, futures)
+            else:
+                jobs.append(self._executor.submit(self._run_batch, batch_keys, batch, futures))
+        for job in jobs:
+            job.result()
+
+        for key, article in zip(keys, articles):
+            article["summary"] = cached[key] if key in cached else results[key].result()
+        return articles
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_summarizer():
+    """設定どおりのバックエンドとキャッシュの Summarizer（プロセスに1つ、終了時に閉じる）"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Summarizer(cache=SummaryCache())
+            atexit.register(_default.close)
+    return _default
+
+
+def summarize_all(articles):
+    """既定の Summarizer で要約する"""
+    return default_summarizer().summarize_all(articles)
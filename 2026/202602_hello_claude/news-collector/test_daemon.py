@@ -0,0 +1,120 @@
+"""daemon.py のテスト（test_fetcher のスタブHTTPサーバーに対して常駐させる）"""
+
+import asyncio
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from daemon import Daemon
+from fetcher import Fetcher
+from reporter import HtmlReport
+from seen import SeenStore
+from summarizer import StubBackend, Summarizer
+from test_fetcher import Stub
+
+
+class SlowBackend(StubBackend):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    def __call__(self, articles):
+        threading.Event().wait(self.delay)
+        return super().__call__(articles)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+async def get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return head.split(b"\r\n", 1)[0].decode(), body
+
+
+def start(tmp_path, srcs, backend, **options):
+    """(Daemon, 実行中のタスク, 後片付け) を返す"""
+    summarizer = Summarizer(backend, workers=2)
+    seen = SeenStore(str(tmp_path / "seen.sqlite3"))
+    report = HtmlReport(str(tmp_path / "output"))
+    fetcher = Fetcher(retries=0, backoff=0)
+    daemon = Daemon(srcs, report, summarizer.summarize_all, fetcher, seen=seen, jitter=0,
+                    workers=2, batch_size=2, metrics_path=None, **options)
+    task = asyncio.ensure_future(daemon.run(port=0))
+
+    def close():
+        fetcher.close()
+        summarizer.close()
+        report.close()
+        seen.close()
+    return daemon, task, close
+
+
+async def wait_for_port(daemon):
+    while daemon.port is None:
+        await asyncio.sleep(0.01)
+
+
+def test_polls_each_source_and_reports_status(server, tmp_path):
+    srcs = [{"name": "rss", "url": server + "/rss", "interval": 0.2},
+            {"name": "missing", "url": server + "/missing", "interval": 0.2}]
+
+    async def go():
+        daemon, task, close = start(tmp_path, srcs, StubBackend())
+        await wait_for_port(daemon)
+        await asyncio.sleep(0.7)                # 3〜4回ずつ取得する
+        status, body = await get(daemon.port, "/status")
+        health = await get(daemon.port, "/healthz")
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        close()
+        return status, json.loads(body), health
+
+    status, body, health = asyncio.run(go())
+    assert status == "HTTP/1.1 200 OK"
+    assert health == ("HTTP/1.1 200 OK", b"ok\n")
+    rss, missing = body["sources"]
+    assert rss["fetches"] >= 3 and rss["errors"] == 0
+    assert rss["articles"] == 2 * rss["fetches"]
+    assert rss["new"] == 2                      # 2回目以降は既読
+    assert missing["fetches"] >= 3 and missing["errors"] == missing["fetches"]
+    assert missing["last_error"] == "HTTP 404"  # 失敗するフィードがあっても他は取得を続ける
+    assert body["rendered"] == 2
+
+
+def test_shutdown_drains_queued_articles(server, tmp_path):
+    srcs = [{"name": "rss", "url": server + "/rss", "interval": 60},
+            {"name": "atom", "url": server + "/atom", "interval": 60}]
+
+    async def go():
+        daemon, task, close = start(tmp_path, srcs, SlowBackend(0.3), shutdown_timeout=5)
+        await wait_for_port(daemon)
+        await asyncio.sleep(0.15)               # 取得は終わり、要約の途中
+        rendered_before = daemon.report.count
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        rendered_after = daemon.report.count
+        new = daemon.seen.select_new([{"url": "https://example.com/1", "guid": "id-1"},
+                                      {"url": "https://example.com/a"}])
+        close()
+        return rendered_before, rendered_after, new
+
+    rendered_before, rendered_after, new = asyncio.run(go())
+    assert rendered_before == 0
+    assert rendered_after == 3                  # 停止前に要約・出力し終えた
+    assert new == []                            # 既読として記録されている
@@ -0,0 +1,73 @@
+"""dedupe.py のテスト"""
+
+import time
+
+from dedupe import DuplicateIndex, minhash, similarity
+
+TEXT = ("政府は3日、来年度の予算案を閣議決定した。一般会計の総額は過去最大の"
+        "115兆円となり、防衛費と社会保障費の増加が主な要因となった。")
+
+
+def article(url, title="来年度予算案を閣議決定", description=TEXT):
+    return {"url": url, "title": title, "description": description}
+
+
+def test_exact_repeat_under_another_url(tmp_path):
+    with DuplicateIndex(str(tmp_path / "dedupe.sqlite3")) as index:
+        assert index.check(article("https://a.example/1")) is None
+        match = index.check(article("https://b.example/wire/1"))
+        assert match == ("https://a.example/1", "来年度予算案を閣議決定")
+        assert (index.checked, index.duplicates) == (2, 1)
+
+
+def test_near_duplicate_above_threshold():
+    copy = article("https://b.example/2", title="来年度予算案を閣議決定（共同）",
+                   description=TEXT.replace("3日", "3日午前").replace("主な要因", "要因"))
+    assert similarity(minhash(f"{copy['title']}\n{copy['description']}"),
+                      minhash(f"来年度予算案を閣議決定\n{TEXT}")) >= 0.7
+    with DuplicateIndex(":memory:") as index:
+        index.check(article("https://a.example/1"))
+        assert index.check(copy) == ("https://a.example/1", "来年度予算案を閣議決定")
+
+
+def test_different_article_below_threshold():
+    other = article("https://a.example/2", title="プロ野球 開幕戦の日程を発表",
+                    description="日本野球機構は3日、来季の開幕戦を3月27日に各地で"
+                                "開催すると発表した。")
+    with DuplicateIndex(":memory:") as index:
+        index.check(article("https://a.example/1"))
+        assert index.check(other) is None
+        assert index.duplicates == 0
+
+
+def test_own_entry_from_an_earlier_run_is_not_a_duplicate(tmp_path):
+    path = str(tmp_path / "dedupe.sqlite3")
+    with DuplicateIndex(path) as index:
+        index.check(article("https://a.example/1?utm_source=rss"))
+    with DuplicateIndex(path) as index:         # 既読の記録なしで取得し直した
+        assert index.check(article("https://a.example/1")) is None
+        assert index.check(article("https://b.example/1")) == (
+            "https://a.example/1?utm_source=rss", "来年度予算案を閣議決定")
+        [(count,)] = index.db.execute("SELECT COUNT(*) FROM signatures")
+        assert count == 1                       # 自分自身も転載も登録し直さない
+
+
+def test_prune_by_age(tmp_path):
+    path = str(tmp_path / "dedupe.sqlite3")
+    with DuplicateIndex(path, window_days=1) as index:
+        index.check(article("https://a.example/1"))
+        index.prune(now=time.time() + 2 * 86400)
+        assert index.check(article("https://b.example/1")) is None
+    with DuplicateIndex(path, window_days=1) as index:
+        [(count,)] = index.db.execute("SELECT COUNT(*) FROM signatures")
+        assert count == 1
+
+
+def test_unparsable_urls_do_not_break_the_index(tmp_path):
+    with DuplicateIndex(str(tmp_path / "dedupe.sqlite3")) as index:
+        assert index.check(article("http://[::1/x")) is None
+        assert index.check(article("http://host:abc/")) == ("http://[::1/x", "来年度予算案を閣議決定")
+        assert index.check({"title": "URLなし", "description": TEXT[:20]}) is None
+    with DuplicateIndex(str(tmp_path / "dedupe.sqlite3")) as index:
+        # 解析できないURLはそのままの文字列で自分自身と見分ける
+        assert index.check(article("http://[::1/x")) is None
@@ -0,0 +1,226 @@
+"""fetcher.py のテスト（ローカルのスタブHTTPサーバーを使う）"""
+
+import asyncio
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from feed_cache import FeedCache
+from fetcher import Fetcher, FetchError, fetch_articles
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>stub</title>
+<item><title>記事1</title><link>https://example.com/1</link>
+<description>&lt;p&gt;本文 &amp;amp; 説明&lt;/p&gt;</description>
+<pubDate>Tue, 03 Feb 2026 09:00:00 +0900</pubDate><guid>id-1</guid></item>
+<item><title>記事2</title><link>https://example.com/2</link></item>
+</channel></rss>""".encode()
+
+ATOM = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>stub</title>
+<entry><title>Atom記事</title><id>tag:example.com,2026:1</id>
+<link rel="alternate" href="https://example.com/a"/>
+<summary>要約</summary><updated>2026-02-03T00:00:00Z</updated></entry>
+</feed>""".encode()
+
+RDF = """<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns="http://purl.org/rss/1.0/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+<item rdf:about="https://example.com/r"><title>RDF記事</title>
+<link>https://example.com/r</link><dc:date>2026-02-03T12:00:00+09:00</dc:date></item>
+</rdf:RDF>""".encode()
+
+
+class Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # keep-alive
+    hits = {}
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits[self.path] = cls.hits.get(self.path, 0) + 1
+            hits = cls.hits[self.path]
+            cls.active += 1
+            cls.max_active = max(cls.max_active, cls.active)
+        try:
+            self.route(hits)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def route(self, hits):
+        if self.path == "/rss":
+            self.send(200, RSS)
+        elif self.path == "/atom":
+            self.send(200, ATOM)
+        elif self.path == "/rdf":
+            self.send(200, RDF)
+        elif self.path == "/gzip":
+            self.send(200, gzip.compress(RSS), [("Content-Encoding", "gzip")])
+        elif self.path == "/moved":
+            self.send(301, headers=[("Location", "/rss")])
+        elif self.path == "/flaky":
+            self.send(503 if hits < 3 else 200, RSS)
+        elif self.path == "/slow":
+            time.sleep(1.0)
+            self.send(200, RSS)
+        elif self.path.startswith("/hold"):
+            time.sleep(0.1)
+            self.send(200, RSS)
+        elif self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send(304)
+            else:
+                self.send(200, RSS, [("ETag", '"v1"')])
+        elif self.path == "/broken":
+            self.send(200, b"<rss><channel>")
+        elif self.path == "/bad-deflate":
+            self.send(200, b"not deflate at all", [("Content-Encoding", "deflate")])
+        elif self.path == "/truncated-gzip":
+            self.send(200, gzip.compress(RSS)[:40], [("Content-Encoding", "gzip")])
+        else:
+            self.send(404)
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def base(server):
+    Stub.hits, Stub.active, Stub.max_active = {}, 0, 0
+    return server
+
+
+def sources(base, *paths):
+    return [{"name": path, "url": base + path} for path in paths]
+
+
+async def collect(fetcher, srcs):
+    return [item async for item in fetcher.stream(srcs)]
+
+
+def run(srcs, **options):
+    async def go():
+        async with Fetcher(**options) as fetcher:
+            return await collect(fetcher, srcs), fetcher
+    return asyncio.run(go())
+
+
+def test_parse_rss_atom_rdf(base, capsys):
+    articles = fetch_articles(sources(base, "/rss", "/atom", "/rdf"), cache_path=None,
+                              backoff=0)
+    by_title = {a["title"]: a for a in articles}
+    assert set(by_title) == {"記事1", "記事2", "Atom記事", "RDF記事"}
+
+    first = by_title["記事1"]
+    assert first == {"title": "記事1", "url": "https://example.com/1",
+                     "description": "本文 & 説明",
+                     "published": "2026-02-03T00:00:00+00:00",
+                     "source": "/rss", "guid": "id-1"}
+    assert by_title["記事2"]["guid"] == "https://example.com/2"
+    assert by_title["記事2"]["published"] is None
+    assert by_title["Atom記事"]["url"] == "https://example.com/a"
+    assert by_title["Atom記事"]["guid"] == "tag:example.com,2026:1"
+    assert by_title["RDF記事"]["published"] == "2026-02-03T03:00:00+00:00"
+    assert "✓ /atom: 1件" in capsys.readouterr().out
+
+
+def test_gzip_and_redirect(base):
+    results, _ = run(sources(base, "/gzip", "/moved"), backoff=0)
+    assert all(error is None and len(articles) == 2 for _, articles, error in results)
+
+
+def test_retries_with_backoff(base):
+    results, _ = run(sources(base, "/flaky"), retries=3, backoff=0.01)
+    [(_, articles, error)] = results
+    assert error is None and len(articles) == 2
+    assert Stub.hits["/flaky"] == 3
+
+
+def test_failures_do_not_stop_other_feeds(base):
+    results, _ = run(sources(base, "/missing", "/slow", "/broken", "/rss"),
+                     timeout=0.3, retries=1, backoff=0.01)
+    errors = {source["name"]: error for source, _, error in results}
+    assert errors["/rss"] is None
+    for name in ("/missing", "/slow", "/broken"):
+        assert isinstance(errors[name], FetchError)
+    assert Stub.hits["/missing"] == 1          # 4xx は再試行しない
+    assert Stub.hits["/slow"] == 2             # タイムアウトは再試行する
+
+
+def test_undecodable_bodies_do_not_stop_other_feeds(base):
+    results, _ = run(sources(base, "/bad-deflate", "/truncated-gzip", "/rss"), backoff=0)
+    errors = {source["name"]: error for source, _, error in results}
+    assert errors["/rss"] is None
+    assert isinstance(errors["/bad-deflate"], FetchError)
+    assert isinstance(errors["/truncated-gzip"], FetchError)
+    assert Stub.hits["/bad-deflate"] == 1      # 壊れた本文は再試行しない
+
+
+def test_per_host_limit_and_connection_reuse(base):
+    paths = [f"/hold{i}" for i in range(8)]
+    results, fetcher = run(sources(base, *paths), per_host=2, backoff=0)
+    assert all(error is None for _, _, error in results)
+    assert Stub.max_active == 2
+    assert fetcher.pool.created == 2           # 8件を2本の接続で取得
+
+
+def test_streams_feeds_as_they_complete(base):
+    async def go():
+        async with Fetcher(backoff=0) as fetcher:
+            return [(source["name"], time.monotonic())
+                    async for source, _, _ in fetcher.stream(sources(base, "/slow", "/rss"))]
+    (first, t_first), (second, t_second) = asyncio.run(go())
+    assert (first, second) == ("/rss", "/slow")
+    assert t_second - t_first > 0.5            # /rss は /slow を待たずに届く
+
+
+def test_conditional_get_uses_cache(base, tmp_path):
+    path = str(tmp_path / "feeds.sqlite3")
+    srcs = sources(base, "/etag", "/rss")
+    first = fetch_articles(srcs, cache_path=path, backoff=0)
+    srcs[0]["name"] = "renamed"
+    second = fetch_articles(srcs, cache_path=path, backoff=0)
+    assert len(first) == len(second) == 4
+    assert Stub.hits["/etag"] == 2
+    assert {a["source"] for a in second} == {"renamed", "/rss"}
+
+    with FeedCache(path) as cache:
+        assert cache.validators(base + "/etag") == {"If-None-Match": '"v1"'}
+        assert cache.validators(base + "/rss") == {}      # 検証子のないフィードは保存しない
+
+
+def test_feed_cache_prune(tmp_path):
+    cache = FeedCache(str(tmp_path / "feeds.sqlite3"), max_age=100, max_bytes=150)
+    items = [{"title": "x" * 100}]
+    for i, url in enumerate(["a", "b", "c"]):
+        cache.store(url, {"ETag": url}, items)
+        cache.db.execute("UPDATE feeds SET checked_at = ? WHERE url = ?", (1000 + i, url))
+    cache.prune(now=1000 + 100.5)       # a は期限切れ、b・c のうち上限を超える b を消す
+    assert [url for url, in cache.db.execute("SELECT url FROM feeds")] == ["c"]
+    cache.close()
@@ -0,0 +1,62 @@
+"""metrics.py のテスト"""
+
+import json
+
+import pytest
+
+from metrics import Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_quantiles_interpolate_within_buckets(registry):
+    h = registry.histogram("h_seconds", "help", buckets=(1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3):           # バケットごとに 1, 2, 1, 0 件
+        h.observe(value)
+    assert h.quantile(0.5) == pytest.approx(1.5)       # 1 + (2 - 1) × (2 - 1) / 2
+    assert h.quantile(0.9) == pytest.approx(3.2)       # 2 + (4 - 2) × (3.6 - 3) / 1
+    assert h.quantile(0.99) == pytest.approx(3.92)
+    assert h.quantile(0.5, source="none") is None
+    h.observe(10)                               # +Inf のバケットは上限で頭打ち
+    assert h.quantile(0.99) == 4
+
+
+def test_prometheus_buckets_are_cumulative(registry):
+    h = registry.histogram("h_seconds", "所要時間", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 5):
+        h.observe(value, source="a")
+    lines = registry.prometheus().splitlines()
+    assert lines[:2] == ["# HELP h_seconds 所要時間", "# TYPE h_seconds histogram"]
+    samples = dict(line.rsplit(" ", 1) for line in lines[2:])
+    assert samples['h_seconds_bucket{source="a",le="0.1"}'] == "1"
+    assert samples['h_seconds_bucket{source="a",le="1"}'] == "3"
+    assert samples['h_seconds_bucket{source="a",le="+Inf"}'] == "4"
+    assert samples['h_seconds_count{source="a"}'] == "4"
+    assert float(samples['h_seconds_sum{source="a"}']) == pytest.approx(6.25)
+
+
+def test_prometheus_escapes_label_values(registry):
+    c = registry.counter("c_total", "help")
+    c.inc(2, source='say "hi"\\n\nnext')
+    c.inc(source='say "hi"\\n\nnext')
+    assert registry.prometheus().splitlines()[-1] == 'c_total{source="say \\"hi\\"\\\\n\\nnext"} 3'
+
+
+def test_write_jsonl_appends_a_line_per_call(registry, tmp_path):
+    c = registry.counter("c_total", "help")
+    h = registry.histogram("h_seconds", "help", buckets=(1, 2))
+    path = tmp_path / "sub" / "metrics.jsonl"
+    c.inc(stage="fetched")
+    h.observe(1.5)
+    registry.write_jsonl(str(path))
+    c.inc(stage="fetched")
+    registry.write_jsonl(str(path))
+    first, second = (json.loads(line) for line in path.read_text(encoding="utf-8").splitlines())
+    assert first["c_total"] == [{"labels": {"stage": "fetched"}, "value": 1}]
+    assert second["c_total"][0]["value"] == 2
+    [snapshot] = first["h_seconds"]
+    assert snapshot["count"] == 1 and snapshot["p50"] == pytest.approx(1.5)
+    assert "time" in first
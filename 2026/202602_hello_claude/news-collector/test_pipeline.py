@@ -0,0 +1,40 @@
+"""pipeline.py のテスト（段ごとに、キューを直接つないで動かす）"""
+
+import asyncio
+
+from pipeline import DONE, dedupe_stage
+
+
+def dedupe(articles, **options):
+    async def go():
+        inbox, out = asyncio.Queue(), asyncio.Queue()
+        for article in [*articles, DONE]:
+            inbox.put_nowait(article)
+        await dedupe_stage(inbox, out, 1, **options)
+        return [item for item in (out.get_nowait() for _ in range(out.qsize()))
+                if item is not DONE]
+    return asyncio.run(go())
+
+
+def test_exact_duplicates_are_dropped():
+    articles = [{"title": "a", "url": "https://example.com/1", "guid": "id-1"},
+                {"title": "a（再送）", "url": "https://example.com/1?x", "guid": "id-1"},
+                {"title": "b", "url": "https://example.com/2"},
+                {"title": "b（再送）", "url": "https://example.com/2", "guid": ""}]
+    assert [a["title"] for a in dedupe(articles)] == ["a", "b"]
+
+
+def test_articles_without_guid_or_url_are_kept():
+    articles = [{"title": "見出しだけ1", "url": ""}, {"title": "見出しだけ2", "url": ""},
+                {"title": "URLの項目もない"}]
+    assert dedupe(articles) == articles
+
+
+def test_dedupe_stage_survives_malformed_links():
+    from dedupe import DuplicateIndex
+
+    articles = [{"title": "壊れたリンク", "url": "http://[::1/x", "description": "本文その1"},
+                {"title": "ポートが数字でない", "url": "http://host:abc/",
+                 "description": "まったく別の本文です"}]
+    with DuplicateIndex(":memory:") as index:
+        assert dedupe(articles, index=index) == articles
@@ -0,0 +1,41 @@
+"""reporter.py のテスト"""
+
+import os
+from datetime import datetime
+
+from reporter import HtmlReport, render_article
+
+
+def article(url, title="記事"):
+    return {"title": title, "url": url, "source": "stub", "summary": "要約"}
+
+
+def test_only_http_links_are_rendered():
+    assert '<a href="https://example.com/1?a=1&amp;b=2"' in render_article(
+        article("https://example.com/1?a=1&b=2"))
+    for url in ("javascript:alert(1)", " JavaScript:alert(1)", "java\tscript:alert(1)",
+                "data:text/html,<script>alert(1)</script>", "", "//example.com/x"):
+        text = render_article(article(url, title="<b>見出し</b>"))
+        assert "<a " not in text and "script" not in text.replace("<b>", "")
+        assert "<h2>&lt;b&gt;見出し&lt;/b&gt;</h2>" in text
+
+
+def test_empty_report_writes_nothing(tmp_path):
+    out = tmp_path / "output"
+    with HtmlReport(str(out), now=datetime(2026, 2, 3, 9)):
+        pass
+    assert not out.exists()
+
+
+def test_pages_and_index(tmp_path):
+    out = str(tmp_path / "output")
+    with HtmlReport(out, page_size=2, now=datetime(2026, 2, 3, 9)) as report:
+        for i in range(3):
+            report.add(article(f"https://example.com/{i}", title=f"記事{i}"))
+    assert sorted(os.listdir(os.path.join(out, "2026-02-03"))) == ["001.html", "002.html"]
+    with HtmlReport(out, page_size=2, now=datetime(2026, 2, 4, 9)):
+        pass                                    # 翌日の空の実行は目次に残らない
+    with open(os.path.join(out, "index.html"), encoding="utf-8") as f:
+        index = f.read()
+    assert "2026-02-03（3件）" in index and "2026-02-04" not in index
+    assert not os.path.exists(os.path.join(out, "2026-02-04"))
@@ -0,0 +1,142 @@
+"""seen.py のテスト（既読の記録と、パイプラインでの記録のタイミング）"""
+
+import asyncio
+import time
+
+import pytest
+
+from pipeline import run_async
+from seen import SeenStore, canonical_url
+from summarizer import StubBackend, Summarizer
+
+
+def make(*ids):
+    return [{"title": f"記事{i}", "url": f"https://example.com/{i}", "guid": f"id-{i}",
+             "description": f"記事{i}の本文です。"} for i in ids]
+
+
+def titles(articles):
+    return [a["title"] for a in articles]
+
+
+def test_canonical_url():
+    assert (canonical_url("HTTPS://Example.com:443/a?utm_source=x&b=2&a=1#top")
+            == "https://example.com/a?a=1&b=2")
+
+
+def test_new_and_in_flight_articles(tmp_path):
+    with SeenStore(str(tmp_path / "seen.sqlite3")) as seen:
+        assert titles(seen.select_new(make(1, 2))) == ["記事1", "記事2"]
+        assert seen.select_new(make(1, 2, 3)) == make(3)    # 1・2 は処理中（別のフィード）
+        seen.add_many(make(1))
+        assert seen.select_new(make(1)) == []
+
+
+def test_only_recorded_articles_persist(tmp_path):
+    path = str(tmp_path / "seen.sqlite3")
+    with SeenStore(path) as seen:
+        seen.select_new(make(1, 2))
+        seen.add_many(make(1))          # 2 は書き出す前に止まった
+    with SeenStore(path) as seen:
+        assert seen.select_new(make(1, 2)) == make(2)
+        moved = dict(make(1)[0], url="https://example.com/1?utm_medium=rss", guid="")
+        assert seen.select_new([moved]) == []               # 正規化したURLで一致
+
+
+def test_compact_expires_unseen_articles(tmp_path):
+    with SeenStore(str(tmp_path / "seen.sqlite3"), ttl_days=1) as seen:
+        seen.add_many(make(1, 2))
+        with seen.db:
+            seen.db.execute("UPDATE seen SET seen_at = ?", (time.time() - 2 * 86400,))
+        assert seen.select_new(make(1)) == []               # 見かけたので時刻を更新
+        seen.compact()
+        assert seen.select_new(make(1, 2)) == make(2)
+
+
+def test_wal_readers_do_not_block_on_a_writer(tmp_path):
+    path = str(tmp_path / "seen.sqlite3")
+    with SeenStore(path) as writer, SeenStore(path) as reader:
+        writer.add_many(make(1))
+        writer.db.execute("BEGIN IMMEDIATE")
+        writer.db.execute("INSERT INTO seen VALUES ('g:id-2', ?)", (time.time(),))
+        keys = {"g:id-1", "g:id-2"}
+        assert reader.seen_keys(keys) == {"g:id-1"}         # 書き込み中でも読める
+        writer.db.commit()
+        assert reader.seen_keys(keys) == keys
+
+
+class Feeds:
+    """stream() だけの Fetcher の代わり"""
+
+    def __init__(self, items):
+        self.items = items
+
+    async def stream(self, sources):
+        for source in sources:
+            yield source, self.items, None
+
+
+class FailingReport:
+    def __init__(self, fail_title):
+        self.fail_title = fail_title
+        self.added = []
+
+    def add(self, article):
+        if article["title"] == self.fail_title:
+            raise OSError("disk full")
+        self.added.append(article["title"])
+
+
+def test_pipeline_records_only_rendered_articles(tmp_path):
+    path = str(tmp_path / "seen.sqlite3")
+    summarizer = Summarizer(StubBackend(), workers=1)
+    report = FailingReport("記事3")
+    with SeenStore(path) as seen:
+        with pytest.raises(OSError):
+            asyncio.run(run_async([{"name": "stub"}], report, summarizer.summarize_all,
+                                  Feeds(make(1, 2, 3, 4)), seen=seen, workers=1,
+                                  batch_size=1))
+    summarizer.close()
+    assert report.added == ["記事1", "記事2"]
+    with SeenStore(path) as seen:
+        assert titles(seen.select_new(make(1, 2, 3, 4))) == ["記事3", "記事4"]
+
+
+class Report:
+    def __init__(self):
+        self.added = []
+
+    def add(self, article):
+        self.added.append(article["title"])
+
+
+def run_once(path, items):
+    """items を1つのフィードとしてパイプラインに流し、書き出した記事のタイトルを返す"""
+    summarizer = Summarizer(StubBackend(), workers=1)
+    report = Report()
+    with SeenStore(path) as seen:
+        asyncio.run(run_async([{"name": "stub"}], report, summarizer.summarize_all,
+                              Feeds(items), seen=seen, workers=1))
+    summarizer.close()
+    return report.added
+
+
+def test_malformed_links(tmp_path):
+    broken = [dict(make(1)[0], url="http://[::1/x", guid=""),
+              dict(make(2)[0], url="http://host:abc/", guid="")]
+    assert canonical_url(" http://[::1/x ") == "http://[::1/x"
+    with SeenStore(str(tmp_path / "seen.sqlite3")) as seen:
+        assert seen.select_new(broken) == broken
+    path = str(tmp_path / "pipeline.sqlite3")
+    assert run_once(path, broken) == ["記事1", "記事2"]
+    assert run_once(path, broken) == []
+
+
+def test_articles_without_url_or_guid_are_recorded(tmp_path):
+    path = str(tmp_path / "seen.sqlite3")
+    bare = [{"title": f"見出しだけ{i}", "url": "", "guid": "", "source": "stub",
+             "description": ""} for i in range(2)]
+    assert run_once(path, bare) == ["見出しだけ0", "見出しだけ1"]
+    assert run_once(path, bare) == []                   # 次の実行では新着にならない
+    with SeenStore(path) as seen:
+        assert seen.select_new([dict(bare[0], source="other")]) != []
@@ -0,0 +1,142 @@
+"""summarizer.py のテスト（StubBackend を使い、APIは呼ばない）"""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from summarizer import (
+    StubBackend, SummaryCache, SummaryError, Summarizer, content_key, parse_summaries,
+)
+
+
+class Recorder(StubBackend):
+    """呼び出しと同時実行数を記録するスタブ"""
+
+    def __init__(self, delay=0.0, fail=False):
+        super().__init__()
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.active = self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, articles):
+        with self.lock:
+            self.batches.append([a["title"] for a in articles])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise SummaryError("stub")
+            return super().__call__(articles)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def make(n, prefix="記事"):
+    return [{"title": f"{prefix}{i}", "description": f"{prefix}{i}の本文です。"}
+            for i in range(n)]
+
+
+def test_batches_and_stub_summaries():
+    backend = Recorder()
+    summarizer = Summarizer(backend, batch_size=4, workers=2)
+    articles = summarizer.summarize_all(make(10))
+    assert sorted(len(batch) for batch in backend.batches) == [2, 4, 4]
+    assert articles[3]["summary"] == "記事3: 記事3の本文です。"
+    summarizer.close()
+
+
+def test_bounded_concurrency():
+    backend = Recorder(delay=0.05)
+    summarizer = Summarizer(backend, batch_size=1, workers=2)
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(summarizer.summarize_all, [make(3, f"p{i}-") for i in range(4)]))
+    assert len(backend.batches) == 12
+    assert backend.max_active == 2
+    summarizer.close()
+
+
+def test_cache_and_duplicates(tmp_path):
+    path = str(tmp_path / "summaries.sqlite3")
+    backend = Recorder()
+    summarizer = Summarizer(backend, SummaryCache(path), batch_size=8)
+    syndicated = make(3) + [dict(make(1)[0], url="https://other.example/0")]
+    summarizer.summarize_all(syndicated)
+    assert backend.batches == [["記事0", "記事1", "記事2"]]     # 転載記事は1回だけ
+    summarizer.close()
+
+    again = Recorder()
+    summarizer = Summarizer(again, SummaryCache(path))
+    articles = summarizer.summarize_all(make(4))
+    assert again.batches == [["記事3"]]                         # 0〜2 はキャッシュ
+    assert articles[0]["summary"] == "記事0: 記事0の本文です。"
+    assert summarizer.cached == 3
+    summarizer.close()
+
+
+def test_concurrent_duplicates_are_summarised_once():
+    backend = Recorder(delay=0.1)
+    summarizer = Summarizer(backend, batch_size=8, workers=4)
+    with ThreadPoolExecutor(3) as pool:
+        results = list(pool.map(summarizer.summarize_all, [make(2) for _ in range(3)]))
+    assert len(backend.batches) == 1
+    assert all(r[1]["summary"] == "記事1: 記事1の本文です。" for r in results)
+    summarizer.close()
+
+
+def test_failed_batches_fall_back_and_are_not_cached(tmp_path):
+    cache = SummaryCache(str(tmp_path / "summaries.sqlite3"))
+    summarizer = Summarizer(Recorder(fail=True), cache)
+    [article] = summarizer.summarize_all(make(1))
+    assert article["summary"] == "記事0の本文です。"
+    assert cache.get_many([content_key(article, "stub")]) == {}
+    summarizer.close()
+
+
+class ShortBackend(StubBackend):
+    def __call__(self, articles):
+        return super().__call__(articles)[:-1]
+
+
+def test_wrong_summary_count_falls_back():
+    summarizer = Summarizer(ShortBackend(), batch_size=3, workers=2)
+    articles = summarizer.summarize_all(make(5))       # 足りない分を待ち続けない
+    assert [a["summary"] for a in articles] == [f"記事{i}の本文です。" for i in range(5)]
+    summarizer.close()
+
+
+class LockedCache(SummaryCache):
+    def put_many(self, items):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_cache_write_failure_still_returns_summaries(capsys):
+    summarizer = Summarizer(Recorder(), LockedCache(":memory:"), batch_size=2, workers=2)
+    articles = summarizer.summarize_all(make(5))       # 保存に失敗しても止まらない
+    assert [a["summary"] for a in articles] == [f"記事{i}: 記事{i}の本文です。" for i in range(5)]
+    assert "キャッシュに保存できませんでした" in capsys.readouterr().out
+    summarizer.close()
+
+
+def test_cache_prune():
+    cache = SummaryCache(":memory:", max_age=100)
+    cache.put_many([("old", "古い要約")])
+    cache.prune(now=time.time() + 50)
+    assert cache.get_many(["old"]) == {"old": "古い要約"}
+    cache.prune(now=time.time() + 101)
+    assert cache.get_many(["old"]) == {}
+    cache.close()
+
+
+def test_parse_summaries():
+    assert parse_summaries('要約です:\n["一つ目", " 二つ目 "]', 2) == ["一つ目", "二つ目"]
+    with pytest.raises(SummaryError):
+        parse_summaries('["一つだけ"]', 2)
+    with pytest.raises(SummaryError):
+        parse_summaries("JSONではない", 1)
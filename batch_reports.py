@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Batch earnings-update reports for many issuer / period pairs
+
+    python batch_reports.py sony:FY2025Q3 nintendo:FY2026Q3
+    python batch_reports.py --list pairs.txt --jobs 8 --data universe.parquet
+
+Each pair gets a generic report (recent-quarter table, revenue and
+operating income / margin charts, peer margin comparison) written to
+<outdir>/<issuer>_<period>_Earnings_Update_JP.docx.
+
+All charts are rendered first through generate_charts.render_all, so its
+manifest cache applies. The peer chart is drawn once per calendar quarter
+and compares each issuer's fiscal quarter covering those months, so Sony
+FY2025Q3 and Nintendo FY2026Q3 (both Oct–Dec 2025) share one chart. The
+reports are then built in a process pool. Each worker loads the dataset
+once and keeps an ImageCache, so a chart embedded by several reports (the
+peer chart) is read and hashed once per worker rather than per document.
+--embed-dpi / --palette downscale and quantise the charts as in
+generate_report.py; the processed images are shared through --image-cache.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from fundamentals import DEFAULT_PATH, load_dataset
+from generate_charts import (
+    calendar_quarter, issuer_specs, issuer_style, peer_margin_spec, render_all,
+)
+from generate_report import IMAGE_CACHE_DIR, PALETTE_COLORS
+
+OUTPUT_DIR = "reports"
+QUARTERS   = 8
+
+def parse_pairs(items):
+    """['sony:FY2025Q3', ...] -> [('sony', 'FY2025Q3'), ...] (duplicates dropped)."""
+    pairs = []
+    for item in items:
+        item = item.split("#")[0].strip()
+        if not item:
+            continue
+        issuer, sep, period = item.partition(":")
+        if not sep or not issuer or not period:
+            raise ValueError(f"Expected ISSUER:PERIOD, got {item!r}")
+        if (issuer, period) not in pairs:
+            pairs.append((issuer, period))
+    return pairs
+
+def report_path(outdir, issuer, period):
+    return os.path.join(outdir, f"{issuer}_{period}_Earnings_Update_JP.docx")
+
+def pair_specs(ds, issuer, period, quarters):
+    """issuer_specs() ending at ``period``, renamed <issuer>_<period>_<chart>."""
+    specs = issuer_specs(ds, issuer, quarters, until=period)
+    for spec in specs:
+        spec["name"] = f"{issuer}_{period}" + spec["name"][len(issuer):]
+    return specs
+
+# ─────────────────────────────────────────────────────────────────
+# Report body
+# ─────────────────────────────────────────────────────────────────
+def fmt_num(x, pattern="{:,.0f}"):
+    return "—" if np.isnan(x) else pattern.format(x)
+
+def build_issuer_report(ds, issuer, period, charts, images=None, quarters=QUARTERS):
+    """Generic one-issuer report; ``charts`` is [(png path, caption), ...]."""
+    from report_docx import (
+        Document, Cm, RGBColor, DARK_GRAY, MED_GRAY,
+        add_chart, add_data_table, add_heading, add_horizontal_rule, add_para,
+    )
+    style = issuer_style(issuer)
+    color_hex = style["color"].lstrip("#").upper()
+
+    doc = Document()
+    section = doc.sections[0]
+    section.page_width  = Cm(21.0)
+    section.page_height = Cm(29.7)
+    section.left_margin = section.right_margin = Cm(2.0)
+    section.top_margin = section.bottom_margin = Cm(2.0)
+
+    add_heading(doc, "決算アップデートレポート", color=DARK_GRAY, size=20)
+    add_para(doc, f"{style['name']} — {period}", size=12, color=MED_GRAY)
+    add_horizontal_rule(doc)
+
+    periods, revenue = ds.window(issuer, "revenue", last=quarters, until=period)
+    income = ds.series(issuer, "op_income", periods)
+    margin = ds.series(issuer, "op_margin", periods)
+
+    add_heading(doc, "1. 四半期業績推移", color=RGBColor.from_string(color_hex), size=12)
+    if len(periods) > 4 and revenue[-5] > 0:
+        yoy = (revenue[-1] / revenue[-5] - 1) * 100
+        add_para(doc, f"{period}の売上高は¥{fmt_num(revenue[-1])}十億円（前年同期比{yoy:+.1f}%）、"
+                      f"営業利益は¥{fmt_num(income[-1])}十億円、"
+                      f"営業利益率は{fmt_num(margin[-1], '{:.1f}')}%となった。", size=10)
+    rows = [(p, fmt_num(r), fmt_num(i), fmt_num(m, "{:.1f}%"))
+            for p, r, i, m in zip(periods, revenue, income, margin)]
+    add_data_table(doc, rows, [3.5, 3.5, 3.5, 3.0],
+                   ["期間", "売上高（十億円）", "営業利益（十億円）", "営業利益率"],
+                   header_bg=color_hex, stripes=("FFFFFF", "F0F3F4"),
+                   cell_font=lambda i, j, val: {"bold": i == len(rows) - 1})
+
+    for path, caption in charts:
+        add_chart(doc, path, caption, images=images)
+
+    add_para(doc, style["source"], size=8, color=MED_GRAY, space_before=6)
+    return doc
+
+# ─────────────────────────────────────────────────────────────────
+# Worker pool
+# ─────────────────────────────────────────────────────────────────
+_worker = {}
+
+def init_worker(data_path, image_options=None):
+    """Per-process state: the dataset and the shared image cache.
+
+    ``image_options`` are ImageCache keyword arguments (dpi, colors, cache_dir).
+    """
+    from report_docx import ImageCache
+    _worker["ds"] = load_dataset(data_path)
+    _worker["images"] = ImageCache(**(image_options or {}))
+
+def build_one(issuer, period, charts, output, quarters=QUARTERS):
+    doc = build_issuer_report(_worker["ds"], issuer, period, charts,
+                              images=_worker["images"], quarters=quarters)
+    doc.save(output)
+    return output
+
+def run_batch(ds, pairs, data_path=DEFAULT_PATH, outdir=OUTPUT_DIR, chart_dir=None,
+              jobs=1, quarters=QUARTERS, force=False, image_options=None):
+    """Render the charts, then build one report per pair. Returns the report paths.
+
+    ``ds`` is the dataset loaded from ``data_path``; workers reload it from
+    the path rather than receiving it pickled with every job.
+    """
+    chart_dir = chart_dir or os.path.join(outdir, "charts")
+
+    specs, jobs_args, peers = [], [], {}
+    for issuer, period in pairs:
+        own = pair_specs(ds, issuer, period, quarters)
+        quarter = calendar_quarter(issuer, period)
+        if quarter is not None and quarter not in peers:
+            peers[quarter] = peer_margin_spec(ds, quarter)
+            specs.append(peers[quarter])
+        specs += own
+        charts = [(os.path.join(chart_dir, f"{s['name']}.png"), s["data"]["title"])
+                  for s in own + ([peers[quarter]] if quarter is not None else [])]
+        jobs_args.append((issuer, period, charts, report_path(outdir, issuer, period),
+                          quarters))
+
+    render_all(specs, outdir=chart_dir, jobs=jobs, force=force, prune=False)
+    os.makedirs(outdir, exist_ok=True)
+
+    if jobs <= 1 or len(jobs_args) <= 1:
+        init_worker(data_path, image_options)
+        for args in jobs_args:
+            print(f"✓ {build_one(*args)}")
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(data_path, image_options)) as pool:
+            futures = [pool.submit(build_one, *args) for args in jobs_args]
+            for fut in futures:
+                print(f"✓ {fut.result()}")
+    return [args[3] for args in jobs_args]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pairs", nargs="*", metavar="ISSUER:PERIOD",
+                        help="e.g. sony:FY2025Q3")
+    parser.add_argument("--list", metavar="FILE",
+                        help="file with one ISSUER:PERIOD per line ('#' comments)")
+    parser.add_argument("--data", default=DEFAULT_PATH,
+                        help="fundamentals dataset (.csv / .json / .parquet or a store directory)")
+    parser.add_argument("--outdir", default=OUTPUT_DIR, help="report output directory")
+    parser.add_argument("--charts", help="chart directory (default: <outdir>/charts)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="worker processes for charts and reports (default: 1)")
+    parser.add_argument("--quarters", type=int, default=QUARTERS,
+                        help=f"quarters per table and chart (default: {QUARTERS})")
+    parser.add_argument("--force", action="store_true", help="redraw every chart")
+    parser.add_argument("--embed-dpi", type=int, metavar="DPI",
+                        help="resample charts to their display size at DPI before "
+                             "embedding (needs Pillow)")
+    parser.add_argument("--palette", type=int, nargs="?", const=PALETTE_COLORS, metavar="N",
+                        help="with --embed-dpi, quantise charts to N colours "
+                             f"(default N: {PALETTE_COLORS})")
+    parser.add_argument("--image-cache", default=IMAGE_CACHE_DIR, metavar="DIR",
+                        help=f"processed image cache (default: {IMAGE_CACHE_DIR})")
+    args = parser.parse_args(argv)
+
+    items = list(args.pairs)
+    if args.list:
+        with open(args.list, encoding="utf-8") as f:
+            items += f.read().splitlines()
+    try:
+        pairs = parse_pairs(items)
+    except ValueError as e:
+        parser.error(str(e))
+    if not pairs:
+        parser.error("no ISSUER:PERIOD pairs given")
+
+    try:
+        ds = load_dataset(args.data)
+    except ImportError as e:
+        parser.exit(1, f"{e}\n")
+    unknown = [f"{i}:{p}" for i, p in pairs
+               if not ds.has(i, "revenue") or p not in ds.periods_with(i, "revenue")]
+    if unknown:
+        parser.error(f"no revenue data for: {', '.join(unknown)}")
+
+    image_options = None
+    if args.embed_dpi:
+        image_options = {"dpi": args.embed_dpi, "colors": args.palette,
+                         "cache_dir": args.image_cache}
+    try:
+        outputs = run_batch(ds, pairs, args.data, args.outdir, args.charts, args.jobs,
+                            args.quarters, args.force, image_options)
+    except ImportError as e:
+        parser.exit(1, f"{e}\n")
+    print(f"\n✅ {len(outputs)} reports saved in {os.path.join('.', args.outdir, '')}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
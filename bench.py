@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""Benchmarks for chart generation and report assembly
+
+Builds synthetic fundamentals datasets over an issuers × quarters grid and
+times each stage of the chart and report pipeline separately. Results are
+written as JSON so two commits can be compared:
+
+    python bench.py -o before.json                 # default 10/100/1000 × 8/40/120 grid
+    python bench.py --issuers 10 --quarters 8,40   # smaller grid
+    python bench.py --compare before.json after.json
+
+Stages (per grid point):
+  dataset       build the Dataset from long-format columns (all issuers)
+  derive        add the derived metrics (fundamentals.derive, all issuers)
+  store_open    open the dataset saved as a memory-mapped store
+  store_window  read a full-length revenue window for one issuer from it
+  specs         slice the dataset into chart specs (all issuers)
+  figure        create a styled figure template from scratch
+  fill          draw one spec's data into a (reused) template
+  tight_layout  fig.tight_layout()
+  bbox          measure the tight bounding box at the output dpi
+  savefig       write the PNG
+  docx_build    summary table row for every issuer, chart section for the
+                sampled issuers
+  docx_save     Document.save()
+  docx_assemble report only: build_report() from warm section fragments
+
+Only --sample issuers per grid point are drawn, so the 1000-issuer points
+stay short. The real report (case "report") is timed once on top of the
+grid unless --no-report is given.
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+
+import generate_charts as charts
+from fundamentals import derive, from_columns, load_dataset, load_store, save_store
+
+ISSUER_COUNTS = [10, 100, 1000]
+QUARTER_COUNTS = [8, 40, 120]
+SAMPLE = 5
+
+# Synthetic datasets end at the latest fiscal quarter in data/fundamentals.csv.
+LAST_FY, LAST_Q = 2026, 3
+
+class Timings:
+    """Wall-clock samples per stage."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    @contextlib.contextmanager
+    def time(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(time.perf_counter() - t0)
+
+    def results(self, **dims):
+        out = []
+        for stage, s in self.samples.items():
+            s = np.asarray(s)
+            out.append(dict(dims, stage=stage, n=len(s), total_s=round(float(s.sum()), 4),
+                            mean_ms=round(float(s.mean()) * 1000, 3),
+                            min_ms=round(float(s.min()) * 1000, 3),
+                            max_ms=round(float(s.max()) * 1000, 3)))
+        return out
+
+# ─────────────────────────────────────────────────────────────────
+# Synthetic data
+# ─────────────────────────────────────────────────────────────────
+def synthetic_periods(n_quarters):
+    """The n_quarters fiscal quarters ending at FY<LAST_FY>Q<LAST_Q>."""
+    last = LAST_FY * 4 + LAST_Q - 1
+    return [f"FY{t // 4}Q{t % 4 + 1}" for t in range(last - n_quarters + 1, last + 1)]
+
+def synthetic_columns(n_issuers, n_quarters, seed=0):
+    """Long-format revenue / op_income / op_margin columns for a random universe."""
+    rng = np.random.default_rng(seed)
+    issuers = [f"issuer{i:04d}" for i in range(n_issuers)]
+    periods = synthetic_periods(n_quarters)
+    base = rng.uniform(50, 5000, size=(n_issuers, 1))
+    growth = rng.normal(0.01, 0.05, size=(n_issuers, n_quarters)).cumsum(axis=1)
+    revenue = np.round(base * np.exp(growth))
+    margin = np.clip(rng.normal(0.12, 0.06, size=(n_issuers, n_quarters)), -0.2, 0.5)
+    op_income = np.round(revenue * margin)
+    metrics = {"revenue": revenue, "op_income": op_income,
+               "op_margin": np.round(margin * 100, 1)}
+
+    n = n_issuers * n_quarters
+    return (np.tile(np.repeat(issuers, n_quarters), len(metrics)),
+            np.tile(np.tile(periods, n_issuers), len(metrics)),
+            np.repeat(list(metrics), n),
+            np.concatenate([v.ravel() for v in metrics.values()]))
+
+def sample_issuers(issuers, k):
+    step = max(1, len(issuers) // k)
+    return list(issuers[::step][:k])
+
+# ─────────────────────────────────────────────────────────────────
+# Stages
+# ─────────────────────────────────────────────────────────────────
+def time_charts(specs, outdir, timings, dpi=charts.DPI):
+    """Draw each spec stage by stage; return the PNG paths."""
+    import matplotlib.pyplot as plt
+    paths = []
+    for spec in specs:
+        with timings.time("figure"):
+            fresh = charts.TEMPLATES[spec["template"]](spec["figsize"])
+        plt.close(fresh.fig)
+
+        template = charts.get_template(spec["template"], spec["figsize"])
+        with timings.time("fill"):
+            template.fill(**spec["data"])
+        with timings.time("tight_layout"):
+            template.fig.tight_layout()
+        with timings.time("bbox"):
+            bbox = template.tight_bbox(dpi)
+        path = os.path.join(outdir, f"{spec['name']}.png")
+        with timings.time("savefig"):
+            template.fig.savefig(path, dpi=dpi, bbox_inches=bbox)
+        paths.append(path)
+    return paths
+
+def build_synthetic_report(ds, sections):
+    """Summary table over every issuer plus a chart section per sampled issuer.
+
+    ``sections`` is a list of (issuer, [png paths]).
+    """
+    from report_docx import Document, add_chart, add_data_table, add_heading, add_para
+
+    doc = Document()
+    add_heading(doc, "Synthetic benchmark report", size=16)
+    last = ds.periods[-1]
+    add_para(doc, f"{len(ds.issuers)} issuers × {len(ds.periods)} quarters, latest {last}")
+
+    latest = ds.values[:, ds.periods.index(last), :]
+    cols = [ds.metrics.index(m) for m in ("revenue", "op_income", "op_margin")]
+    rows = [(issuer, f"{revenue:,.0f}", f"{income:,.0f}", f"{margin:.1f}")
+            for issuer, (revenue, income, margin) in zip(ds.issuers, latest[:, cols])]
+    add_data_table(doc, rows, [4, 3.5, 3.5, 3],
+                   ["Issuer", "Revenue (¥B)", "Op. income (¥B)", "Margin (%)"])
+
+    for issuer, paths in sections:
+        add_heading(doc, issuer, size=12)
+        for path in paths:
+            add_chart(doc, path, os.path.basename(path))
+    return doc
+
+def bench_grid_point(n_issuers, n_quarters, sample, workdir):
+    timings = Timings()
+    cols = synthetic_columns(n_issuers, n_quarters)
+    with timings.time("dataset"):
+        ds = from_columns(*cols)
+    with timings.time("derive"):
+        ds = derive(ds)
+    with timings.time("specs"):
+        specs = {issuer: charts.issuer_specs(ds, issuer, n_quarters) for issuer in ds.issuers}
+
+    outdir = os.path.join(workdir, f"{n_issuers}x{n_quarters}")
+    os.makedirs(outdir, exist_ok=True)
+    store = save_store(ds, os.path.join(outdir, "store"), derived=True)
+    with timings.time("store_open"):
+        stored, _ = load_store(store)
+    for issuer in sample_issuers(ds.issuers, sample):
+        with timings.time("store_window"):
+            np.asarray(stored.window(issuer, "revenue", last=n_quarters)[1]).sum()
+
+    sections = [(issuer, time_charts(specs[issuer], outdir, timings))
+                for issuer in sample_issuers(ds.issuers, sample)]
+
+    with timings.time("docx_build"):
+        doc = build_synthetic_report(ds, sections)
+    with timings.time("docx_save"):
+        doc.save(os.path.join(outdir, "report.docx"))
+    return timings.results(case="synthetic", issuers=n_issuers, quarters=n_quarters)
+
+def bench_report(workdir):
+    """The real ten-figure report, built from data/fundamentals.csv."""
+    from generate_report import build_report
+    timings = Timings()
+    with timings.time("dataset"):
+        ds = load_dataset()
+    with timings.time("specs"):
+        specs = charts.report_specs(ds)
+    outdir = os.path.join(workdir, "report")
+    os.makedirs(outdir, exist_ok=True)
+    time_charts(specs, outdir, timings)
+    with timings.time("docx_build"):
+        doc = build_report(outdir)
+    with timings.time("docx_save"):
+        doc.save(os.path.join(outdir, "report.docx"))
+    cache_dir = os.path.join(outdir, "sections")
+    build_report(outdir, cache_dir=cache_dir)
+    with timings.time("docx_assemble"):
+        build_report(outdir, cache_dir=cache_dir)
+    return timings.results(case="report", issuers=None, quarters=None)
+
+# ─────────────────────────────────────────────────────────────────
+# Results
+# ─────────────────────────────────────────────────────────────────
+def environment():
+    from importlib.metadata import PackageNotFoundError, version
+
+    def pkg(name):
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return None
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit,
+            "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "matplotlib": pkg("matplotlib"),
+            "numpy": pkg("numpy"), "python-docx": pkg("python-docx"),
+            "font": charts.resolve_font_family(), "dpi": charts.DPI}
+
+def compare(base_path, new_path):
+    """Print mean per-call time of each stage in two result files."""
+    def load(path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return data["meta"], {(r["case"], r["issuers"], r["quarters"], r["stage"]): r
+                              for r in data["results"]}
+
+    base_meta, base = load(base_path)
+    new_meta, new = load(new_path)
+    print(f"base: {base_meta.get('commit')}  new: {new_meta.get('commit')}  (mean ms per call)")
+    print(f"{'case':<10}{'issuers':>8}{'quarters':>9}  {'stage':<13}{'base':>10}{'new':>10}{'change':>9}")
+    for key in sorted(base.keys() & new.keys(), key=lambda k: tuple(str(x) for x in k)):
+        b, n = base[key]["mean_ms"], new[key]["mean_ms"]
+        change = f"{(n - b) / b * 100:+.1f}%" if b else "-"
+        case, issuers, quarters, stage = key
+        print(f"{case:<10}{issuers or '-':>8}{quarters or '-':>9}  {stage:<13}"
+              f"{b:>10.2f}{n:>10.2f}{change:>9}")
+
+def int_list(text):
+    return [int(x) for x in text.split(",") if x]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--issuers", type=int_list, default=ISSUER_COUNTS,
+                        help="comma-separated issuer counts (default: 10,100,1000)")
+    parser.add_argument("--quarters", type=int_list, default=QUARTER_COUNTS,
+                        help="comma-separated quarter counts (default: 8,40,120)")
+    parser.add_argument("--sample", type=int, default=SAMPLE,
+                        help=f"issuers drawn per grid point (default: {SAMPLE})")
+    parser.add_argument("--no-report", action="store_true",
+                        help="skip timing the real report")
+    parser.add_argument("--output", "-o", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                        help="compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    charts.init_matplotlib()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        for n_issuers in args.issuers:
+            for n_quarters in args.quarters:
+                print(f"… {n_issuers} issuers × {n_quarters} quarters", file=sys.stderr)
+                results += bench_grid_point(n_issuers, n_quarters, args.sample, workdir)
+        if not args.no_report:
+            print("… report", file=sys.stderr)
+            results += bench_report(workdir)
+
+    out = {"meta": dict(environment(), sample=args.sample), "results": results}
+    text = json.dumps(out, ensure_ascii=False, indent=1)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""Quarterly fundamentals dataset (issuer × period × metric)
+
+The source file is long-format, one observation per row:
+
+    issuer,period,metric,value
+    sony,FY2025Q3,revenue,3714
+
+and is loaded once into a dense NumPy cube ``values[issuer, period, metric]``
+(NaN where there is no observation). Figure builders slice the cube instead
+of carrying their own literal lists.
+
+Conventions used by data/fundamentals.csv:
+  - period   FY<yyyy>Q<n> for quarters, FY<yyyy> for full-year items
+             (each issuer's own fiscal-year label)
+  - money    ¥B (十億円); margins in %; eps_adr in US cents;
+             sw2_* in millions of units
+  - grouped metrics use a dotted prefix, e.g. segment_sales.gns,
+    consensus.revenue, guidance_prev.op_income
+
+load_dataset() also adds the derived metrics (see derive()) so that charts
+and the report read margins, YoY changes, surprises and guidance revisions
+from the cube instead of recomputing them.
+
+For large universes, convert the source once into a memory-mapped store
+and pass the store directory wherever a dataset path is accepted:
+
+    python fundamentals.py data/universe.parquet data/universe.store
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "data", "fundamentals.csv")
+
+COLUMNS = ("issuer", "period", "metric", "value")
+
+PERIOD_RE = re.compile(r"FY(\d{4})(Q[1-4])?")
+
+
+class Dataset:
+    """Dense issuer × period × metric cube with label lookups."""
+
+    def __init__(self, issuers, periods, metrics, values):
+        self.issuers = tuple(issuers)
+        self.periods = tuple(periods)
+        self.metrics = tuple(metrics)
+        self.values = values
+        self._issuer_ix = {k: i for i, k in enumerate(self.issuers)}
+        self._period_ix = {k: i for i, k in enumerate(self.periods)}
+        self._metric_ix = {k: i for i, k in enumerate(self.metrics)}
+
+    def __repr__(self):
+        return (f"Dataset({len(self.issuers)} issuers × {len(self.periods)} periods "
+                f"× {len(self.metrics)} metrics)")
+
+    def has(self, issuer, metric):
+        return issuer in self._issuer_ix and metric in self._metric_ix
+
+    def series(self, issuer, metric, periods=None):
+        """Values of one metric for one issuer, over ``periods`` (default: all).
+
+        A run of consecutive periods is returned as a view (no copy).
+        """
+        row = self.values[self._issuer_ix[issuer], :, self._metric_ix[metric]]
+        if periods is None:
+            return row
+        ix = [self._period_ix[p] for p in periods]
+        if ix and ix == list(range(ix[0], ix[0] + len(ix))):
+            return row[ix[0]:ix[-1] + 1]
+        return row[ix]
+
+    def value(self, issuer, period, metric):
+        return float(self.values[self._issuer_ix[issuer], self._period_ix[period],
+                                 self._metric_ix[metric]])
+
+    def values_at(self, issuer, period, metrics):
+        """Several metrics for one issuer/period, in the order given."""
+        ix = [self._metric_ix[m] for m in metrics]
+        return self.values[self._issuer_ix[issuer], self._period_ix[period], ix]
+
+    def periods_with(self, issuer, metric):
+        """Periods where ``issuer`` has an observation of ``metric``, in order."""
+        row = self.series(issuer, metric)
+        return [self.periods[i] for i in np.flatnonzero(~np.isnan(row))]
+
+    def window(self, issuer, metric, last=None, until=None):
+        """(periods, values) for the most recent ``last`` observations.
+
+        ``until`` ends the window at that period instead of the latest one.
+        """
+        periods = self.periods_with(issuer, metric)
+        if until is not None:
+            periods = periods[:periods.index(until) + 1] if until in periods else []
+        if last:
+            periods = periods[-last:]
+        return periods, self.series(issuer, metric, periods)
+
+
+def from_columns(issuer, period, metric, value):
+    """Build a Dataset from four parallel columns."""
+    issuers, i_ix = np.unique(np.asarray(issuer, dtype=str), return_inverse=True)
+    periods, p_ix = np.unique(np.asarray(period, dtype=str), return_inverse=True)
+    metrics, m_ix = np.unique(np.asarray(metric, dtype=str), return_inverse=True)
+    values = np.full((len(issuers), len(periods), len(metrics)), np.nan)
+    values[i_ix, p_ix, m_ix] = np.asarray(value, dtype=float)
+    return Dataset(issuers.tolist(), periods.tolist(), metrics.tolist(), values)
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        cols = list(zip(*reader))
+    return {name: cols[header.index(name)] for name in COLUMNS}
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):       # columnar: {"issuer": [...], ...}
+        return {name: data[name] for name in COLUMNS}
+    return {name: [rec[name] for rec in data] for name in COLUMNS}  # records
+
+
+def _read_parquet(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading .parquet requires pyarrow (pip install pyarrow)") from None
+    table = pq.read_table(path, columns=list(COLUMNS))
+    return {name: table.column(name).to_numpy(zero_copy_only=False) for name in COLUMNS}
+
+
+READERS = {".csv": _read_csv, ".json": _read_json, ".parquet": _read_parquet}
+
+
+def load_dataset(path=DEFAULT_PATH, derived=True):
+    """Load a CSV / JSON / Parquet fundamentals file or a store into a Dataset.
+
+    With ``derived`` (the default) the derived metrics are added as well;
+    a store saved with them is used as is.
+    """
+    if os.path.isdir(path):
+        ds, has_derived = load_store(path)
+        return derive(ds) if derived and not has_derived else ds
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f"Unsupported dataset format: {path} (expected {', '.join(READERS)})")
+    cols = READERS[ext](path)
+    ds = from_columns(cols["issuer"], cols["period"], cols["metric"], cols["value"])
+    return derive(ds) if derived else ds
+
+
+# ─────────────────────────────────────────────────────────────────
+# Derived metrics
+# ─────────────────────────────────────────────────────────────────
+# derive() computes these for every issuer at once, one array operation
+# per kind over the whole cube:
+#   op_margin, net_margin  income / revenue × 100; reported values win
+#   yoy.<m>                % change on the same period a year earlier
+#                          (percentage points for *_margin metrics)
+#   beat.<m>               % surprise of <m> against consensus.<m>
+#   guidance_delta.<m>     % revision of guidance.<m> on guidance_prev.<m>
+#   cumulative.<m>         running total over the quarters, for CUMULATIVE
+MARGINS = {"op_margin": "op_income", "net_margin": "net_income"}
+CUMULATIVE = ("sw2_units",)
+
+def prior_year_index(periods):
+    """Index of the same period one fiscal year earlier (-1 if absent)."""
+    ix = {p: i for i, p in enumerate(periods)}
+    prior = np.full(len(periods), -1)
+    for i, period in enumerate(periods):
+        m = PERIOD_RE.fullmatch(period)
+        if m:
+            prior[i] = ix.get(f"FY{int(m[1]) - 1}{m[2] or ''}", -1)
+    return prior
+
+def _percent(num, den):
+    """num / den × 100, NaN where den is 0 or missing."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den != 0, num / den * 100, np.nan)
+
+def _pct_change(new, base):
+    return _percent(new - base, np.abs(base))
+
+def derive(ds):
+    """A Dataset with the derived metrics added (or filled in).
+
+    Only the metric columns a derivation needs are read from ``ds.values``,
+    so a mapped store cube is not copied up front; the result cube is
+    allocated once, source and derived metrics together.
+    """
+    source = ds.values
+    metric_ix = ds._metric_ix
+    filled, added = {}, {}
+
+    def column(metric):
+        for derived in (filled, added):
+            if metric in derived:
+                return derived[metric]
+        return source[:, :, metric_ix[metric]] if metric in metric_ix else None
+
+    revenue = column("revenue")
+    if revenue is not None:
+        for margin, income in MARGINS.items():
+            if income not in metric_ix:
+                continue
+            computed = _percent(column(income), revenue)
+            if margin in metric_ix:
+                reported = column(margin)
+                if np.isnan(reported).any():
+                    filled[margin] = np.where(np.isnan(reported), computed, reported)
+            else:
+                added[margin] = computed
+
+    base = [m for m in list(metric_ix) + list(added) if "." not in m]
+    if base:
+        stacked = np.stack([column(m) for m in base], axis=-1)
+        prior = prior_year_index(ds.periods)
+        previous = np.where(prior[None, :, None] >= 0, stacked[:, prior, :], np.nan)
+        points = np.array([m.endswith("_margin") for m in base])
+        yoy = np.where(points, stacked - previous, _pct_change(stacked, previous))
+        added.update({f"yoy.{m}": yoy[:, :, k] for k, m in enumerate(base)})
+
+    for prefix, reference, target in (("beat", "consensus", None),
+                                      ("guidance_delta", "guidance_prev", "guidance")):
+        for metric in metric_ix:
+            if not metric.startswith(reference + "."):
+                continue
+            name = metric.split(".", 1)[1]
+            new = column(f"{target}.{name}" if target else name)
+            if new is not None:
+                added[f"{prefix}.{name}"] = _pct_change(new, column(metric))
+
+    quarters = np.array([bool(PERIOD_RE.fullmatch(p) and p[-2] == "Q") for p in ds.periods])
+    for metric in CUMULATIVE:
+        if metric in metric_ix:
+            q = column(metric)[:, quarters]
+            total = np.full(source.shape[:2], np.nan)
+            total[:, quarters] = np.where(np.isnan(q), np.nan, np.nancumsum(q, axis=1))
+            added[f"cumulative.{metric}"] = total
+
+    if not filled and not added:
+        return Dataset(ds.issuers, ds.periods, ds.metrics, source)
+    names = list(added)
+    cube = np.empty(source.shape[:2] + (len(ds.metrics) + len(names),))
+    cube[:, :, :len(ds.metrics)] = source
+    for metric, values in filled.items():
+        cube[:, :, metric_ix[metric]] = values
+    for k, metric in enumerate(names, len(ds.metrics)):
+        cube[:, :, k] = added[metric]
+    return Dataset(ds.issuers, ds.periods, list(ds.metrics) + names, cube)
+
+
+# ─────────────────────────────────────────────────────────────────
+# Memory-mapped store
+# ─────────────────────────────────────────────────────────────────
+# A store is a directory with the cube in values.npy, laid out
+# [issuer, metric, period] so that one issuer's series is contiguous on
+# disk, and the axis labels in index.json. load_store() maps values.npy
+# read-only: opening reads only the header, and slicing a series pages in
+# just that issuer's values, so long windows for thousands of issuers do
+# not have to be loaded up front.
+STORE_VALUES = "values.npy"
+STORE_INDEX = "index.json"
+
+def save_store(ds, path, derived=False):
+    """Write ``ds`` as a store; ``derived`` records that it holds derived metrics."""
+    os.makedirs(path, exist_ok=True)
+    values = os.path.join(path, STORE_VALUES)
+    with open(values + ".tmp", "wb") as f:
+        np.save(f, np.ascontiguousarray(ds.values.transpose(0, 2, 1), dtype=np.float64))
+    os.replace(values + ".tmp", values)
+    index = {"issuers": list(ds.issuers), "periods": list(ds.periods),
+             "metrics": list(ds.metrics), "derived": derived}
+    with open(os.path.join(path, STORE_INDEX), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return path
+
+def load_store(path):
+    """(Dataset backed by the mapped file, whether it holds derived metrics)."""
+    with open(os.path.join(path, STORE_INDEX), encoding="utf-8") as f:
+        index = json.load(f)
+    values = np.load(os.path.join(path, STORE_VALUES), mmap_mode="r")
+    ds = Dataset(index["issuers"], index["periods"], index["metrics"], values.transpose(0, 2, 1))
+    return ds, index.get("derived", False)
+
+
+def quarter_label(period):
+    """'FY2024Q1' -> 'Q1\\nFY24' (axis tick label)."""
+    fy, q = period[2:].split("Q")
+    return f"Q{q}\nFY{fy[-2:]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert a fundamentals file into a memory-mapped store")
+    parser.add_argument("source", help="fundamentals dataset (.csv / .json / .parquet)")
+    parser.add_argument("store", help="output store directory")
+    parser.add_argument("--no-derived", action="store_true",
+                        help="store only the source metrics")
+    args = parser.parse_args(argv)
+
+    try:
+        ds = load_dataset(args.source, derived=not args.no_derived)
+    except ImportError as e:
+        parser.exit(1, f"{e}\n")
+    save_store(ds, args.store, derived=not args.no_derived)
+    print(f"✅ {ds} saved in {args.store}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,51 @@
 #!/usr/bin/env python3
-"""Chart generation for Sony & Nintendo Earnings Update Report"""
+"""Chart generation for Sony & Nintendo Earnings Update Report
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-plt.rcParams['font.family'] = 'Hiragino Sans'
-import matplotlib.patches as mpatches
-import numpy as np
+The plotted numbers come from the fundamentals dataset (data/fundamentals.csv,
+see fundamentals.py). Each figure is described by a spec (output name, figure
+size, layout template and the data sliced from the dataset). render_chart()
+turns one spec into a PNG, so the specs can be rendered serially or spread
+across a process pool:
+
+    python generate_charts.py            # serial
+    python generate_charts.py --jobs 4   # 4 worker processes
+    python generate_charts.py --issuers all --data universe.parquet
+
+A manifest next to the output directory (charts.manifest.json) records a
+content hash per figure; figures whose hash is unchanged are not redrawn.
+Use --force to redraw everything, --dry-run to only report what would be
+redrawn, and --figures to render a subset.
+
+Each figure is laid out once and written in every requested format from
+the same canvas; --pdf also collects the figures into one multi-page PDF:
+
+    python generate_charts.py --formats png,svg --pdf charts/report_charts.pdf
+
+--fixed-bbox saves the full figure area instead of trimming it to the
+tight bounding box, which skips the extra layout pass per file.
+
+matplotlib is imported only once a figure actually has to be drawn, so
+--help, --dry-run and all-cached runs start without it.
+"""
+
+import argparse
+import functools
+import hashlib
+import json
 import os
+import pickle
+import re
+import sys
+
+import numpy as np
+
+from fundamentals import DEFAULT_PATH, PERIOD_RE, load_dataset, quarter_label
 
-# Create output directory
-os.makedirs("charts", exist_ok=True)
+OUTPUT_DIR = "charts"
+DPI        = 150
+# First installed family wins; CJK families first so Japanese labels render.
+FONT_FAMILIES = ["Hiragino Sans", "Noto Sans CJK JP", "IPAexGothic", "Yu Gothic",
+                 "DejaVu Sans"]
 
 # ── Color palette ──────────────────────────────────────────────
 SONY_BLUE   = "#003087"
@@ -23,10 +58,53 @@ GRAY        = "#BDC3C7"
 DARK_GRAY   = "#2C3E50"
 BG_WHITE    = "#FAFAFA"
 
-def style_ax(ax, title, xlabel="", ylabel=""):
-    ax.set_title(title, fontsize=11, fontweight="bold", color=DARK_GRAY, pad=10)
-    ax.set_xlabel(xlabel, fontsize=8, color=DARK_GRAY)
-    ax.set_ylabel(ylabel, fontsize=8, color=DARK_GRAY)
+PALETTE = {
+    "SONY_BLUE": SONY_BLUE, "SONY_LIGHT": SONY_LIGHT,
+    "NINTENDO_RED": NINTENDO_RED, "NINTENDO_LIGHT": NINTENDO_LIGHT,
+    "BEAT_GREEN": BEAT_GREEN, "MISS_RED": MISS_RED,
+    "GRAY": GRAY, "DARK_GRAY": DARK_GRAY, "BG_WHITE": BG_WHITE,
+}
+
+# Per-figure output formats (the multi-page PDF is requested with --pdf)
+FORMATS = ("png", "svg")
+# Drop creation timestamps so unchanged figures produce byte-identical files.
+SAVE_METADATA = {"svg": {"Date": None}, "pdf": {"CreationDate": None}}
+
+# Bump when a template changes in a way the spec data does not capture.
+CACHE_VERSION = 4
+
+@functools.lru_cache(maxsize=None)
+def resolve_font_family():
+    """First of FONT_FAMILIES known to the font manager (looked up once per process).
+
+    Setting a missing family in rcParams makes matplotlib repeat the failed
+    lookup, with a warning, for every text artist.
+    """
+    from matplotlib import font_manager
+    installed = {f.name for f in font_manager.fontManager.ttflist}
+    return next((f for f in FONT_FAMILIES if f in installed), "sans-serif")
+
+def init_matplotlib():
+    """Per-process matplotlib setup (also used as the pool initializer)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    matplotlib.rcParams['font.family'] = resolve_font_family()
+    # Stable SVG element ids (otherwise derived from object addresses)
+    matplotlib.rcParams['svg.hashsalt'] = "charts"
+
+@functools.lru_cache(maxsize=None)
+def matplotlib_version():
+    """Installed matplotlib version, without importing matplotlib if possible."""
+    if "matplotlib" in sys.modules:
+        return sys.modules["matplotlib"].__version__
+    from importlib.metadata import version
+    return version("matplotlib")
+
+def style_ax(ax):
+    """Static frame styling shared by every chart (applied once per template)."""
+    ax.set_title("", fontsize=11, fontweight="bold", color=DARK_GRAY, pad=10)
+    ax.set_xlabel("", fontsize=8, color=DARK_GRAY)
+    ax.set_ylabel("", fontsize=8, color=DARK_GRAY)
     ax.tick_params(colors=DARK_GRAY, labelsize=7)
     ax.spines["top"].set_visible(False)
     ax.spines["right"].set_visible(False)
@@ -35,313 +113,659 @@ def style_ax(ax, title, xlabel="", ylabel=""):
     ax.set_facecolor(BG_WHITE)
     ax.grid(axis="y", color=GRAY, linestyle="--", linewidth=0.5, alpha=0.7)
 
-# ─────────────────────────────────────────────────────────────────
-# Figure 1: Sony 四半期別売上高推移
-# ─────────────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-quarters = ["Q1\nFY24", "Q2\nFY24", "Q3\nFY24", "Q4\nFY24",
-            "Q1\nFY25", "Q2\nFY25", "Q3\nFY25"]
-sony_rev = [2890, 2975, 3685, 3420, 2980, 3010, 3714]  # 億円 (¥B)
-colors = [SONY_LIGHT]*6 + [SONY_BLUE]
-
-bars = ax.bar(quarters, sony_rev, color=colors, width=0.6, edgecolor="white", linewidth=0.5)
-for bar, val in zip(bars, sony_rev):
-    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 30,
-            f"¥{val:,}B", ha="center", va="bottom", fontsize=7, color=DARK_GRAY)
-
-ax.set_ylim(0, 4500)
-style_ax(ax, "図1：ソニーグループ 四半期別売上高推移（単位：十億円）",
-         ylabel="売上高（十億円）")
-ax.text(0.99, 0.02, "出所：ソニーグループ決算短信 / 当社推計", transform=ax.transAxes,
-        ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/sony_revenue.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 1 saved")
-
-# ─────────────────────────────────────────────────────────────────
-# Figure 2: Sony 営業利益・利益率推移
-# ─────────────────────────────────────────────────────────────────
-fig, ax1 = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-op_income = [180, 205, 421, 310, 198, 248, 515]
-op_margin = [6.2, 6.9, 11.5, 9.1, 6.6, 8.2, 13.9]
-
-ax2 = ax1.twinx()
-bars = ax1.bar(quarters, op_income, color=[SONY_LIGHT]*6 + [SONY_BLUE],
-               width=0.6, edgecolor="white", alpha=0.85)
-ax2.plot(quarters, op_margin, color=NINTENDO_RED, marker="o",
-         linewidth=2, markersize=6, zorder=5)
-ax2.set_ylim(0, 20)
-ax2.set_ylabel("営業利益率（%）", fontsize=8, color=NINTENDO_RED)
-ax2.tick_params(axis="y", colors=NINTENDO_RED, labelsize=7)
-
-for bar, val in zip(bars, op_income):
-    ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 5,
-             f"¥{val}B", ha="center", va="bottom", fontsize=6.5, color=DARK_GRAY)
-
-ax1.set_ylim(0, 700)
-style_ax(ax1, "図2：ソニーグループ 営業利益・営業利益率推移", ylabel="営業利益（十億円）")
-ax1.text(0.99, 0.02, "出所：ソニーグループ決算短信 / 当社推計", transform=ax1.transAxes,
-         ha="right", va="bottom", fontsize=6, color=GRAY)
-patch_bar = mpatches.Patch(color=SONY_BLUE, label="営業利益（十億円）")
-line_margin = plt.Line2D([0], [0], color=NINTENDO_RED, marker="o", markersize=5,
-                          label="営業利益率（%）")
-ax1.legend(handles=[patch_bar, line_margin], fontsize=7, loc="upper left")
-plt.tight_layout()
-plt.savefig("charts/sony_operating_income.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 2 saved")
+# Value label formats used across the figures
+FMT_YEN_B   = "¥{:,.0f}B"   # ¥3,714B
+FMT_INT     = "{:.0f}"      # 1614
+FMT_UNITS_M = "{:.2f}M"     # 7.01M
+FMT_PCT_CHG = "{:+.1f}%"    # +22.0%
 
-# ─────────────────────────────────────────────────────────────────
-# Figure 3: Sony セグメント別売上高 (Q3 FY2025)
-# ─────────────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-segments = ["G&NS\nゲーム", "I&SS\nセンサー", "ET&S\nエレクトロ", "Music\n音楽", "Pictures\n映像"]
-seg_sales = [1614, 585, 658, 542, 340]  # ¥B approx
-seg_oi    = [141, 95, 59, 106, 27]      # operating income ¥B
-seg_colors = [SONY_BLUE, "#2980B9", "#5DADE2", "#85C1E9", "#AED6F1"]
-
-x = np.arange(len(segments))
-w = 0.35
-b1 = ax.bar(x - w/2, seg_sales, w, label="売上高（十億円）", color=seg_colors, edgecolor="white")
-b2 = ax.bar(x + w/2, seg_oi,   w, label="営業利益（十億円）",
-            color=BEAT_GREEN, alpha=0.7, edgecolor="white")
-
-for bar, v in zip(b1, seg_sales):
-    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 5,
-            f"{v}", ha="center", va="bottom", fontsize=6.5, color=DARK_GRAY)
-for bar, v in zip(b2, seg_oi):
-    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 5,
-            f"{v}", ha="center", va="bottom", fontsize=6.5, color=DARK_GRAY)
-
-ax.set_xticks(x)
-ax.set_xticklabels(segments, fontsize=8)
-ax.legend(fontsize=8, loc="upper right")
-style_ax(ax, "図3：ソニーグループ セグメント別業績（Q3 FY2025）", ylabel="金額（十億円）")
-ax.text(0.99, 0.02, "出所：ソニーグループ決算短信 2026年2月5日", transform=ax.transAxes,
-        ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/sony_segments.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 3 saved")
+def label_bars(ax, bars, fmt, padding=2, fontsize=7, color=DARK_GRAY, **text_kw):
+    """Label every bar of a container in one call.
 
-# ─────────────────────────────────────────────────────────────────
-# Figure 4: Sony Beat/Miss サマリー
-# ─────────────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(7, 3.5))
-fig.patch.set_facecolor(BG_WHITE)
-
-metrics  = ["売上高", "営業利益", "純利益", "EPS（ADR）"]
-reported = [3714, 515, 377, 41]
-est      = [3680, 422, 340, 33]
-unit     = ["¥B", "¥B", "¥B", "¢"]
-beat     = [(r - e) / e * 100 for r, e in zip(reported, est)]
-colors_b = [BEAT_GREEN if b >= 0 else MISS_RED for b in beat]
-
-bars = ax.barh(metrics, beat, color=colors_b, edgecolor="white", height=0.5)
-ax.axvline(0, color=DARK_GRAY, linewidth=1)
-for bar, b_val in zip(bars, beat):
-    xpos = b_val + 0.2 if b_val >= 0 else b_val - 0.2
-    ha = "left" if b_val >= 0 else "right"
-    ax.text(xpos, bar.get_y() + bar.get_height()/2,
-            f"{b_val:+.1f}%", va="center", ha=ha, fontsize=9, color=DARK_GRAY, fontweight="bold")
-
-ax.set_xlim(-10, 35)
-style_ax(ax, "図4：ソニーQ3 FY2025 コンセンサス比較（ビート/ミス）", xlabel="コンセンサス比（%）")
-ax.text(0.99, 0.02, "出所：Bloomberg / ソニーグループ決算短信 2026年2月5日", transform=ax.transAxes,
-        ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/sony_beat_miss.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 4 saved")
-
-# ─────────────────────────────────────────────────────────────────
-# Figure 5: Nintendo 四半期別売上高推移
-# ─────────────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-n_quarters = ["Q1\nFY25", "Q2\nFY25", "Q3\nFY25", "Q4\nFY25",
-               "Q1\nFY26", "Q2\nFY26", "Q3\nFY26"]
-n_rev = [430, 460, 820, 610, 580, 568, 758]  # ¥B approx
-n_colors = [NINTENDO_LIGHT]*6 + [NINTENDO_RED]
-
-bars = ax.bar(n_quarters, n_rev, color=n_colors, width=0.6, edgecolor="white", linewidth=0.5)
-for bar, val in zip(bars, n_rev):
-    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 5,
-            f"¥{val}B", ha="center", va="bottom", fontsize=7, color=DARK_GRAY)
-
-ax.set_ylim(0, 950)
-style_ax(ax, "図5：任天堂 四半期別売上高推移（単位：十億円）", ylabel="売上高（十億円）")
-ax.text(0.99, 0.02, "出所：任天堂決算短信 / 当社推計", transform=ax.transAxes,
-        ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/nintendo_revenue.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 5 saved")
+    Positions come from ax.bar_label (bar ends plus ``padding`` points, on
+    the far side for negative values), so no per-bar Text bookkeeping is
+    needed. ``fmt`` is a str.format pattern such as FMT_YEN_B.
+    """
+    return ax.bar_label(bars, fmt=fmt, padding=padding, fontsize=fontsize,
+                        color=color, **text_kw)
 
 # ─────────────────────────────────────────────────────────────────
-# Figure 6: Nintendo Switch 2 販売台数推移
+# Figure templates
+#
+# A template owns one styled figure (frame, grid, title/axis-label and
+# source-footnote artists, twin axis where needed). fill() removes the
+# previous chart's data artists and draws the new data into the same
+# figure, so a process rendering many charts pays the setup cost once
+# per layout rather than once per chart.
 # ─────────────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-sw2_quarters  = ["Q1 FY26\n(Jun-Sep)", "Q2 FY26\n(Jul-Sep)", "Q3 FY26\n(Oct-Dec)"]
-sw2_quarterly = [6.26, 4.1, 7.01]   # million units per quarter (approx)
-sw2_cumulative = [6.26, 10.36, 17.37]
-
-ax2 = ax.twinx()
-bars = ax.bar(sw2_quarters, sw2_quarterly, color=[NINTENDO_LIGHT, NINTENDO_LIGHT, NINTENDO_RED],
-              width=0.5, edgecolor="white")
-ax2.plot(sw2_quarters, sw2_cumulative, color=DARK_GRAY, marker="s",
-         linewidth=2, markersize=7, zorder=5)
-ax2.set_ylim(0, 25)
-ax2.set_ylabel("累計販売台数（百万台）", fontsize=8, color=DARK_GRAY)
-ax2.tick_params(axis="y", colors=DARK_GRAY, labelsize=7)
-
-for bar, v in zip(bars, sw2_quarterly):
-    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
-            f"{v:.2f}M", ha="center", va="bottom", fontsize=8, color=DARK_GRAY)
-for xp, yp, v in zip(range(3), sw2_cumulative, sw2_cumulative):
-    ax2.text(xp + 0.15, yp + 0.5, f"累計{v}M台", fontsize=7, color=DARK_GRAY)
-
-ax.set_ylim(0, 12)
-style_ax(ax, "図6：Nintendo Switch 2 四半期別・累計販売台数", ylabel="四半期販売台数（百万台）")
-patch_q = mpatches.Patch(color=NINTENDO_RED, label="四半期販売台数（百万台）")
-line_c = plt.Line2D([0], [0], color=DARK_GRAY, marker="s", markersize=5, label="累計販売台数（百万台）")
-ax.legend(handles=[patch_q, line_c], fontsize=7, loc="upper left")
-ax.text(0.99, 0.02, "出所：任天堂決算短信 2026年2月3日", transform=ax.transAxes,
-        ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/nintendo_switch2.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 6 saved")
+SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
+
+class ChartTemplate:
+    twin = False
+
+    def __init__(self, figsize):
+        import matplotlib.pyplot as plt
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        self.fig.patch.set_facecolor(BG_WHITE)
+        self.ax2 = self.ax.twinx() if self.twin else None
+        style_ax(self.ax)
+        self.source = self.ax.text(0.99, 0.02, "", transform=self.ax.transAxes,
+                                   ha="right", va="bottom", fontsize=6, color=GRAY)
+        self._artists = []
+        self.setup()
+
+    def setup(self):
+        """Layout-specific static artists."""
+
+    def keep(self, *artists):
+        """Register data artists so the next fill() removes them."""
+        self._artists.extend(artists)
+
+    def clear(self):
+        """Remove the previous chart's artists and undo its layout.
+
+        tight_layout() starts from the current subplot params, so they are
+        reset to the rcParams defaults; otherwise each refill would start
+        from the previous chart's layout and the result would depend on
+        render order.
+        """
+        import matplotlib
+        for artist in self._artists:
+            artist.remove()
+        self._artists = []
+        for ax in (self.ax, self.ax2):
+            if ax is not None:
+                if ax.get_legend():
+                    ax.get_legend().remove()
+                ax.relim()
+        self.fig.subplots_adjust(**{k: matplotlib.rcParams[f"figure.subplot.{k}"]
+                                    for k in SUBPLOT_PARAMS})
+
+    def fill(self, title, source, xlabel="", ylabel="", **data):
+        self.clear()
+        self.ax.title.set_text(title)
+        self.ax.xaxis.label.set_text(xlabel)
+        self.ax.yaxis.label.set_text(ylabel)
+        self.source.set_text(source)
+        self.draw(**data)
+
+    def draw(self, **data):
+        raise NotImplementedError
+
+    def layout(self, dpi=DPI, fixed_bbox=False):
+        """Run tight_layout and return the bbox (inches) to save with.
+
+        bbox_inches="tight" would measure the figure again on every savefig;
+        measuring once here, at the output dpi, gives the same crop for every
+        format. With ``fixed_bbox`` the whole figure area is saved (None).
+        """
+        self.fig.tight_layout()
+        return None if fixed_bbox else self.tight_bbox(dpi)
+
+    def tight_bbox(self, dpi=DPI):
+        """Padded tight bounding box (inches), measured at ``dpi``."""
+        import matplotlib
+        fig = self.fig
+        screen_dpi = fig.dpi
+        fig.set_dpi(dpi)
+        try:
+            bbox = fig.get_tightbbox(fig.canvas.get_renderer())
+        finally:
+            fig.set_dpi(screen_dpi)
+        return bbox.padded(matplotlib.rcParams["savefig.pad_inches"])
+
+    def save(self, stem, formats=("png",), dpi=DPI, fixed_bbox=False, pdf=None):
+        """Write <stem>.<fmt> for each format (and a page to ``pdf``) from one layout.
+
+        Returns the bbox used, so a caller in another process can add the
+        same page to its own PdfPages.
+        """
+        bbox = self.layout(dpi, fixed_bbox)
+        for fmt in formats:
+            self.fig.savefig(f"{stem}.{fmt}", dpi=dpi, bbox_inches=bbox,
+                             metadata=SAVE_METADATA.get(fmt))
+        if pdf is not None:
+            pdf.savefig(self.fig, bbox_inches=bbox)
+        return bbox
+
+class BarTemplate(ChartTemplate):
+    """Single bar series, e.g. quarterly revenue (Figures 1, 5, 8)."""
+
+    def draw(self, labels, values, colors, ylim, fmt=FMT_YEN_B, width=0.6,
+             linewidth=0.5, label_size=7, label_weight="normal", ymin=0):
+        ax = self.ax
+        x = np.arange(len(labels))
+        bars = ax.bar(x, values, color=colors, width=width, edgecolor="white",
+                      linewidth=linewidth)
+        self.keep(bars, *label_bars(ax, bars, fmt, fontsize=label_size,
+                                    fontweight=label_weight))
+        ax.set_xticks(x, labels)
+        ax.set_ylim(ymin, ylim)
+
+class BarLineTemplate(ChartTemplate):
+    """Bars on the left axis, a line on a twin right axis (Figures 2, 6, 7)."""
+    twin = True
+
+    def draw(self, labels, bars, line, colors, ylim, line_ylim, line_color, marker,
+             line_ylabel, bar_legend, line_legend, fmt=FMT_YEN_B, width=0.6,
+             alpha=0.85, markersize=6, label_size=6.5, point_fmt=None):
+        from matplotlib.lines import Line2D
+        from matplotlib.patches import Patch
+        ax1, ax2 = self.ax, self.ax2
+        x = np.arange(len(labels))
+        container = ax1.bar(x, bars, color=colors, width=width, edgecolor="white", alpha=alpha)
+        lines = ax2.plot(x, line, color=line_color, marker=marker,
+                         linewidth=2, markersize=markersize, zorder=5)
+        self.keep(container, *lines, *label_bars(ax1, container, fmt, fontsize=label_size))
+        if point_fmt:
+            self.keep(*[ax2.text(xp + 0.15, yp + 0.5, point_fmt.format(yp),
+                                 fontsize=7, color=DARK_GRAY)
+                        for xp, yp in zip(x, line)])
+
+        ax2.set_ylim(0, line_ylim)
+        ax2.set_ylabel(line_ylabel, fontsize=8, color=line_color)
+        ax2.tick_params(axis="y", colors=line_color, labelsize=7)
+        ax1.set_xticks(x, labels)
+        ax1.set_ylim(0, ylim)
+        handles = [Patch(color=colors[-1], label=bar_legend),
+                   Line2D([0], [0], color=line_color, marker=marker, markersize=5,
+                              label=line_legend)]
+        ax1.legend(handles=handles, fontsize=7, loc="upper left")
+
+class GroupedBarTemplate(ChartTemplate):
+    """Two or more side-by-side bar series per category (Figures 3, 10).
+
+    Each entry of ``series`` is a dict with values / label / color and
+    optional alpha, label_color and label_weight.
+    """
+
+    def draw(self, labels, series, width, fmt, label_size, legend_loc="best"):
+        ax = self.ax
+        x = np.arange(len(labels))
+        shift = (np.arange(len(series)) - (len(series) - 1) / 2) * width
+        for s, dx in zip(series, shift):
+            bars = ax.bar(x + dx, s["values"], width, label=s["label"], color=s["color"],
+                          alpha=s.get("alpha"), edgecolor="white")
+            self.keep(bars, *label_bars(ax, bars, fmt, fontsize=label_size,
+                                        color=s.get("label_color", DARK_GRAY),
+                                        fontweight=s.get("label_weight", "normal")))
+        ax.set_xticks(x, labels)
+        ax.legend(fontsize=8, loc=legend_loc)
+
+class BeatMissTemplate(ChartTemplate):
+    """Horizontal reported-vs-consensus surprise bars (Figure 4)."""
+
+    def setup(self):
+        self.ax.axvline(0, color=DARK_GRAY, linewidth=1)
+
+    def draw(self, labels, beat, xlim=(-10, 35)):
+        ax = self.ax
+        y = np.arange(len(labels))
+        colors_b = np.where(beat >= 0, BEAT_GREEN, MISS_RED)
+        bars = ax.barh(y, beat, color=colors_b, edgecolor="white", height=0.5)
+        self.keep(bars, *label_bars(ax, bars, FMT_PCT_CHG, fontsize=9, fontweight="bold"))
+        ax.set_yticks(y, labels)
+        ax.set_xlim(*xlim)
+
+class LinesTemplate(ChartTemplate):
+    """Several labelled line series on one axis (Figure 9)."""
+
+    def draw(self, labels, series, ylim, fmt="{}%"):
+        ax = self.ax
+        x = np.arange(len(labels))
+        for s in series:
+            self.keep(*ax.plot(x, s["values"], color=s["color"], marker=s["marker"],
+                               linewidth=2.5, markersize=8, label=s["label"], zorder=5))
+            self.keep(*[ax.text(xp + 0.05, yp + 0.4, fmt.format(yp), fontsize=8, color=s["color"])
+                        for xp, yp in zip(x, s["values"])])
+        ax.set_xticks(x, labels)
+        ax.set_ylim(0, ylim)
+        ax.legend(fontsize=9)
+
+TEMPLATES = {
+    "bar": BarTemplate,
+    "bar_line": BarLineTemplate,
+    "grouped_bar": GroupedBarTemplate,
+    "beat_miss": BeatMissTemplate,
+    "lines": LinesTemplate,
+}
+
+_template_cache = {}
+
+def get_template(kind, figsize):
+    """Per-process template instance for (layout, figsize), built on first use."""
+    key = (kind, tuple(figsize))
+    if key not in _template_cache:
+        _template_cache[key] = TEMPLATES[kind](figsize)
+    return _template_cache[key]
 
 # ─────────────────────────────────────────────────────────────────
-# Figure 7: Nintendo 営業利益・利益率推移
+# Issuer presentation (anything not listed gets DEFAULT_ISSUER_STYLE)
+#
+# fy_offset maps an issuer's fiscal-year label to the calendar year its
+# fiscal year starts in (every fiscal year starts in FISCAL_YEAR_START):
+# Sony labels Apr 2025 – Mar 2026 as FY2025 (0), Nintendo as FY2026 (-1).
 # ─────────────────────────────────────────────────────────────────
-fig, ax1 = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-n_op_income = [65, 80, 156, 98, 55, 62, 143]
-n_op_margin = [15.1, 17.4, 19.0, 16.1, 9.5, 10.9, 19.2]
-
-ax2 = ax1.twinx()
-bars = ax1.bar(n_quarters, n_op_income, color=[NINTENDO_LIGHT]*6 + [NINTENDO_RED],
-               width=0.6, edgecolor="white", alpha=0.85)
-ax2.plot(n_quarters, n_op_margin, color=SONY_BLUE, marker="D",
-         linewidth=2, markersize=6, zorder=5)
-ax2.set_ylim(0, 30)
-ax2.set_ylabel("営業利益率（%）", fontsize=8, color=SONY_BLUE)
-ax2.tick_params(axis="y", colors=SONY_BLUE, labelsize=7)
-
-for bar, v in zip(bars, n_op_income):
-    ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
-             f"¥{v}B", ha="center", va="bottom", fontsize=6.5, color=DARK_GRAY)
-
-ax1.set_ylim(0, 200)
-style_ax(ax1, "図7：任天堂 営業利益・営業利益率推移", ylabel="営業利益（十億円）")
-patch_bar = mpatches.Patch(color=NINTENDO_RED, label="営業利益（十億円）")
-line_m = plt.Line2D([0], [0], color=SONY_BLUE, marker="D", markersize=5, label="営業利益率（%）")
-ax1.legend(handles=[patch_bar, line_m], fontsize=7, loc="upper left")
-ax1.text(0.99, 0.02, "出所：任天堂決算短信 / 当社推計", transform=ax1.transAxes,
-         ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/nintendo_operating_income.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 7 saved")
+FISCAL_YEAR_START = 4   # April
+
+ISSUER_STYLES = {
+    "sony": {"name": "ソニーグループ", "color": SONY_BLUE, "light": SONY_LIGHT,
+             "line": NINTENDO_RED, "marker": "o", "fy_offset": 0,
+             "source": "出所：ソニーグループ決算短信 / 当社推計"},
+    "nintendo": {"name": "任天堂", "color": NINTENDO_RED, "light": NINTENDO_LIGHT,
+                 "line": SONY_BLUE, "marker": "D", "fy_offset": -1,
+                 "source": "出所：任天堂決算短信 / 当社推計"},
+}
+DEFAULT_ISSUER_STYLE = {"color": SONY_BLUE, "light": SONY_LIGHT,
+                        "line": NINTENDO_RED, "marker": "o", "fy_offset": 0,
+                        "source": "出所：各社決算短信 / 当社推計"}
+
+def issuer_style(issuer):
+    return ISSUER_STYLES.get(issuer, dict(DEFAULT_ISSUER_STYLE, name=issuer))
+
+CALENDAR_QUARTER_RE = re.compile(r"CY(\d{4})Q([1-4])")
+
+def calendar_quarter(issuer, period):
+    """Issuer's fiscal quarter -> calendar quarter, e.g. nintendo FY2026Q3 -> 'CY2025Q4'.
+
+    Calendar quarters are comparable across issuers whose fiscal-year
+    labels differ. Returns None for full-year or unparseable periods.
+    """
+    m = PERIOD_RE.fullmatch(period)
+    if not m or not m[2]:
+        return None
+    month = ((int(m[1]) + issuer_style(issuer)["fy_offset"]) * 12
+             + FISCAL_YEAR_START - 1 + 3 * (int(m[2][1]) - 1))
+    return f"CY{month // 12}Q{month % 12 // 3 + 1}"
+
+def fiscal_quarter(issuer, quarter):
+    """Inverse of calendar_quarter(): 'CY2025Q4' -> nintendo's 'FY2026Q3'."""
+    m = CALENDAR_QUARTER_RE.fullmatch(quarter)
+    months = int(m[1]) * 12 + 3 * (int(m[2]) - 1) - (FISCAL_YEAR_START - 1)
+    return f"FY{months // 12 - issuer_style(issuer)['fy_offset']}Q{months % 12 // 3 + 1}"
+
+def calendar_quarter_label(quarter):
+    """'CY2025Q4' -> '2025年10-12月期'."""
+    m = CALENDAR_QUARTER_RE.fullmatch(quarter)
+    first = 3 * int(m[2]) - 2
+    return f"{m[1]}年{first}-{first + 2}月期"
+
+def highlight_last(n, light, color):
+    return [light]*(n - 1) + [color]
+
+def nice_ceil(x):
+    """Round x up to 1/2/2.5/5 × 10^k, for automatic axis limits."""
+    if x <= 0:
+        return 1
+    mag = 10 ** np.floor(np.log10(x))
+    for step in (1, 2, 2.5, 5, 10):
+        if x <= step * mag:
+            return float(step * mag)
 
 # ─────────────────────────────────────────────────────────────────
-# Figure 8: Nintendo ソフトウェア 主要タイトル販売
+# Spec builders (slice the fundamentals dataset)
 # ─────────────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-titles   = ["Mario Kart\nWorld", "Pokémon\nZ-A", "その他\nSW2タイトル"]
-sw2_units = [14.03, 3.89, 20.01]  # million units
-bar_colors = [NINTENDO_RED, NINTENDO_LIGHT, GRAY]
-
-bars = ax.bar(titles, sw2_units, color=bar_colors, width=0.5, edgecolor="white")
-for bar, v in zip(bars, sw2_units):
-    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.2,
-            f"{v:.2f}M本", ha="center", va="bottom", fontsize=9, color=DARK_GRAY, fontweight="bold")
-
-ax.set_ylim(0, 22)
-style_ax(ax, "図8：Nintendo Switch 2 主要ソフトウェア販売本数（FY2026 Q1-Q3累計）",
-         ylabel="販売本数（百万本）")
-ax.text(0.99, 0.02, "出所：任天堂決算短信 2026年2月3日", transform=ax.transAxes,
-        ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/nintendo_software.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 8 saved")
+def revenue_spec(ds, issuer, fig, quarters=7, ylim=None, until=None):
+    style = issuer_style(issuer)
+    periods, values = ds.window(issuer, "revenue", last=quarters, until=until)
+    ylim = ylim or nice_ceil(np.nanmax(values) * 1.2)
+    return {"fig": fig, "name": f"{issuer}_revenue", "figsize": (8, 4), "template": "bar",
+            "data": {"labels": [quarter_label(p) for p in periods], "values": values,
+                     "colors": highlight_last(len(periods), style["light"], style["color"]),
+                     "ylim": ylim,
+                     "title": f"図{fig}：{style['name']} 四半期別売上高推移（単位：十億円）",
+                     "ylabel": "売上高（十億円）",
+                     "source": style["source"]}}
+
+def income_margin_spec(ds, issuer, fig, quarters=7, ylim=None, margin_ylim=None,
+                       until=None):
+    style = issuer_style(issuer)
+    periods, income = ds.window(issuer, "op_income", last=quarters, until=until)
+    margin = ds.series(issuer, "op_margin", periods)
+    ylim = ylim or nice_ceil(np.nanmax(income) * 1.35)
+    margin_ylim = margin_ylim or nice_ceil(np.nanmax(margin) * 1.4)
+    return {"fig": fig, "name": f"{issuer}_operating_income", "figsize": (8, 4),
+            "template": "bar_line",
+            "data": {"labels": [quarter_label(p) for p in periods],
+                     "bars": income, "line": margin,
+                     "colors": highlight_last(len(periods), style["light"], style["color"]),
+                     "line_color": style["line"], "marker": style["marker"],
+                     "ylim": ylim, "line_ylim": margin_ylim,
+                     "line_ylabel": "営業利益率（%）",
+                     "bar_legend": "営業利益（十億円）", "line_legend": "営業利益率（%）",
+                     "title": f"図{fig}：{style['name']} 営業利益・営業利益率推移",
+                     "ylabel": "営業利益（十億円）",
+                     "source": style["source"]}}
+
+def issuer_specs(ds, issuer, quarters=7, until=None):
+    """Generic two-chart pack (revenue, income + margin) for any issuer.
+
+    ``until`` ends both charts at that period (default: the latest).
+    """
+    return [revenue_spec(ds, issuer, 1, quarters, until=until),
+            income_margin_spec(ds, issuer, 2, quarters, until=until)]
+
+PEER_LIMIT = 12
+
+def peer_margin_spec(ds, quarter, fig=3, limit=PEER_LIMIT):
+    """Operating margin of the ``limit`` largest issuers (by revenue) in a calendar quarter.
+
+    ``quarter`` is a calendar_quarter() key such as 'CY2025Q4'; each issuer
+    contributes its own fiscal quarter covering those months, and its bar
+    is labelled with that fiscal period.
+    """
+    own = [fiscal_quarter(issuer, quarter) for issuer in ds.issuers]
+    rows = [i for i, p in enumerate(own) if p in ds.periods]
+    cols = [ds.periods.index(own[i]) for i in rows]
+    revenue = np.full(len(ds.issuers), np.nan)
+    margin = np.full(len(ds.issuers), np.nan)
+    revenue[rows] = ds.values[rows, cols, ds.metrics.index("revenue")]
+    margin[rows] = ds.values[rows, cols, ds.metrics.index("op_margin")]
+    order = [i for i in np.argsort(-np.nan_to_num(revenue, nan=-np.inf))
+             if not np.isnan(margin[i])][:limit]
+    names = [f"{issuer_style(ds.issuers[i])['name']}\n{own[i]}" for i in order]
+    values = margin[order]
+    top = max(float(np.max(values, initial=0)), 1.0)
+    bottom = float(np.min(values, initial=0))
+    return {"fig": fig, "name": f"peers_{quarter}_op_margin", "figsize": (8, 4),
+            "template": "bar",
+            "data": {"labels": names, "values": values,
+                     "colors": [issuer_style(ds.issuers[i])["color"] for i in order],
+                     "ylim": nice_ceil(top * 1.25), "fmt": "{:.1f}%",
+                     "ymin": -nice_ceil(-bottom * 1.25) if bottom < 0 else 0,
+                     "title": f"図{fig}：主要企業 営業利益率比較（{calendar_quarter_label(quarter)}）",
+                     "ylabel": "営業利益率（%）",
+                     "source": DEFAULT_ISSUER_STYLE["source"]}}
+
+SEGMENTS = [("gns", "G&NS\nゲーム"), ("isss", "I&SS\nセンサー"), ("ets", "ET&S\nエレクトロ"),
+            ("music", "Music\n音楽"), ("pictures", "Pictures\n映像")]
+BEAT_METRICS = [("revenue", "売上高"), ("op_income", "営業利益"),
+                ("net_income", "純利益"), ("eps_adr", "EPS（ADR）")]
+SW2_TITLES = [("mario_kart_world", "Mario Kart\nWorld"), ("pokemon_za", "Pokémon\nZ-A"),
+              ("other", "その他\nSW2タイトル")]
+SW2_QUARTER_LABELS = ["Q1 FY26\n(Jun-Sep)", "Q2 FY26\n(Jul-Sep)", "Q3 FY26\n(Oct-Dec)"]
+
+def report_specs(ds):
+    """The ten figures embedded in the Sony / Nintendo earnings report."""
+    seg_keys = [k for k, _ in SEGMENTS]
+    beat_keys = [k for k, _ in BEAT_METRICS]
+    sw2_periods, sw2_quarterly = ds.window("nintendo", "sw2_units")
+    guidance_keys = ["revenue", "op_income"]
+    guidance_scale = np.array([1000, 100])  # ¥B -> 兆円 / 千億円
+
+    return [
+        revenue_spec(ds, "sony", 1, ylim=4500),
+        income_margin_spec(ds, "sony", 2, ylim=700, margin_ylim=20),
+        {"fig": 3, "name": "sony_segments", "figsize": (8, 4), "template": "grouped_bar",
+         "data": {"labels": [label for _, label in SEGMENTS],
+                  "series": [
+                      {"values": ds.values_at("sony", "FY2025Q3",
+                                              [f"segment_sales.{k}" for k in seg_keys]),
+                       "label": "売上高（十億円）",
+                       "color": [SONY_BLUE, "#2980B9", "#5DADE2", "#85C1E9", "#AED6F1"]},
+                      {"values": ds.values_at("sony", "FY2025Q3",
+                                              [f"segment_oi.{k}" for k in seg_keys]),
+                       "label": "営業利益（十億円）", "color": BEAT_GREEN, "alpha": 0.7},
+                  ],
+                  "width": 0.35, "fmt": FMT_INT, "label_size": 6.5,
+                  "legend_loc": "upper right",
+                  "title": "図3：ソニーグループ セグメント別業績（Q3 FY2025）",
+                  "ylabel": "金額（十億円）",
+                  "source": "出所：ソニーグループ決算短信 2026年2月5日"}},
+        {"fig": 4, "name": "sony_beat_miss", "figsize": (7, 3.5), "template": "beat_miss",
+         "data": {"labels": [label for _, label in BEAT_METRICS],
+                  "beat": ds.values_at("sony", "FY2025Q3", [f"beat.{k}" for k in beat_keys]),
+                  "title": "図4：ソニーQ3 FY2025 コンセンサス比較（ビート/ミス）",
+                  "xlabel": "コンセンサス比（%）",
+                  "source": "出所：Bloomberg / ソニーグループ決算短信 2026年2月5日"}},
+        revenue_spec(ds, "nintendo", 5, ylim=950),
+        {"fig": 6, "name": "nintendo_switch2", "figsize": (8, 4), "template": "bar_line",
+         "data": {"labels": SW2_QUARTER_LABELS, "bars": sw2_quarterly,
+                  "line": np.round(ds.series("nintendo", "cumulative.sw2_units", sw2_periods), 2),
+                  "colors": highlight_last(len(sw2_quarterly), NINTENDO_LIGHT, NINTENDO_RED),
+                  "ylim": 12, "line_ylim": 25, "line_color": DARK_GRAY, "marker": "s",
+                  "line_ylabel": "累計販売台数（百万台）",
+                  "bar_legend": "四半期販売台数（百万台）", "line_legend": "累計販売台数（百万台）",
+                  "fmt": FMT_UNITS_M, "width": 0.5, "alpha": None, "markersize": 7,
+                  "label_size": 8, "point_fmt": "累計{}M台",
+                  "title": "図6：Nintendo Switch 2 四半期別・累計販売台数",
+                  "ylabel": "四半期販売台数（百万台）",
+                  "source": "出所：任天堂決算短信 2026年2月3日"}},
+        income_margin_spec(ds, "nintendo", 7, ylim=200, margin_ylim=30),
+        {"fig": 8, "name": "nintendo_software", "figsize": (8, 4), "template": "bar",
+         "data": {"labels": [label for _, label in SW2_TITLES],
+                  "values": ds.values_at("nintendo", "FY2026Q3",
+                                         [f"sw2_software.{k}" for k, _ in SW2_TITLES]),
+                  "colors": [NINTENDO_RED, NINTENDO_LIGHT, GRAY], "ylim": 22,
+                  "fmt": FMT_UNITS_M + "本", "width": 0.5, "linewidth": 1.0,
+                  "label_size": 9, "label_weight": "bold",
+                  "title": "図8：Nintendo Switch 2 主要ソフトウェア販売本数（FY2026 Q1-Q3累計）",
+                  "ylabel": "販売本数（百万本）",
+                  "source": "出所：任天堂決算短信 2026年2月3日"}},
+        {"fig": 9, "name": "comparison_margins", "figsize": (8, 4), "template": "lines",
+         "data": {"labels": ["Q1\nFY25/26", "Q2\nFY25/26", "Q3\nFY25/26"],
+                  "series": [
+                      {"values": ds.window("sony", "op_margin", last=3)[1],
+                       "label": "ソニーグループ", "color": SONY_BLUE, "marker": "o"},
+                      {"values": ds.window("nintendo", "op_margin", last=3)[1],
+                       "label": "任天堂", "color": NINTENDO_RED, "marker": "s"},
+                  ],
+                  "ylim": 25,
+                  "title": "図9：ソニー vs 任天堂 営業利益率比較（FY2026 Q1-Q3）",
+                  "ylabel": "営業利益率（%）",
+                  "source": "出所：各社決算短信 / 当社推計"}},
+        {"fig": 10, "name": "sony_guidance", "figsize": (8, 4), "template": "grouped_bar",
+         "data": {"labels": ["売上高\n（兆円）", "営業利益\n（千億円）"],
+                  "series": [
+                      {"values": ds.values_at("sony", "FY2025",
+                                              [f"guidance_prev.{k}" for k in guidance_keys]) / guidance_scale,
+                       "label": "旧予想（11月時点）", "color": GRAY, "label_color": "black"},
+                      {"values": ds.values_at("sony", "FY2025",
+                                              [f"guidance.{k}" for k in guidance_keys]) / guidance_scale,
+                       "label": "新予想（2月修正）", "color": SONY_BLUE,
+                       "label_color": SONY_BLUE, "label_weight": "bold"},
+                  ],
+                  "width": 0.3, "fmt": "{:g}", "label_size": 9,
+                  "title": "図10：ソニー FY2025 通期業績予想修正（旧 vs 新）",
+                  "ylabel": "金額",
+                  "source": "出所：ソニーグループ 2026年2月5日決算発表"}},
+    ]
 
 # ─────────────────────────────────────────────────────────────────
-# Figure 9: 両社比較 — 営業利益率
+# Renderer
 # ─────────────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-comp_quarters = ["Q1\nFY25/26", "Q2\nFY25/26", "Q3\nFY25/26"]
-sony_margins  = [6.6, 8.2, 13.9]
-nint_margins  = [9.5, 10.9, 19.2]
-
-ax.plot(comp_quarters, sony_margins, color=SONY_BLUE, marker="o",
-        linewidth=2.5, markersize=8, label="ソニーグループ", zorder=5)
-ax.plot(comp_quarters, nint_margins, color=NINTENDO_RED, marker="s",
-        linewidth=2.5, markersize=8, label="任天堂", zorder=5)
-
-for xp, (sm, nm) in enumerate(zip(sony_margins, nint_margins)):
-    ax.text(xp + 0.05, sm + 0.4, f"{sm}%", fontsize=8, color=SONY_BLUE)
-    ax.text(xp + 0.05, nm + 0.4, f"{nm}%", fontsize=8, color=NINTENDO_RED)
-
-ax.set_ylim(0, 25)
-ax.legend(fontsize=9)
-style_ax(ax, "図9：ソニー vs 任天堂 営業利益率比較（FY2026 Q1-Q3）", ylabel="営業利益率（%）")
-ax.text(0.99, 0.02, "出所：各社決算短信 / 当社推計", transform=ax.transAxes,
-        ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/comparison_margins.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 9 saved")
+def output_files(spec, formats=("png",)):
+    return [f"{spec['name']}.{fmt}" for fmt in formats]
+
+def render_chart(spec, outdir=OUTPUT_DIR, dpi=DPI, formats=("png",), fixed_bbox=False,
+                 pdf=None, return_page=False):
+    """Fill the spec's template and save <outdir>/<name>.<fmt> for each format.
+
+    ``pdf`` is an open PdfPages to append the figure to. A pool worker cannot
+    share the parent's PdfPages, so with ``return_page`` it returns the
+    pickled figure and its bbox for the parent to append instead.
+    """
+    template = get_template(spec["template"], spec["figsize"])
+    template.fill(**spec["data"])
+    stem = os.path.join(outdir, spec["name"])
+    bbox = template.save(stem, formats, dpi, fixed_bbox, pdf)
+    if return_page:
+        return pickle.dumps(template.fig), bbox
+    return [f"{stem}.{fmt}" for fmt in formats]
 
 # ─────────────────────────────────────────────────────────────────
-# Figure 10: Sony 通期予想修正（旧 vs 新）
+# Render cache
 # ─────────────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(8, 4))
-fig.patch.set_facecolor(BG_WHITE)
-
-categories = ["売上高\n（兆円）", "営業利益\n（千億円）"]
-old_vals   = [11.94, 14.26]
-new_vals   = [12.30, 15.40]
-x = np.arange(len(categories))
-w = 0.3
-
-bars_old = ax.bar(x - w/2, old_vals, w, label="旧予想（11月時点）", color=GRAY, edgecolor="white")
-bars_new = ax.bar(x + w/2, new_vals, w, label="新予想（2月修正）", color=SONY_BLUE, edgecolor="white")
-
-for bar, v in zip(bars_old, old_vals):
-    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
-            f"{v}", ha="center", va="bottom", fontsize=9)
-for bar, v in zip(bars_new, new_vals):
-    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
-            f"{v}", ha="center", va="bottom", fontsize=9, color=SONY_BLUE, fontweight="bold")
-
-ax.set_xticks(x)
-ax.set_xticklabels(categories, fontsize=9)
-ax.legend(fontsize=8)
-style_ax(ax, "図10：ソニー FY2025 通期業績予想修正（旧 vs 新）", ylabel="金額")
-ax.text(0.99, 0.02, "出所：ソニーグループ 2026年2月5日決算発表", transform=ax.transAxes,
-        ha="right", va="bottom", fontsize=6, color=GRAY)
-plt.tight_layout()
-plt.savefig("charts/sony_guidance.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("✓ Figure 10 saved")
-
-print("\n✅ All charts generated in ./charts/")
+def manifest_path(outdir):
+    """charts/ -> charts.manifest.json (kept next to, not inside, the directory)."""
+    return os.path.normpath(outdir) + ".manifest.json"
+
+def spec_key(spec, dpi=DPI, fixed_bbox=False):
+    """Content hash of everything that affects a figure's pixels."""
+    payload = {
+        "version": CACHE_VERSION,
+        "template": spec["template"],
+        "figsize": spec["figsize"],
+        "data": spec["data"],
+        "palette": PALETTE,
+        "font": FONT_FAMILIES,
+        "matplotlib": matplotlib_version(),
+        "dpi": dpi,
+        "fixed_bbox": fixed_bbox,
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False,
+                      default=lambda o: o.tolist() if hasattr(o, "tolist") else list(o))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def book_key(keys):
+    """Hash of a multi-page PDF: the page keys, in page order."""
+    return hashlib.sha256("\n".join(keys).encode("ascii")).hexdigest()
+
+def load_manifest(outdir):
+    """Return (per-figure entries, {pdf path: book key})."""
+    try:
+        with open(manifest_path(outdir), encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("charts", {}), data.get("books", {})
+    except (OSError, ValueError):
+        return {}, {}
+
+def save_manifest(outdir, entries, books=None):
+    path = manifest_path(outdir)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "charts": entries, "books": books or {}}, f,
+                  ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def render_all(specs, outdir=OUTPUT_DIR, jobs=1, dpi=DPI, force=False,
+               prune=True, dry_run=False, formats=("png",), pdf_path=None,
+               fixed_bbox=False):
+    """Render specs serially (jobs=1) or across a ProcessPoolExecutor.
+
+    Specs whose content hash matches the manifest (and whose output files
+    all still exist) are skipped. With ``prune``, manifest entries for
+    figures that are not in ``specs`` are evicted; pass prune=False when
+    rendering a subset. ``dry_run`` only reports what would be drawn.
+
+    ``pdf_path`` additionally writes every spec, in order, as one page of a
+    multi-page PDF. The book is all-or-nothing: if it is missing or any
+    page changed, every spec is drawn again so the PDF can be rewritten.
+    Returns the list of specs that were (or would be) drawn.
+    """
+    manifest, books = load_manifest(outdir)
+    entries = {} if prune else dict(manifest)
+    keys = {}
+    todo = []
+    for spec in specs:
+        key = keys[spec["name"]] = spec_key(spec, dpi, fixed_bbox)
+        files = output_files(spec, formats)
+        label = ", ".join(files) or spec["name"]
+        entries[spec["name"]] = {"key": key, "files": files}
+        hit = None if force else manifest.get(spec["name"])
+        if (hit and hit["key"] == key
+                and all(os.path.exists(os.path.join(outdir, f)) for f in files)):
+            print(f"· Figure {spec['fig']} unchanged: {label}")
+        elif dry_run:
+            print(f"→ Figure {spec['fig']} would be drawn: {label}")
+            todo.append(spec)
+        else:
+            todo.append(spec)
+
+    if pdf_path:
+        pdf_key = book_key([keys[s["name"]] for s in specs])
+        if force or todo or books.get(pdf_path) != pdf_key or not os.path.exists(pdf_path):
+            todo = list(specs)
+            print(f"{'→' if dry_run else '·'} PDF {pdf_path}: {len(todo)} pages to draw")
+        books[pdf_path] = pdf_key
+    if dry_run:
+        return todo
+
+    os.makedirs(outdir, exist_ok=True)
+    if todo:
+        init_matplotlib()
+    with open_pdf(pdf_path if todo else None) as pdf:
+        if jobs <= 1 or len(todo) <= 1:
+            for spec in todo:
+                render_chart(spec, outdir, dpi, formats, fixed_bbox, pdf)
+                print(f"✓ Figure {spec['fig']} saved: {spec['name']}")
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=jobs, initializer=init_matplotlib) as pool:
+                futures = [(spec, pool.submit(render_chart, spec, outdir, dpi, formats,
+                                              fixed_bbox, return_page=pdf is not None))
+                           for spec in todo]
+                for spec, fut in futures:
+                    page = fut.result()
+                    if pdf is not None:
+                        fig, bbox = pickle.loads(page[0]), page[1]
+                        pdf.savefig(fig, bbox_inches=bbox)
+                    print(f"✓ Figure {spec['fig']} saved: {spec['name']}")
+
+    save_manifest(outdir, entries, books)
+    return todo
+
+def open_pdf(path):
+    """PdfPages for ``path``, or a no-op context yielding None."""
+    if not path:
+        import contextlib
+        return contextlib.nullcontext()
+    from matplotlib.backends.backend_pdf import PdfPages
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return PdfPages(path, metadata=SAVE_METADATA["pdf"])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="number of worker processes (default: 1, serial)")
+    parser.add_argument("--outdir", default=OUTPUT_DIR, help="output directory")
+    parser.add_argument("--force", action="store_true",
+                        help="ignore the manifest and redraw every figure")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report which figures would be drawn, without drawing")
+    parser.add_argument("--figures",
+                        help="comma-separated figure numbers or names to render "
+                             "(e.g. 1,nintendo_switch2); default: all")
+    parser.add_argument("--data", default=DEFAULT_PATH,
+                        help="fundamentals dataset (.csv / .json / .parquet or a store directory)")
+    parser.add_argument("--issuers",
+                        help="comma-separated issuers (or 'all') for the generic "
+                             "revenue / margin pack instead of the report figures")
+    parser.add_argument("--quarters", type=int, default=7,
+                        help="quarters per chart in the generic pack (default: 7)")
+    parser.add_argument("--formats", default="png",
+                        help=f"comma-separated per-figure formats ({', '.join(FORMATS)}); "
+                             "default: png, empty for none")
+    parser.add_argument("--pdf", metavar="PATH",
+                        help="also write all figures to one multi-page PDF")
+    parser.add_argument("--fixed-bbox", action="store_true",
+                        help="save the full figure area instead of the tight bbox")
+    args = parser.parse_args(argv)
+
+    formats = [f for f in args.formats.split(",") if f]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"unsupported format(s): {', '.join(sorted(unknown))}")
+
+    try:
+        ds = load_dataset(args.data)
+    except ImportError as e:
+        parser.exit(1, f"{e}\n")
+    if args.issuers:
+        issuers = ds.issuers if args.issuers == "all" else args.issuers.split(",")
+        specs = [spec for issuer in issuers
+                 for spec in issuer_specs(ds, issuer, args.quarters)]
+    else:
+        specs = report_specs(ds)
+    if args.figures:
+        wanted = set(args.figures.split(","))
+        specs = [s for s in specs if s["name"] in wanted or str(s["fig"]) in wanted]
+
+    render_all(specs, outdir=args.outdir, jobs=args.jobs, force=args.force,
+               prune=not args.figures, dry_run=args.dry_run, formats=formats,
+               pdf_path=args.pdf, fixed_bbox=args.fixed_bbox)
+    if not args.dry_run:
+        print(f"\n✅ All charts generated in {os.path.join('.', args.outdir, '')}")
+
+if __name__ == "__main__":
+    main()
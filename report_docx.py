@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""python-docx helpers shared by the earnings report builders
+
+Imported lazily by generate_report.py so that the CLI can start (and answer
+--help / --dry-run) without paying the python-docx / lxml import cost.
+"""
+
+import hashlib
+import io
+import os
+
+from docx import Document
+from docx.image.image import Image
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.shape import CT_Inline
+from docx.shared import Pt, RGBColor, Cm
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
+from docx.table import Table
+from xml.sax.saxutils import escape
+
+# ── Colors ──────────────────────────────────────────────────────
+SONY_BLUE   = RGBColor(0x00, 0x30, 0x87)
+NINT_RED    = RGBColor(0xE6, 0x00, 0x12)
+DARK_GRAY   = RGBColor(0x2C, 0x3E, 0x50)
+MED_GRAY    = RGBColor(0x7F, 0x8C, 0x8D)
+WHITE       = RGBColor(0xFF, 0xFF, 0xFF)
+GREEN       = RGBColor(0x27, 0xAE, 0x60)
+RED_WARN    = RGBColor(0xC0, 0x39, 0x2B)
+BLACK       = RGBColor(0x00, 0x00, 0x00)
+
+# ── Character styles ────────────────────────────────────────────
+# Runs reference a character style instead of carrying their own font,
+# size, bold and colour properties. Each combination is added to
+# styles.xml the first time it is used in a document; the common ones get
+# readable names, the rest a descriptive one ("Report 11pt Bold 003087").
+BODY_FONT      = "Times New Roman"
+EAST_ASIA_FONT = "Hiragino Sans"
+
+CHAR_STYLES = {
+    "Report Body":         dict(size=10, color=BLACK),
+    "Report Heading":      dict(size=14, bold=True, color=DARK_GRAY),
+    "Report Caption":      dict(size=8, italic=True, color=MED_GRAY),
+    "Report Source":       dict(size=7, italic=True, color=MED_GRAY),
+    "Report Table":        dict(size=9, color=BLACK),
+    "Report Table Header": dict(size=9, bold=True, color=WHITE),
+    "Report Bold Label":   dict(size=9, bold=True, color=DARK_GRAY),
+}
+
+def _style_key(name=BODY_FONT, size=10, bold=False, italic=False, color=None):
+    return (name, float(size), bool(bold), bool(italic), str(color) if color else None)
+
+_STYLE_NAMES = {_style_key(**props): name for name, props in CHAR_STYLES.items()}
+
+def _style_name(key):
+    name, size, bold, italic, color = key
+    words = ["Report", f"{size:g}pt"] + ["Bold"] * bold + ["Italic"] * italic
+    words += [color] if color else []
+    words += [name] if name != BODY_FONT else []
+    return _STYLE_NAMES.get(key) or " ".join(words)
+
+def _init_styles(part):
+    """Per-document setup: fonts on Normal, and the {key: style id} cache."""
+    normal = part.styles["Normal"]
+    normal.font.name = BODY_FONT
+    normal.element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), EAST_ASIA_FONT)
+    part._char_styles = {}
+    return part._char_styles
+
+def char_style(part, name=BODY_FONT, size=10, bold=False, italic=False, color=None):
+    """Style id for this combination; the style is added to ``part`` once."""
+    cache = getattr(part, "_char_styles", None)
+    if cache is None:
+        cache = _init_styles(part)
+    key = _style_key(name, size, bold, italic, color)
+    style_id = cache.get(key)
+    if style_id is None:
+        styles = part.styles
+        style_name = _style_name(key)
+        if style_name in styles:
+            style = styles[style_name]
+        else:
+            style = styles.add_style(style_name, WD_STYLE_TYPE.CHARACTER)
+            style.base_style = styles["Default Paragraph Font"]
+            if name != BODY_FONT:
+                style.font.name = name
+            style.font.size = Pt(size)
+            style.font.bold = bold
+            style.font.italic = italic
+            if color:
+                style.font.color.rgb = color
+        style_id = cache[key] = style.style_id
+    return style_id
+
+def set_font(run, name=BODY_FONT, size=10, bold=False,
+             color=None, italic=False):
+    part = run.part
+    if not hasattr(part, "styles"):          # header / footer runs
+        part = part.package.main_document_part
+    run._r.get_or_add_rPr().style = char_style(part, name, size, bold, italic, color)
+
+def set_cell_bg(cell, hex_color):
+    tc = cell._tc
+    tcPr = tc.get_or_add_tcPr()
+    shd = OxmlElement('w:shd')
+    shd.set(qn('w:val'), 'clear')
+    shd.set(qn('w:color'), 'auto')
+    shd.set(qn('w:fill'), hex_color)
+    tcPr.append(shd)
+
+def set_cell_border(cell, side='all', color='DDDDDD', sz=4):
+    tc = cell._tc
+    tcPr = tc.get_or_add_tcPr()
+    tcBorders = OxmlElement('w:tcBorders')
+    sides = ['top','left','bottom','right'] if side == 'all' else [side]
+    for s in sides:
+        el = OxmlElement(f'w:{s}')
+        el.set(qn('w:val'), 'single')
+        el.set(qn('w:sz'), str(sz))
+        el.set(qn('w:space'), '0')
+        el.set(qn('w:color'), color)
+        tcBorders.append(el)
+    tcPr.append(tcBorders)
+
+def add_heading(doc, text, level=1, color=DARK_GRAY, size=14):
+    p = doc.add_paragraph()
+    p.paragraph_format.space_before = Pt(10)
+    p.paragraph_format.space_after  = Pt(4)
+    run = p.add_run(text)
+    set_font(run, size=size, bold=True, color=color)
+    return p
+
+def add_para(doc, text, size=10, color=BLACK, bold=False, indent=0, space_before=0, space_after=4):
+    p = doc.add_paragraph()
+    p.paragraph_format.space_before = Pt(space_before)
+    p.paragraph_format.space_after  = Pt(space_after)
+    if indent:
+        p.paragraph_format.left_indent = Cm(indent)
+    run = p.add_run(text)
+    set_font(run, size=size, bold=bold, color=color)
+    return p
+
+def add_bullet(doc, text, size=10, color=BLACK):
+    p = doc.add_paragraph()
+    p.paragraph_format.space_before = Pt(2)
+    p.paragraph_format.space_after  = Pt(2)
+    p.paragraph_format.left_indent  = Cm(0.5)
+    run = p.add_run("■  " + text)
+    set_font(run, size=size, color=color)
+    return p
+
+# ── Shared images ───────────────────────────────────────────────
+class ImageCache:
+    """Chart images read, parsed and SHA1-hashed once per process.
+
+    run.add_picture(path) re-reads and re-hashes the file for every
+    document; batch builders pass one cache to add_chart() instead. Entries
+    are keyed on (path, mtime, size), so a re-rendered chart is reloaded.
+
+    With ``dpi`` set, each image is first resampled to its display width
+    at that dpi and, with ``colors``, quantised to a palette of that many
+    colours (see prepare_image). The processed bytes are stored in
+    ``cache_dir`` under a hash of the source bytes and the settings.
+    """
+
+    def __init__(self, dpi=None, colors=None, cache_dir=None):
+        self.dpi = dpi
+        self.colors = colors
+        self.cache_dir = cache_dir
+        self._images = {}
+
+    def __len__(self):
+        return len(self._images)
+
+    def data(self, path, width_cm=None):
+        """The bytes to embed for ``path`` shown ``width_cm`` wide."""
+        with open(path, "rb") as f:
+            data = f.read()
+        if not self.dpi or not width_cm:
+            return data
+        key = hashlib.sha256(data + f"|{width_cm:g}|{self.dpi}|{self.colors}".encode()).hexdigest()
+        cached = os.path.join(self.cache_dir, key + ".png") if self.cache_dir else None
+        if cached and os.path.exists(cached):
+            with open(cached, "rb") as f:
+                return f.read()
+        data = prepare_image(data, width_cm, self.dpi, self.colors)
+        if cached:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cached + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(cached + ".tmp", cached)
+        return data
+
+    def get(self, path, width_cm=None):
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size,
+               width_cm if self.dpi else None)
+        image = self._images.get(key)
+        if image is None:
+            if self.dpi and width_cm:
+                data = self.data(path, width_cm)
+                # keep the chart's file name (python-docx would call it image.png)
+                image = Image._from_stream(io.BytesIO(data), data, os.path.basename(path))
+            else:
+                image = Image.from_file(path)
+            self._images[key] = image
+        return image
+
+def prepare_image(data, width_cm, dpi, colors=None):
+    """Resample PNG ``data`` to ``width_cm`` at ``dpi``; optionally palettise.
+
+    Images already narrower than the target are not upscaled. The output
+    PNG records ``dpi`` so its native size matches the display size. If
+    the result is not smaller than the input (resampling without a palette
+    adds anti-aliased colours), the input is returned unchanged.
+    """
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        raise ImportError("Resampling embedded images requires Pillow (pip install pillow)") from None
+    im = PILImage.open(io.BytesIO(data))
+    target = round(width_cm / 2.54 * dpi)
+    if im.width > target:
+        im = im.convert("RGB").resize((target, round(im.height * target / im.width)),
+                                      PILImage.Resampling.LANCZOS)
+    if colors:
+        im = im.convert("RGB").quantize(colors=colors, method=PILImage.Quantize.MEDIANCUT,
+                                        dither=PILImage.Dither.NONE)
+    out = io.BytesIO()
+    im.save(out, "PNG", optimize=True, dpi=(dpi, dpi))
+    return min(out.getvalue(), data, key=len)
+
+def add_picture(run, image, width):
+    """run.add_picture() for an already loaded docx Image.
+
+    Mirrors StoryPart.new_pic_inline(), but takes the Image instead of a
+    path so the bytes are neither re-read nor re-hashed. The image part
+    is still per document (a part belongs to one package).
+    """
+    part = run.part
+    image_parts = part.package.image_parts
+    image_part = image_parts._get_by_sha1(image.sha1) or image_parts._add_image_part(image)
+    rId = part.relate_to(image_part, RT.IMAGE)
+    cx, cy = image.scaled_dimensions(width, None)
+    run._r.add_drawing(CT_Inline.new_pic_inline(part.next_id, rId, image.filename, cx, cy))
+
+def add_chart(doc, path, caption, width_cm=14, images=None):
+    p = doc.add_paragraph()
+    p.paragraph_format.space_before = Pt(4)
+    p.paragraph_format.space_after  = Pt(2)
+    run = p.add_run()
+    if images is not None:
+        add_picture(run, images.get(path, width_cm), Cm(width_cm))
+    else:
+        run.add_picture(path, width=Cm(width_cm))
+    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    cap = doc.add_paragraph()
+    cap.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    cap.paragraph_format.space_after = Pt(6)
+    run2 = cap.add_run(caption)
+    set_font(run2, size=8, italic=True, color=MED_GRAY)
+
+# ── Bulk data tables ────────────────────────────────────────────
+# add_data_table() writes the whole w:tbl in one parse instead of going
+# through python-docx cell objects. Borders, header fill and row stripes
+# live in a table style (table-level borders plus firstRow / band1Horz /
+# band2Horz conditional formatting), so cells carry only width, text and
+# the occasional row_bg override.
+TABLE_BORDER = ("DDDDDD", 4)     # colour, size in 1/8 pt
+
+def table_style(doc, header_bg="003087", stripes=("FFFFFF", "EBF5FB")):
+    """Style id of the banded table style for these colours (added once)."""
+    styles = doc.styles
+    name = " ".join(["Report Table Grid", header_bg, *stripes])
+    if name in styles:
+        return styles[name].style_id
+    style_id = name.replace(" ", "")
+    color, sz = TABLE_BORDER
+    borders = "".join(f'<w:{side} w:val="single" w:sz="{sz}" w:space="0" w:color="{color}"/>'
+                      for side in ("top", "left", "bottom", "right", "insideH", "insideV"))
+    bands = "".join(
+        f'<w:tblStylePr w:type="{kind}"><w:tcPr>'
+        f'<w:shd w:val="clear" w:color="auto" w:fill="{fill}"/></w:tcPr></w:tblStylePr>'
+        for kind, fill in [("firstRow", header_bg), ("band1Horz", stripes[0]),
+                           ("band2Horz", stripes[-1])])
+    styles.element.append(parse_xml(
+        f'<w:style {nsdecls("w")} w:type="table" w:customStyle="1" w:styleId="{style_id}">'
+        f'<w:name w:val="{name}"/><w:basedOn w:val="{styles["Table Grid"].style_id}"/>'
+        f'<w:tblPr><w:tblStyleRowBandSize w:val="1"/><w:tblBorders>{borders}</w:tblBorders>'
+        f'</w:tblPr>{bands}</w:style>'))
+    return style_id
+
+def add_data_table(doc, rows, widths, header=None, header_bg="003087",
+                   stripes=("FFFFFF", "EBF5FB"), row_bg=None, cell_font=None,
+                   size=9, valign=None):
+    """Append a table of ``rows`` (a 2-D sequence of cell texts) in one pass.
+
+    ``widths`` are column widths in cm. The optional ``header`` row is
+    white bold text on ``header_bg``; data rows alternate ``stripes``.
+    ``row_bg`` maps a data-row index to a fill that overrides the stripe.
+    ``cell_font(i, j, text)`` may return set_font keyword overrides (bold,
+    color, ...) for data cell (i, j); the default is plain black text.
+    """
+    part = doc.part
+    widths_tw = [int(Cm(w).twips) for w in widths]
+    grid = "".join(f'<w:gridCol w:w="{w}"/>' for w in widths_tw)
+    vAlign = f'<w:vAlign w:val="{valign}"/>' if valign else ""
+    row_bg = row_bg or {}
+    plain = char_style(part, size=size, color=BLACK)
+
+    def tr(cells, style_of, fill=None, header_row=False):
+        shd = f'<w:shd w:val="clear" w:color="auto" w:fill="{fill}"/>' if fill else ""
+        out = ['<w:tr>']
+        if header_row:
+            out.append('<w:trPr><w:tblHeader/></w:trPr>')
+        for j, (text, width) in enumerate(zip(cells, widths_tw)):
+            out.append(f'<w:tc><w:tcPr><w:tcW w:w="{width}" w:type="dxa"/>{shd}{vAlign}</w:tcPr>'
+                       f'<w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:rPr>'
+                       f'<w:rStyle w:val="{style_of(j, text)}"/></w:rPr>'
+                       f'<w:t xml:space="preserve">{escape(str(text))}</w:t></w:r></w:p></w:tc>')
+        out.append('</w:tr>')
+        return "".join(out)
+
+    body = []
+    if header is not None:
+        head = char_style(part, size=size, bold=True, color=WHITE)
+        body.append(tr(header, lambda j, text: head, header_row=True))
+    for i, cells in enumerate(rows):
+        if cell_font is None:
+            style_of = lambda j, text: plain
+        else:
+            style_of = lambda j, text, i=i: char_style(
+                part, **dict({"size": size, "color": BLACK}, **(cell_font(i, j, text) or {})))
+        body.append(tr(cells, style_of, row_bg.get(i)))
+
+    first_row = int(header is not None)
+    look = 0x0400 | 0x0020 * first_row          # noVBand | firstRow
+    tbl = parse_xml(
+        f'<w:tbl {nsdecls("w")}><w:tblPr>'
+        f'<w:tblStyle w:val="{table_style(doc, header_bg, stripes)}"/>'
+        f'<w:tblW w:w="0" w:type="auto"/><w:jc w:val="center"/>'
+        f'<w:tblLook w:firstRow="{first_row}" w:lastRow="0" w:firstColumn="0" '
+        f'w:lastColumn="0" w:noHBand="0" w:noVBand="1" w:val="{look:04X}"/></w:tblPr>'
+        f'<w:tblGrid>{grid}</w:tblGrid>{"".join(body)}</w:tbl>')
+    doc.element.body._insert_tbl(tbl)
+    return Table(tbl, doc._body)
+
+def add_horizontal_rule(doc):
+    p = doc.add_paragraph()
+    pPr = p._p.get_or_add_pPr()
+    pBdr = OxmlElement('w:pBdr')
+    bottom = OxmlElement('w:bottom')
+    bottom.set(qn('w:val'), 'single')
+    bottom.set(qn('w:sz'), '6')
+    bottom.set(qn('w:space'), '1')
+    bottom.set(qn('w:color'), 'AAAAAA')
+    pBdr.append(bottom)
+    pPr.append(pBdr)
+    p.paragraph_format.space_before = Pt(0)
+    p.paragraph_format.space_after  = Pt(4)
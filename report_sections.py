@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Incremental report assembly from cached section fragments
+
+A section (see generate_report.SECTIONS) is built from declared inputs:
+report fields, chart files and data rows. assemble() renders each section
+on its own into a fresh document and caches the result as an XML fragment
+in ``<cache_dir>/<section>.json``:
+
+    {"key": ..., "body": <w:body XML>,
+     "styles": [<w:style XML>, ...], "charts": [<chart file>, ...]}
+
+``styles`` holds the style definitions the section added or changed, and
+picture relationships are replaced by the chart file name. The key hashes
+the section's inputs, its build function's source and the shared layout
+code, so editing one paragraph or table row rebuilds only that section;
+the document is then assembled from the fragments, re-relating the chart
+images and renumbering the drawing ids as python-docx would.
+"""
+
+import copy
+import hashlib
+import json
+import linecache
+import os
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SHARED_SOURCES = ("report_docx.py", "report_sections.py")
+CACHE_VERSION = 1
+EMU_PER_CM = 360000
+
+def source(func):
+    """Source lines of a module-level function.
+
+    Cheaper than inspect.getsource(), which tokenises: the function ends
+    before the next line that starts at column 0 with code.
+    """
+    code = func.__code__
+    lines = linecache.getlines(code.co_filename)
+    end = code.co_firstlineno
+    while end < len(lines) and (not lines[end].strip() or lines[end][0] in " \t)"):
+        end += 1
+    return "".join(lines[code.co_firstlineno - 1:end])
+
+def section_key(section, fields, chart_dir, images=None):
+    """Hash of everything ``section`` renders from."""
+    h = hashlib.sha256(f"v{CACHE_VERSION}\n".encode())
+    for name in SHARED_SOURCES:
+        with open(os.path.join(HERE, name), "rb") as f:
+            h.update(f.read())
+    h.update(source(section["build"]).encode("utf-8"))
+    inputs = {"fields": {name: fields[name] for name in section["fields"]},
+              "data": section["data"],
+              "images": [images.dpi, images.colors] if images is not None else None}
+    h.update(json.dumps(inputs, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+    for name in section["charts"]:
+        with open(os.path.join(chart_dir, name), "rb") as f:
+            h.update(name.encode("utf-8") + b"\0" + hashlib.sha1(f.read()).digest())
+    return h.hexdigest()
+
+def cache_path(cache_dir, section):
+    return os.path.join(cache_dir, f"{section['name']}.json")
+
+def load_fragment(cache_dir, section):
+    try:
+        with open(cache_path(cache_dir, section), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+# ─────────────────────────────────────────────────────────────────
+# Render one section
+# ─────────────────────────────────────────────────────────────────
+def _style_xml(doc):
+    from lxml import etree
+    return {s.style_id: etree.tostring(s.element, encoding="unicode") for s in doc.styles}
+
+def render_fragment(new_document, render, section, fields, chart_dir, images=None):
+    """Build ``section`` alone and return its fragment (without the key)."""
+    from lxml import etree
+    from docx.oxml.ns import qn
+
+    doc = new_document()
+    before = _style_xml(doc)
+    render(doc, section, fields, chart_dir, images)
+
+    charts = []
+    for shape in doc.inline_shapes:
+        inline = shape._inline
+        blip = inline.graphic.graphicData.pic.blipFill.blip
+        filename = doc.part.related_parts[blip.embed].filename
+        blip.set(qn("r:embed"), filename)
+        inline.docPr.id = 0
+        charts.append(filename)
+
+    body = copy.deepcopy(doc.element.body)
+    body.remove(body.sectPr)
+    body = etree.tostring(body, encoding="unicode")
+    styles = [xml for style_id, xml in _style_xml(doc).items() if before.get(style_id) != xml]
+    return {"body": body, "styles": styles, "charts": charts}
+
+# ─────────────────────────────────────────────────────────────────
+# Assemble
+# ─────────────────────────────────────────────────────────────────
+def _add_styles(doc, styles, added):
+    """Add (or replace) the fragment's style definitions in ``doc``.
+
+    ``added`` is the set of style XML already applied during this assembly.
+    """
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import qn
+
+    element = doc.styles.element
+    for xml in styles:
+        if xml in added:
+            continue
+        style = parse_xml(xml)
+        style_id = style.get(qn("w:styleId"))
+        old = element.get_by_id(style_id)
+        if old is None:
+            element.append(style)
+        else:
+            old.addprevious(style)
+            element.remove(old)
+        added.add(xml)
+
+def _insert_body(doc, fragment, chart_dir, images=None):
+    from docx.image.image import Image
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import qn
+
+    part = doc.part
+    image_parts = part.package.image_parts
+    sectPr = doc.element.body.sectPr
+    for el in list(parse_xml(fragment["body"])):
+        sectPr.addprevious(el)
+        for inline in el.iter(qn("wp:inline")):
+            blip = inline.graphic.graphicData.pic.blipFill.blip
+            path = os.path.join(chart_dir, blip.embed)
+            if images is not None:
+                image = images.get(path, inline.extent.cx / EMU_PER_CM)
+            else:
+                image = Image.from_file(path)
+            image_part = (image_parts._get_by_sha1(image.sha1)
+                          or image_parts._add_image_part(image))
+            blip.set(qn("r:embed"), part.relate_to(image_part, RT.IMAGE))
+            shape_id = part.next_id
+            inline.docPr.id, inline.docPr.name = shape_id, f"Picture {shape_id}"
+
+def assemble(new_document, render, sections, fields, chart_dir, cache_dir, images=None):
+    """Document built from cached fragments; returns (doc, names of rebuilt sections).
+
+    ``new_document()`` creates the empty document and ``render(doc, section,
+    fields, chart_dir, images)`` appends one section to it.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    doc = new_document()
+    rebuilt, added = [], set()
+    for section in sections:
+        key = section_key(section, fields, chart_dir, images)
+        fragment = load_fragment(cache_dir, section)
+        if fragment is None or fragment.get("key") != key:
+            fragment = dict(key=key, **render_fragment(new_document, render, section,
+                                                       fields, chart_dir, images))
+            tmp = cache_path(cache_dir, section) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(fragment, f, ensure_ascii=False)
+            os.replace(tmp, cache_path(cache_dir, section))
+            rebuilt.append(section["name"])
+        _add_styles(doc, fragment["styles"], added)
+        _insert_body(doc, fragment, chart_dir, images)
+    return doc, rebuilt
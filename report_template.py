@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Compiled report skeletons filled by package-level substitution
+
+compile_skeleton() builds the report once with every report field set to a
+``{{name}}`` token and saves the result as a skeleton .docx, plus a small
+JSON manifest (layout key, chart media parts). fill_skeleton() then
+produces a report without python-docx: it copies the skeleton's zip
+entries, substitutes the tokens in word/document.xml and swaps in the
+current chart PNGs, rescaling each picture's height to the new aspect
+ratio.
+
+The layout key hashes the layout code and the field names, so editing
+generate_report.py or report_docx.py recompiles the skeleton on the next
+run instead of filling a stale one.
+
+Only the standard library is needed to fill; compiling needs python-docx.
+"""
+
+import hashlib
+import json
+import os
+import re
+import struct
+import zipfile
+from xml.sax.saxutils import escape
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAYOUT_SOURCES = ("generate_report.py", "report_docx.py", "report_template.py")
+DOCUMENT_PART = "word/document.xml"
+TOKEN = re.compile(r"\{\{([^{}]+)\}\}")
+EMU_PER_CM = 360000
+
+def token(name):
+    return "{{" + name + "}}"
+
+def manifest_path(skeleton):
+    return os.path.splitext(skeleton)[0] + ".json"
+
+def layout_key(field_names, data=None):
+    """Hash of the layout code, the set of field names and ``data``.
+
+    ``data`` is anything else baked into the skeleton (JSON-serialisable).
+    """
+    h = hashlib.sha256()
+    for name in LAYOUT_SOURCES:
+        with open(os.path.join(HERE, name), "rb") as f:
+            h.update(f.read())
+    h.update("\n".join(sorted(field_names)).encode("utf-8"))
+    if data is not None:
+        h.update(json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def load_manifest(skeleton):
+    try:
+        with open(manifest_path(skeleton), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def current_manifest(skeleton, field_names, data=None):
+    """The skeleton's manifest if it matches the current layout, else None."""
+    manifest = load_manifest(skeleton)
+    if (manifest is not None and os.path.exists(skeleton)
+            and manifest.get("key") == layout_key(field_names, data)):
+        return manifest
+    return None
+
+# ─────────────────────────────────────────────────────────────────
+# Compile (python-docx)
+# ─────────────────────────────────────────────────────────────────
+def compile_skeleton(build, field_names, chart_dir, skeleton, data=None):
+    """Build via ``build(chart_dir, fields)`` with tokenised fields and save it.
+
+    Every picture whose image part came from ``chart_dir`` gets a
+    ``{{cy:<file>}}`` token for its height; the manifest records which
+    media part holds which chart and the picture width.
+    """
+    doc = build(chart_dir, {name: token(name) for name in field_names})
+
+    charts = {}
+    for shape in doc.inline_shapes:
+        inline = shape._inline
+        rId = inline.graphic.graphicData.pic.blipFill.blip.embed
+        image_part = doc.part.related_parts[rId]
+        filename = image_part.filename
+        if not os.path.exists(os.path.join(chart_dir, filename)):
+            continue
+        cy = token(f"cy:{filename}")
+        inline.extent.set("cy", cy)
+        inline.graphic.graphicData.pic.spPr.xfrm.ext.set("cy", cy)
+        charts[image_part.partname.lstrip("/")] = {"file": filename, "cx": inline.extent.cx}
+
+    os.makedirs(os.path.dirname(os.path.abspath(skeleton)), exist_ok=True)
+    doc.save(skeleton)
+    manifest = {"key": layout_key(field_names, data), "fields": sorted(field_names),
+                "charts": charts}
+    with open(manifest_path(skeleton), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    return manifest
+
+# ─────────────────────────────────────────────────────────────────
+# Fill (standard library only)
+# ─────────────────────────────────────────────────────────────────
+def png_size(data):
+    """(width px, height px, horizontal dpi, vertical dpi) of a PNG.
+
+    dpi comes from the pHYs chunk (72 when absent), as python-docx does.
+    """
+    width, height = struct.unpack(">II", data[16:24])
+    dpi = (72, 72)
+    pos = 8
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        if kind == b"pHYs":
+            x, y, unit = struct.unpack(">IIB", data[pos + 8:pos + 17])
+            if unit == 1:
+                dpi = (int(round(x * 0.0254)) or 72, int(round(y * 0.0254)) or 72)
+            break
+        if kind == b"IDAT":
+            break
+        pos += 12 + length
+    return width, height, *dpi
+
+def scaled_height(data, cx):
+    """Picture height in EMU for width ``cx``, rounded like python-docx."""
+    width, height, dpi_x, dpi_y = png_size(data)
+    native_cx = int(width / dpi_x * 914400)
+    native_cy = int(height / dpi_y * 914400)
+    return round(native_cy * cx / native_cx)
+
+def xml_text(value):
+    """Escape a field value for a w:t element; newlines become line breaks."""
+    return escape(str(value)).replace("\n", '</w:t><w:br/><w:t xml:space="preserve">')
+
+def fill_skeleton(skeleton, output, fields, chart_dir, manifest=None, images=None):
+    """Write ``output`` from ``skeleton`` with ``fields`` and the charts in ``chart_dir``.
+
+    ``images`` (a report_docx.ImageCache) prepares each chart for its
+    display width before it is swapped in.
+    """
+    manifest = manifest or load_manifest(skeleton)
+    missing = set(manifest["fields"]) - set(fields)
+    if missing:
+        raise ValueError(f"Missing report fields: {', '.join(sorted(missing))}")
+
+    media, heights = {}, {}
+    for part, chart in manifest["charts"].items():
+        path = os.path.join(chart_dir, chart["file"])
+        if images is not None:
+            media[part] = images.data(path, chart["cx"] / EMU_PER_CM)
+        else:
+            with open(path, "rb") as f:
+                media[part] = f.read()
+        heights[chart["file"]] = scaled_height(media[part], chart["cx"])
+
+    def substitute(m):
+        name = m.group(1)
+        if name.startswith("cy:"):
+            return str(heights[name[3:]])
+        return xml_text(fields[name])
+
+    tmp = output + ".tmp"
+    with zipfile.ZipFile(skeleton) as src, zipfile.ZipFile(tmp, "w") as dst:
+        for info in src.infolist():
+            if info.filename == DOCUMENT_PART:
+                xml = src.read(info).decode("utf-8")
+                dst.writestr(info, TOKEN.sub(substitute, xml).encode("utf-8"))
+            elif info.filename in media:
+                dst.writestr(info, media[info.filename])
+            else:
+                dst.writestr(info, src.read(info))
+    os.replace(tmp, output)
+    return output
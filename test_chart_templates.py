@@ -0,0 +1,47 @@
+"""Reuse checks for the generate_charts.py figure templates
+
+A template is refilled for every chart of its layout in a process, so the
+output must not depend on what was drawn into it before. The charts with
+labels outside the axes (point labels on the line layouts) are the ones
+whose tight_layout used to drift between refills.
+"""
+
+import copy
+import warnings
+
+import pytest
+
+import generate_charts
+from fundamentals import load_dataset
+
+
+@pytest.fixture(scope="module")
+def specs():
+    generate_charts.init_matplotlib()
+    return {s["name"]: s for s in generate_charts.report_specs(load_dataset())}
+
+
+def render(spec, outdir):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")         # missing CJK glyphs on bare systems
+        (path,) = generate_charts.render_chart(spec, str(outdir))
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name", ["comparison_margins", "nintendo_switch2", "sony_revenue"])
+def test_refilled_template_renders_identically(specs, tmp_path, name):
+    a = specs[name]
+    b = copy.deepcopy(a)
+    b["data"]["title"] += "（別データ）"
+    for key in ("values", "bars", "line"):
+        if key in b["data"]:
+            b["data"][key] = b["data"][key] * 0.5
+    for series in b["data"].get("series", ()):
+        series["values"] = series["values"] * 0.5
+
+    first = render(a, tmp_path)
+    other = render(b, tmp_path)
+    again = render(a, tmp_path)
+    assert other != first
+    assert again == first
@@ -0,0 +1,141 @@
+"""Behaviour checks for the fundamentals.py loaders, derived metrics and store"""
+
+import csv
+import json
+import sys
+
+import numpy as np
+import pytest
+
+import fundamentals
+from fundamentals import DEFAULT_PATH, load_dataset
+
+
+@pytest.fixture(scope="module")
+def rows():
+    with open(DEFAULT_PATH, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def assert_same(a, b):
+    assert (a.issuers, a.periods, a.metrics) == (b.issuers, b.periods, b.metrics)
+    np.testing.assert_array_equal(a.values, b.values)
+
+
+def test_csv_columns_round_trip(rows):
+    cols = fundamentals._read_csv(DEFAULT_PATH)
+    assert list(cols) == list(fundamentals.COLUMNS)
+    assert [dict(zip(cols, values)) for values in zip(*cols.values())] == rows
+
+
+@pytest.mark.parametrize("layout", ["records", "columnar"])
+def test_json_loads_like_csv(rows, tmp_path, layout):
+    data = rows if layout == "records" else {
+        name: [row[name] for row in rows] for name in fundamentals.COLUMNS}
+    path = tmp_path / "fundamentals.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert_same(load_dataset(str(path), derived=False), load_dataset(derived=False))
+
+
+def test_cube_holds_each_observation(rows):
+    ds = load_dataset(derived=False)
+    for row in rows:
+        assert ds.value(row["issuer"], row["period"], row["metric"]) == float(row["value"])
+    assert np.count_nonzero(~np.isnan(ds.values)) == len(rows)
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported dataset format"):
+        load_dataset(str(tmp_path / "fundamentals.xlsx"))
+
+
+def test_parquet_without_pyarrow_is_an_import_error(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    with pytest.raises(ImportError, match="requires pyarrow"):
+        load_dataset(str(tmp_path / "fundamentals.parquet"))
+
+
+# The figures and the report used to carry these as literals
+# (generate_charts.py: op_margin, n_op_margin, beat, sw2_cumulative;
+# generate_report.py: the summary box and the guidance table).
+SONY_QUARTERS = ["FY2024Q1", "FY2024Q2", "FY2024Q3", "FY2024Q4",
+                 "FY2025Q1", "FY2025Q2", "FY2025Q3"]
+NINTENDO_QUARTERS = ["FY2025Q1", "FY2025Q2", "FY2025Q3", "FY2025Q4",
+                     "FY2026Q1", "FY2026Q2", "FY2026Q3"]
+
+
+@pytest.fixture(scope="module")
+def ds():
+    return load_dataset()
+
+
+def test_margins_match_the_former_literals(ds):
+    assert ds.series("sony", "op_margin", SONY_QUARTERS).round(1).tolist() == [
+        6.2, 6.9, 11.5, 9.1, 6.6, 8.2, 13.9]
+    assert ds.series("nintendo", "op_margin", NINTENDO_QUARTERS).round(1).tolist() == [
+        15.1, 17.4, 19.0, 16.1, 9.5, 10.9, 19.2]
+
+
+def test_beat_matches_the_former_inline_computation(ds):
+    reported = [3714, 515, 377, 41]
+    est = [3680, 422, 340, 33]
+    beat = [(r - e) / e * 100 for r, e in zip(reported, est)]
+    metrics = ["beat.revenue", "beat.op_income", "beat.net_income", "beat.eps_adr"]
+    assert ds.values_at("sony", "FY2025Q3", metrics).tolist() == pytest.approx(beat)
+
+
+def test_cumulative_matches_the_former_literals(ds):
+    cumulative = ds.series("nintendo", "cumulative.sw2_units", ["FY2026Q1", "FY2026Q2",
+                                                                "FY2026Q3"])
+    assert cumulative.tolist() == pytest.approx([6.26, 10.36, 17.37])
+    assert np.isnan(ds.value("nintendo", "FY2025Q4", "cumulative.sw2_units"))
+
+
+def test_yoy_and_guidance_match_the_report_text(ds):
+    yoy = ds.values_at("sony", "FY2025Q3", ["yoy.revenue", "yoy.op_income", "yoy.op_margin"])
+    assert yoy.round(1).tolist() == [0.8, 22.3, 2.4]           # +1%, +22%, +240bps
+    delta = ds.values_at("sony", "FY2025", ["guidance_delta.revenue",
+                                            "guidance_delta.op_income"])
+    assert delta.round().tolist() == [3, 8]                     # ▲+3%, ▲+8%
+
+
+def test_reported_margins_win_and_gaps_are_filled():
+    ds = fundamentals.derive(fundamentals.from_columns(
+        ["a"] * 5, ["FY2024Q1", "FY2025Q1", "FY2024Q1", "FY2025Q1", "FY2024Q1"],
+        ["revenue", "revenue", "op_income", "op_income", "op_margin"],
+        [200, 250, 20, 50, 9.5]))
+    assert ds.series("a", "op_margin").tolist() == [9.5, 20.0]
+    assert ds.value("a", "FY2025Q1", "yoy.op_margin") == pytest.approx(10.5)
+    assert ds.value("a", "FY2025Q1", "yoy.revenue") == pytest.approx(25.0)
+    assert np.isnan(ds.value("a", "FY2024Q1", "yoy.revenue"))
+
+
+def is_mapped(array):
+    while array is not None and not isinstance(array, np.memmap):
+        array = array.base
+    return array is not None
+
+
+def test_store_round_trip(ds, tmp_path):
+    fundamentals.save_store(ds, str(tmp_path), derived=True)
+    stored, derived = fundamentals.load_store(str(tmp_path))
+    assert derived
+    assert_same(stored, ds)
+    assert is_mapped(stored.values)
+    for series in (stored.series("sony", "revenue"),
+                   stored.series("sony", "revenue", ["FY2025Q1", "FY2025Q2", "FY2025Q3"])):
+        assert is_mapped(series) and series.strides == (series.itemsize,)
+
+
+def test_derived_store_is_used_as_is(tmp_path):
+    assert fundamentals.main([DEFAULT_PATH, str(tmp_path)]) == 0
+    loaded = load_dataset(str(tmp_path))
+    assert is_mapped(loaded.values)
+    assert_same(loaded, load_dataset())
+
+
+def test_plain_store_is_derived_on_load(tmp_path):
+    assert fundamentals.main([DEFAULT_PATH, str(tmp_path), "--no-derived"]) == 0
+    assert is_mapped(load_dataset(str(tmp_path), derived=False).values)
+    assert_same(load_dataset(str(tmp_path)), load_dataset())
@@ -0,0 +1,190 @@
+"""Behaviour checks for generate_charts.py
+
+test_chart_templates.py compares the rendered figures themselves; these
+tests cover what surrounds them: the render cache and its manifest, the
+bar labels, the output formats and the calendar-quarter mapping behind the
+peer comparison.
+"""
+
+import copy
+import re
+import struct
+import warnings
+
+import numpy as np
+import pytest
+
+import generate_charts
+from fundamentals import load_dataset
+
+
+@pytest.fixture(scope="module")
+def specs():
+    return {s["name"]: s for s in generate_charts.report_specs(load_dataset())}
+
+
+def render_all(specs, outdir, **kw):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")         # missing CJK glyphs on bare systems
+        return [s["name"] for s in generate_charts.render_all(specs, outdir=str(outdir), **kw)]
+
+
+def halved(spec):
+    spec = copy.deepcopy(spec)
+    spec["data"]["values"] = spec["data"]["values"] * 0.5
+    return spec
+
+
+def test_unchanged_figures_are_cache_hits(specs, tmp_path):
+    pair = [specs["sony_revenue"], specs["nintendo_revenue"]]
+    assert render_all(pair, tmp_path) == ["sony_revenue", "nintendo_revenue"]
+    drawn = (tmp_path / "sony_revenue.png").stat().st_mtime_ns
+
+    assert render_all(pair, tmp_path) == []
+    assert (tmp_path / "sony_revenue.png").stat().st_mtime_ns == drawn
+
+
+def test_changed_data_is_redrawn(specs, tmp_path):
+    sony, nintendo = specs["sony_revenue"], specs["nintendo_revenue"]
+    render_all([sony, nintendo], tmp_path)
+    assert render_all([halved(sony), nintendo], tmp_path) == ["sony_revenue"]
+    assert render_all([sony, nintendo], tmp_path) == ["sony_revenue"]
+
+
+def test_missing_output_is_redrawn(specs, tmp_path):
+    sony = specs["sony_revenue"]
+    render_all([sony], tmp_path)
+    (tmp_path / "sony_revenue.png").unlink()
+    assert render_all([sony], tmp_path) == ["sony_revenue"]
+
+
+def test_stale_entries_are_evicted(specs, tmp_path):
+    sony, nintendo = specs["sony_revenue"], specs["nintendo_revenue"]
+    render_all([sony, nintendo], tmp_path)
+    render_all([sony], tmp_path, prune=False)
+    assert set(generate_charts.load_manifest(str(tmp_path))[0]) == {"sony_revenue",
+                                                                    "nintendo_revenue"}
+    render_all([sony], tmp_path)
+    assert set(generate_charts.load_manifest(str(tmp_path))[0]) == {"sony_revenue"}
+
+
+def bar_labels(spec):
+    """Texts and offsets of the bar labels drawn for ``spec``."""
+    from matplotlib.text import Annotation
+    generate_charts.init_matplotlib()
+    template = generate_charts.get_template(spec["template"], spec["figsize"])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        template.fill(**spec["data"])
+    return [(a.get_text(), a.xyann) for a in template.ax.texts if isinstance(a, Annotation)]
+
+
+@pytest.mark.parametrize("name, key", [("sony_revenue", "values"),
+                                       ("nintendo_software", "values"),
+                                       ("sony_operating_income", "bars"),
+                                       ("sony_beat_miss", "beat")])
+def test_every_bar_is_labelled(specs, name, key):
+    data = specs[name]["data"]
+    fmt = data.get("fmt", generate_charts.FMT_PCT_CHG if key == "beat"
+                   else generate_charts.FMT_YEN_B)
+    assert [text for text, _ in bar_labels(specs[name])] == [fmt.format(v) for v in data[key]]
+
+
+def test_grouped_bars_are_labelled_per_series(specs):
+    data = specs["sony_segments"]["data"]
+    expected = [data["fmt"].format(v) for s in data["series"] for v in s["values"]]
+    assert [text for text, _ in bar_labels(specs["sony_segments"])] == expected
+
+
+def test_negative_bars_are_labelled_past_their_end(specs):
+    spec = copy.deepcopy(specs["sony_beat_miss"])
+    spec["data"]["beat"] = np.array([5.0, -3.0, 12.0, 1.0])
+    labels = bar_labels(spec)
+    assert [text for text, _ in labels] == ["+5.0%", "-3.0%", "+12.0%", "+1.0%"]
+    assert [offset[0] > 0 for _, offset in labels] == [True, False, True, True]
+
+
+def test_refill_replaces_the_labels(specs):
+    bar_labels(specs["nintendo_revenue"])
+    assert len(bar_labels(specs["sony_revenue"])) == len(specs["sony_revenue"]["data"]["values"])
+
+
+def png_size(path):
+    with open(path, "rb") as f:
+        header = f.read(24)
+    assert header[:8] == b"\x89PNG\r\n\x1a\n"
+    return struct.unpack(">II", header[16:24])
+
+
+def test_every_format_is_written(specs, tmp_path):
+    pair = [specs["sony_revenue"], specs["sony_beat_miss"]]
+    book = tmp_path / "book.pdf"
+    render_all(pair, tmp_path, formats=("png", "svg"), pdf_path=str(book))
+    for spec in pair:
+        png_size(tmp_path / f"{spec['name']}.png")
+        assert b"<svg" in (tmp_path / f"{spec['name']}.svg").read_bytes()
+    pdf = book.read_bytes()
+    assert pdf.startswith(b"%PDF")
+    assert len(re.findall(rb"/Type\s*/Page\b", pdf)) == len(pair)
+
+
+def test_pdf_book_is_rewritten_when_a_page_changes(specs, tmp_path):
+    pair = [specs["sony_revenue"], specs["nintendo_revenue"]]
+    book = str(tmp_path / "book.pdf")
+    render_all(pair, tmp_path, pdf_path=book)
+    assert render_all(pair, tmp_path, pdf_path=book) == []
+    assert render_all([halved(pair[0]), pair[1]], tmp_path, pdf_path=book) == [
+        "sony_revenue", "nintendo_revenue"]
+
+
+def test_fixed_bbox_keeps_the_full_figure(specs, tmp_path):
+    spec = specs["sony_revenue"]
+    render_all([spec], tmp_path / "fixed", fixed_bbox=True)
+    render_all([spec], tmp_path / "tight")
+    width, height = spec["figsize"]
+    dpi = generate_charts.DPI
+    assert png_size(tmp_path / "fixed" / "sony_revenue.png") == (width * dpi, height * dpi)
+    assert png_size(tmp_path / "tight" / "sony_revenue.png") != (width * dpi, height * dpi)
+
+
+@pytest.mark.parametrize("issuer, period, quarter", [
+    ("sony", "FY2025Q1", "CY2025Q2"),
+    ("sony", "FY2025Q3", "CY2025Q4"),
+    ("sony", "FY2025Q4", "CY2026Q1"),
+    ("nintendo", "FY2026Q1", "CY2025Q2"),
+    ("nintendo", "FY2026Q3", "CY2025Q4"),
+    ("nintendo", "FY2026Q4", "CY2026Q1"),
+    ("toyota", "FY2025Q3", "CY2025Q4"),      # default style: labelled by start year
+])
+def test_fiscal_and_calendar_quarters_map_both_ways(issuer, period, quarter):
+    assert generate_charts.calendar_quarter(issuer, period) == quarter
+    assert generate_charts.fiscal_quarter(issuer, quarter) == period
+
+
+@pytest.mark.parametrize("period", ["FY2025", "2025Q3", "FY2025Q5", ""])
+def test_non_quarters_have_no_calendar_quarter(period):
+    assert generate_charts.calendar_quarter("sony", period) is None
+
+
+def test_calendar_quarter_label():
+    assert generate_charts.calendar_quarter_label("CY2025Q4") == "2025年10-12月期"
+    assert generate_charts.calendar_quarter_label("CY2026Q1") == "2026年1-3月期"
+
+
+def test_peer_chart_compares_the_same_months():
+    spec = generate_charts.peer_margin_spec(load_dataset(), "CY2025Q4")
+    assert sorted(label.split("\n")[1] for label in spec["data"]["labels"]) == [
+        "FY2025Q3", "FY2026Q3"]
+    assert "2025年10-12月期" in spec["data"]["title"]
+
+
+def test_batch_shares_one_peer_chart_per_calendar_quarter(tmp_path):
+    import batch_reports
+    pairs = [("sony", "FY2025Q3"), ("nintendo", "FY2026Q3"), ("nintendo", "FY2026Q2")]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        outputs = batch_reports.run_batch(load_dataset(), pairs, outdir=str(tmp_path),
+                                          quarters=4)
+    assert len(outputs) == 3
+    assert sorted(p.name for p in (tmp_path / "charts").glob("peers_*.png")) == [
+        "peers_CY2025Q3_op_margin.png", "peers_CY2025Q4_op_margin.png"]
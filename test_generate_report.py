@@ -0,0 +1,135 @@
+"""Behaviour checks for the generate_report.py build paths
+
+A compiled skeleton filled with the report fields, and a report assembled
+from cached section fragments, must give the same package as building the
+report with python-docx. The section cache must rebuild exactly the
+sections whose declared inputs changed.
+"""
+
+import copy
+import warnings
+import zipfile
+
+import pytest
+
+import generate_charts
+import generate_report
+import report_sections
+import report_template
+from fundamentals import load_dataset
+
+
+@pytest.fixture(scope="module")
+def chart_dir(tmp_path_factory):
+    outdir = tmp_path_factory.mktemp("charts")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")         # missing CJK glyphs on bare systems
+        generate_charts.render_all(generate_charts.report_specs(load_dataset()), str(outdir))
+    return outdir
+
+
+def parts(path):
+    with zipfile.ZipFile(path) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def built(chart_dir, path, fields=None):
+    generate_report.build_report(str(chart_dir), fields).save(str(path))
+    return parts(path)
+
+
+@pytest.fixture(scope="module")
+def skeleton(chart_dir, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("skeleton") / "report.skeleton.docx")
+    _, sections = generate_report.report_inputs()
+    manifest = report_template.compile_skeleton(
+        generate_report.build_report, list(generate_report.REPORT_FIELDS), str(chart_dir),
+        path, [section["data"] for section in sections])
+    return path, manifest
+
+
+def filled(skeleton, chart_dir, path, fields=None):
+    fields = dict(generate_report.report_inputs()[0], **(fields or {}))
+    report_template.fill_skeleton(skeleton[0], str(path), fields, str(chart_dir), skeleton[1])
+    return parts(path)
+
+
+def test_filled_skeleton_matches_the_build(skeleton, chart_dir, tmp_path):
+    assert filled(skeleton, chart_dir, tmp_path / "filled.docx") == \
+        built(chart_dir, tmp_path / "built.docx")
+
+
+def test_filled_fields_match_the_build(skeleton, chart_dir, tmp_path):
+    fields = {"title": "決算速報 <Q3> & 修正", "report_date": "2026年3月2日",
+              "sony_summary.0": "¥3,800B"}
+    assert filled(skeleton, chart_dir, tmp_path / "filled.docx", fields) == \
+        built(chart_dir, tmp_path / "built.docx", fields)
+
+
+def test_replaced_chart_is_rescaled_like_the_build(skeleton, chart_dir, tmp_path):
+    charts = tmp_path / "charts"
+    charts.mkdir()
+    for png in chart_dir.glob("*.png"):
+        (charts / png.name).write_bytes(png.read_bytes())
+    spec = copy.deepcopy(next(s for s in generate_charts.report_specs(load_dataset())
+                              if s["name"] == "sony_revenue"))
+    spec["figsize"] = (8, 6)
+    spec["data"]["values"] = spec["data"]["values"] * 0.5
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        generate_charts.render_chart(spec, str(charts))
+    assert filled(skeleton, charts, tmp_path / "filled.docx") == \
+        built(charts, tmp_path / "built.docx")
+
+
+def test_missing_fields_are_rejected(skeleton, chart_dir, tmp_path):
+    fields = dict(generate_report.report_inputs()[0])
+    del fields["title"]
+    with pytest.raises(ValueError, match="Missing report fields: title$"):
+        report_template.fill_skeleton(skeleton[0], str(tmp_path / "filled.docx"),
+                                      fields, str(chart_dir), skeleton[1])
+
+
+def assemble(chart_dir, cache_dir, fields=None, sections=None):
+    """Names of the sections assemble() rebuilt, and the document."""
+    report_fields, default_sections = generate_report.report_inputs()
+    doc, rebuilt = report_sections.assemble(
+        generate_report.new_document, generate_report.render_section,
+        sections or default_sections, dict(report_fields, **(fields or {})),
+        str(chart_dir), str(cache_dir))
+    return rebuilt, doc
+
+
+def test_assembled_report_matches_the_build(chart_dir, tmp_path):
+    names = [section["name"] for section in generate_report.SECTIONS]
+    for expected in (names, []):
+        rebuilt, doc = assemble(chart_dir, tmp_path / "cache")
+        assert rebuilt == expected
+        doc.save(str(tmp_path / "assembled.docx"))
+        assert parts(tmp_path / "assembled.docx") == built(chart_dir, tmp_path / "built.docx")
+
+
+def test_changed_field_rebuilds_the_sections_using_it(chart_dir, tmp_path):
+    assemble(chart_dir, tmp_path)
+    dated = {"report_date": "2026年3月2日"}
+    assert assemble(chart_dir, tmp_path, dated)[0] == ["cover", "sources"]
+    assert assemble(chart_dir, tmp_path, dated)[0] == []
+    assert assemble(chart_dir, tmp_path, dict(dated, **{"takeaway.0": "修正"}))[0] == ["cover"]
+
+
+def test_changed_rows_rebuild_their_section(chart_dir, tmp_path):
+    assemble(chart_dir, tmp_path)
+    sections = copy.deepcopy(generate_report.report_inputs()[1])
+    valuation = next(s for s in sections if s["name"] == "valuation")
+    valuation["data"]["se_data"][-1] = ("修正",) * len(valuation["data"]["se_data"][-1])
+    assert assemble(chart_dir, tmp_path, sections=sections)[0] == ["valuation"]
+
+
+def test_changed_chart_rebuilds_its_section(chart_dir, tmp_path):
+    charts = tmp_path / "charts"
+    charts.mkdir()
+    for png in chart_dir.glob("*.png"):
+        (charts / png.name).write_bytes(png.read_bytes())
+    assemble(charts, tmp_path / "cache")
+    (charts / "comparison_margins.png").write_bytes((charts / "sony_revenue.png").read_bytes())
+    assert assemble(charts, tmp_path / "cache")[0] == ["comparison"]
@@ -0,0 +1,244 @@
+"""Behaviour checks for the report_docx.py document helpers
+
+The helpers write less XML than python-docx's per-run and per-cell API
+(character styles instead of run properties, one w:tbl per table); the
+tests check that the formatting a reader sees is what that API would have
+produced. The image tests cover the pre-embed resampling and its cache.
+"""
+
+import io
+import os
+import sys
+
+import pytest
+from docx.oxml.ns import qn
+
+import report_docx
+from report_docx import (
+    BLACK, BODY_FONT, DARK_GRAY, EAST_ASIA_FONT, MED_GRAY, WHITE, Document, Pt, set_font,
+)
+
+
+def resolved_font(run):
+    """(name, eastAsia, size, bold, italic, color) after style inheritance."""
+    chain = [run]                                       # direct formatting first
+    style = run.style if run._r.rPr is not None and run._r.rPr.style else None
+    while style is not None:
+        chain.append(style)
+        style = style.base_style
+    chain.append(run.part.styles["Normal"])
+
+    def first(attr):
+        return next((getattr(x.font, attr) for x in chain
+                     if getattr(x.font, attr) is not None), None)
+
+    rprs = [x.element.rPr if hasattr(x, "style_id") else x._r.rPr for x in chain]
+    east_asia = next((rPr.rFonts.get(qn("w:eastAsia")) for rPr in rprs
+                      if rPr is not None and rPr.rFonts is not None
+                      and rPr.rFonts.get(qn("w:eastAsia"))), None)
+    color = next((x.font.color.rgb for x in chain if x.font.color.type is not None), None)
+    return (first("name"), east_asia, first("size"), bool(first("bold")),
+            bool(first("italic")), color)
+
+
+def direct_font(run, name=BODY_FONT, size=10, bold=False, color=None, italic=False):
+    """The former set_font(): every property written on the run itself."""
+    font = run.font
+    font.name = name
+    font.size = Pt(size)
+    font.bold = bold
+    font.italic = italic
+    if color:
+        font.color.rgb = color
+    run._r.get_or_add_rPr().get_or_add_rFonts().set(qn("w:eastAsia"), EAST_ASIA_FONT)
+
+
+COMBINATIONS = [
+    {},
+    {"size": 14, "bold": True, "color": DARK_GRAY},
+    {"size": 8, "italic": True, "color": MED_GRAY},
+    {"size": 9, "bold": True, "color": WHITE},
+    {"size": 9.5, "color": BLACK},
+    {"name": "Arial", "size": 11, "bold": True},
+]
+
+
+@pytest.mark.parametrize("props", COMBINATIONS)
+def test_styled_run_looks_like_directly_formatted_run(props):
+    doc = Document()
+    styled = doc.add_paragraph().add_run("styled")
+    set_font(styled, **props)
+    direct = doc.add_paragraph().add_run("direct")
+    direct_font(direct, **props)
+    assert resolved_font(styled) == resolved_font(direct)
+
+
+def test_runs_reference_a_style_only():
+    doc = Document()
+    for props in COMBINATIONS:
+        set_font(doc.add_paragraph().add_run("x"), **props)
+    for run in (p.runs[0] for p in doc.paragraphs):
+        assert [child.tag for child in run._r.rPr] == [qn("w:rStyle")]
+
+
+def test_each_combination_is_added_once():
+    doc = Document()
+    before = len(doc.styles)
+    for _ in range(3):
+        for props in COMBINATIONS:
+            set_font(doc.add_paragraph().add_run("x"), **props)
+    assert len(doc.styles) - before == len(COMBINATIONS)
+    assert report_docx.char_style(doc.part, size=10, color=BLACK) == "ReportBody"
+
+
+def table_style(table):
+    style_id = table._tbl.tblPr.find(qn("w:tblStyle")).get(qn("w:val"))
+    return table.part.styles.element.get_by_id(style_id)
+
+
+def cell_fill(table, i):
+    """Fill of row ``i``: its own shading, else the table style's banding."""
+    tcPr = table.rows[i].cells[0]._tc.tcPr
+    shd = tcPr.find(qn("w:shd")) if tcPr is not None else None
+    if shd is not None:
+        return shd.get(qn("w:fill"))
+    style = table_style(table)
+    header = table._tbl.tblPr.find(qn("w:tblLook")).get(qn("w:firstRow")) == "1"
+    kind = "firstRow" if header and i == 0 else ("band1Horz", "band2Horz")[(i - header) % 2]
+    for pr in style.findall(qn("w:tblStylePr")):
+        if pr.get(qn("w:type")) == kind:
+            return pr.find(f"{qn('w:tcPr')}/{qn('w:shd')}").get(qn("w:fill"))
+
+
+ROWS = [("FY2025Q1", "2,890", "<&>"), ("FY2025Q2", "2,975", ""), ("FY2025Q3", "3,714", "12.5%")]
+WIDTHS = [3.5, 3.0, 2.5]
+HEADER = ["期間", "売上高", "備考"]
+
+
+def test_data_table_cells_match_the_rows():
+    doc = Document()
+    baseline = doc.add_table(rows=1, cols=len(WIDTHS)).rows[0].cells
+    for cell, width in zip(baseline, WIDTHS):
+        cell.width = report_docx.Cm(width)             # as add_table_row sized its cells
+    table = report_docx.add_data_table(doc, ROWS, WIDTHS, HEADER)
+    assert [[c.text for c in row.cells] for row in table.rows] == [HEADER, *map(list, ROWS)]
+    for row in table.rows:
+        assert [c.width for c in row.cells] == [c.width for c in baseline]
+        for cell in row.cells:
+            assert cell.paragraphs[0].alignment == report_docx.WD_ALIGN_PARAGRAPH.CENTER
+
+
+def test_data_table_fills_match_header_stripes_and_overrides():
+    doc = Document()
+    table = report_docx.add_data_table(doc, ROWS, WIDTHS, HEADER, stripes=("FFFFFF", "EBF5FB"),
+                                       row_bg={2: "FFF3CD"})
+    assert [cell_fill(table, i) for i in range(4)] == ["003087", "FFFFFF", "EBF5FB", "FFF3CD"]
+    headless = report_docx.add_data_table(doc, ROWS, WIDTHS, stripes=("FFFFFF", "F0F3F4"))
+    assert [cell_fill(headless, i) for i in range(3)] == ["FFFFFF", "F0F3F4", "FFFFFF"]
+
+
+def test_data_table_cell_fonts():
+    doc = Document()
+    table = report_docx.add_data_table(
+        doc, ROWS, WIDTHS, HEADER, cell_font=lambda i, j, text: {"bold": i == 2})
+    header_run = doc.add_paragraph().add_run()
+    direct_font(header_run, size=9, bold=True, color=WHITE)
+    assert resolved_font(table.rows[0].cells[0].paragraphs[0].runs[0]) == resolved_font(header_run)
+    for i, bold in enumerate([False, False, True], 1):
+        run = doc.add_paragraph().add_run()
+        direct_font(run, size=9, bold=bold, color=BLACK)
+        for cell in table.rows[i].cells:
+            assert resolved_font(cell.paragraphs[0].runs[0]) == resolved_font(run)
+
+
+def test_data_table_borders_are_table_level():
+    doc = Document()
+    report_docx.add_data_table(doc, ROWS, WIDTHS, HEADER)
+    table = doc.tables[0]
+    assert table._tbl.find(f".//{qn('w:tcBorders')}") is None
+    style = table_style(table)
+    color, sz = report_docx.TABLE_BORDER
+    borders = style.find(f"{qn('w:tblPr')}/{qn('w:tblBorders')}")
+    assert {b.tag.split("}")[1]: (b.get(qn("w:color")), b.get(qn("w:sz"))) for b in borders} == {
+        side: (color, str(sz)) for side in ("top", "left", "bottom", "right", "insideH", "insideV")}
+
+
+def png(width, height, colors=("#003087", "#E60012", "#FAFAFA")):
+    """A flat-coloured chart-like PNG of the given pixel size, at 150 dpi."""
+    from PIL import Image, ImageDraw
+    im = Image.new("RGB", (width, height), colors[-1])
+    draw = ImageDraw.Draw(im)
+    for k in range(8):
+        draw.rectangle([k * width // 8 + 4, height // (k + 2), (k + 1) * width // 8 - 4, height],
+                       fill=colors[k % (len(colors) - 1)])
+    out = io.BytesIO()
+    im.save(out, "PNG", dpi=(150, 150))
+    return out.getvalue()
+
+
+def image_info(data):
+    from PIL import Image
+    im = Image.open(io.BytesIO(data))
+    return im.size, im.mode, tuple(round(d) for d in im.info["dpi"])
+
+
+def test_prepare_image_downscales_to_the_display_size():
+    data = report_docx.prepare_image(png(1200, 600), 14, 100)
+    (width, height), _, dpi = image_info(data)
+    assert (width, height, dpi) == (round(14 / 2.54 * 100), round(600 * width / 1200), (100, 100))
+
+
+def test_prepare_image_does_not_upscale():
+    data = report_docx.prepare_image(png(300, 150), 14, 100)
+    assert image_info(data)[0] == (300, 150)
+
+
+def test_prepare_image_palettises():
+    data = report_docx.prepare_image(png(1200, 600), 14, 100, colors=16)
+    _, mode, _ = image_info(data)
+    from PIL import Image
+    assert mode == "P"
+    assert len(Image.open(io.BytesIO(data)).getcolors()) <= 16
+
+
+def test_prepare_image_without_pillow_is_an_import_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "PIL", None)
+    with pytest.raises(ImportError, match="requires Pillow"):
+        report_docx.prepare_image(b"", 14, 100)
+
+
+def test_image_cache_key(tmp_path, monkeypatch):
+    chart = tmp_path / "chart.png"
+    chart.write_bytes(png(1200, 600))
+    cache_dir = tmp_path / "cache"
+    calls = []
+    prepare = report_docx.prepare_image
+    monkeypatch.setattr(report_docx, "prepare_image",
+                        lambda *args: calls.append(args[1:]) or prepare(*args))
+
+    images = report_docx.ImageCache(dpi=100, colors=16, cache_dir=str(cache_dir))
+    first = images.data(str(chart), 14)
+    assert images.data(str(chart), 14) == first
+    assert report_docx.ImageCache(100, 16, str(cache_dir)).data(str(chart), 14) == first
+    assert calls == [(14, 100, 16)]
+
+    report_docx.ImageCache(100, 16, str(cache_dir)).data(str(chart), 7)
+    report_docx.ImageCache(150, 16, str(cache_dir)).data(str(chart), 14)
+    report_docx.ImageCache(100, None, str(cache_dir)).data(str(chart), 14)
+    chart.write_bytes(png(1200, 600, ("#2C3E50", "#27AE60", "#FFFFFF")))
+    report_docx.ImageCache(100, 16, str(cache_dir)).data(str(chart), 14)
+    assert len(calls) == 5
+    assert len(list(cache_dir.glob("*.png"))) == 5
+
+
+def test_image_cache_reloads_a_redrawn_chart(tmp_path):
+    chart = tmp_path / "chart.png"
+    chart.write_bytes(png(1200, 600))
+    images = report_docx.ImageCache(dpi=100)
+    before = images.get(str(chart), 14)
+    assert images.get(str(chart), 14) is before
+    chart.write_bytes(png(1000, 600))
+    os.utime(chart, ns=(0, os.stat(chart).st_mtime_ns + 10**9))
+    after = images.get(str(chart), 14)
+    assert after is not before and after.filename == "chart.png"
+    assert len(images) == 2
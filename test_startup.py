@@ -0,0 +1,59 @@
+"""Startup-time regression checks for generate_charts.py / generate_report.py
+
+Both CLIs run from short-lived cron and webhook jobs, so importing them (or
+running --dry-run) must not pull in matplotlib or python-docx. The timing
+budget is deliberately generous; the module checks are the strict part.
+"""
+
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative import time allowed for each CLI module, in milliseconds.
+STARTUP_BUDGET_MS = 500
+
+HEAVY = ("matplotlib", "docx", "lxml")
+
+
+def import_times(code):
+    """Run ``code`` under ``python -X importtime``; return {module: cumulative µs}."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=HERE, capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def heavy_modules(times):
+    return sorted(m for m in times if m.split(".")[0] in HEAVY)
+
+
+def test_chart_cli_import_is_light():
+    times = import_times("import generate_charts")
+    assert heavy_modules(times) == []
+    assert times["generate_charts"] / 1000 < STARTUP_BUDGET_MS
+
+
+def test_report_cli_import_is_light():
+    times = import_times("import generate_report")
+    assert heavy_modules(times) == []
+    assert times["generate_report"] / 1000 < STARTUP_BUDGET_MS
+
+
+def test_chart_dry_run_skips_matplotlib(tmp_path):
+    times = import_times("import generate_charts; "
+                         f"generate_charts.main(['--dry-run', '--outdir', {str(tmp_path)!r}])")
+    assert heavy_modules(times) == []
+
+
+def test_report_dry_run_skips_docx():
+    times = import_times("import generate_report; "
+                         "generate_report.main(['--dry-run'])")
+    assert heavy_modules(times) == []